@@ -32,7 +32,14 @@ class AuthService:
             tenant_service: TenantService instance
             db: MongoDB database
             jwt_secret: Secret key for JWT signing
+
+        Raises:
+            ValueError: If jwt_secret is empty
         """
+        # A guessable key would let anyone mint session tokens, so there is no default
+        if not jwt_secret:
+            raise ValueError("JWT_SECRET is required to sign auth tokens")
+
         self.zoho_crm = zoho_crm_service
         self.tenant_service = tenant_service
         self.db = db
@@ -171,8 +178,8 @@ class AuthService:
             }
 
             zoho_result = await self.zoho_crm.create_record(
-                module="App_Users",
-                data=user_data
+                module_name="App_Users",
+                record_data=user_data
             )
 
             # Store in local MongoDB
@@ -363,9 +370,9 @@ class AuthService:
             # Update in Zoho CRM
             if user.get("zoho_record_id"):
                 await self.zoho_crm.update_record(
-                    module="App_Users",
+                    module_name="App_Users",
                     record_id=user["zoho_record_id"],
-                    data={"Password_Hash": new_hash}
+                    record_data={"Password_Hash": new_hash}
                 )
 
             logger.info(f"Password changed for user: {user_id}")
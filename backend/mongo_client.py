@@ -0,0 +1,44 @@
+"""
+MongoDB Client
+
+Process-wide Motor client shared by the API server, its services and scripts.
+Each AsyncIOMotorClient owns a connection pool, so building one per request or
+per service would throw the pool away; always go through get_client()/get_db().
+"""
+
+import os
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+_MONGO_CLIENT: Optional[AsyncIOMotorClient] = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    """Return the shared Motor client, creating it on first use."""
+    global _MONGO_CLIENT
+
+    if _MONGO_CLIENT is None:
+        mongo_url = os.environ['MONGO_URL']
+        options = {
+            "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+            # Keep a few connections warm so the first requests don't pay for the handshake
+            "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+        }
+
+        # Configure SSL only for Atlas (srv:// protocol)
+        if "mongodb+srv://" in mongo_url:
+            import certifi
+            options.update(
+                tlsCAFile=certifi.where(),
+                serverSelectionTimeoutMS=10000,
+                connectTimeoutMS=20000
+            )
+
+        _MONGO_CLIENT = AsyncIOMotorClient(mongo_url, **options)
+
+    return _MONGO_CLIENT
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    """Return the application database on the shared client."""
+    return get_client()[os.environ['DB_NAME']]
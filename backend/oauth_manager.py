@@ -7,11 +7,14 @@ Author: Marketing Minds AI
 """
 
 import os
+import time
 import secrets
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 import httpx
+import jwt
+from cachetools import TTLCache
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
@@ -29,12 +32,19 @@ class OAuthManager:
     Handles state generation, validation, token refresh, and expiration.
     """
 
-    def __init__(self, mongo_client: AsyncIOMotorClient):
+    # Signed OAuth states are valid for 10 minutes
+    STATE_TTL_SECONDS = 600
+
+    def __init__(self, mongo_client: AsyncIOMotorClient, state_secret: Optional[str] = None):
         """
         Initialize OAuth Manager
 
         Args:
             mongo_client: MongoDB client instance
+            state_secret: HMAC key for signing OAuth states (defaults to OAUTH_STATE_SECRET / JWT_SECRET)
+
+        Raises:
+            ValueError: If no state secret is given or configured
         """
         self.mongo_client = mongo_client
         self.db = mongo_client.marketing_minds
@@ -42,6 +52,20 @@ class OAuthManager:
         self.social_accounts = self.db.social_accounts
         self.zoho_tokens = self.db.zoho_tokens
 
+        self.state_secret = (
+            state_secret
+            or os.getenv('OAUTH_STATE_SECRET')
+            or os.getenv('JWT_SECRET')
+        )
+        # Anyone who knows a fallback key could forge states, so refuse to start without one
+        if not self.state_secret:
+            raise ValueError("OAUTH_STATE_SECRET or JWT_SECRET is required to sign OAuth states")
+
+        # Nonces of states already consumed by a callback (replay protection). This is
+        # in-process only: with several workers a state can be replayed once per worker
+        # within its TTL, though the provider still accepts each authorization code once
+        self._consumed_states = TTLCache(maxsize=10000, ttl=self.STATE_TTL_SECONDS)
+
         # Platform configurations
         self.platform_configs = {
             'facebook': {
@@ -88,6 +112,10 @@ class OAuthManager:
         """
         Generate secure OAuth state parameter
 
+        The state is an HMAC-signed (HS256) token carrying the user, platform,
+        redirect URI and expiry, so the callback can validate it without a
+        database round-trip.
+
         Args:
             user_id: User ID initiating OAuth
             platform: Platform name (facebook, twitter, etc.)
@@ -98,22 +126,15 @@ class OAuthManager:
             str: Secure state token
         """
         try:
-            # Generate cryptographically secure random state
-            state_token = secrets.token_urlsafe(32)
-
-            # Store state in database with expiration
-            state_doc = {
-                'state': state_token,
-                'user_id': user_id,
-                'platform': platform,
-                'redirect_uri': redirect_uri,
-                'metadata': metadata or {},
-                'created_at': datetime.utcnow(),
-                'expires_at': datetime.utcnow() + timedelta(minutes=10),  # 10 min expiration
-                'used': False
+            payload = {
+                'uid': user_id,
+                'plat': platform,
+                'ruri': redirect_uri,
+                'meta': metadata or {},
+                'jti': secrets.token_urlsafe(12),
+                'exp': int(time.time()) + self.STATE_TTL_SECONDS
             }
-
-            await self.oauth_states.insert_one(state_doc)
+            state_token = jwt.encode(payload, self.state_secret, algorithm='HS256')
 
             logger.info(f"Generated OAuth state for user {user_id}, platform {platform}")
             return state_token
@@ -131,6 +152,9 @@ class OAuthManager:
         """
         Validate OAuth state parameter
 
+        Verifies the state signature and expiry in-process. Each state can only
+        be consumed once per worker process (see _consumed_states).
+
         Args:
             state: State token to validate
             platform: Platform name
@@ -140,20 +164,17 @@ class OAuthManager:
             dict: Validation result with state data
         """
         try:
-            # Find state in database
-            query = {
-                'state': state,
-                'platform': platform,
-                'used': False,
-                'expires_at': {'$gt': datetime.utcnow()}
-            }
-
-            if user_id:
-                query['user_id'] = user_id
-
-            state_doc = await self.oauth_states.find_one(query)
-
-            if not state_doc:
+            try:
+                payload = jwt.decode(state, self.state_secret, algorithms=['HS256'])
+            except jwt.PyJWTError:
+                payload = None
+
+            if (
+                not payload
+                or payload.get('plat') != platform
+                or (user_id and payload.get('uid') != user_id)
+                or payload.get('jti') in self._consumed_states
+            ):
                 logger.warning(f"Invalid or expired OAuth state: {state}")
                 return {
                     'valid': False,
@@ -161,18 +182,15 @@ class OAuthManager:
                 }
 
             # Mark state as used
-            await self.oauth_states.update_one(
-                {'_id': state_doc['_id']},
-                {'$set': {'used': True, 'used_at': datetime.utcnow()}}
-            )
+            self._consumed_states[payload['jti']] = True
 
-            logger.info(f"Validated OAuth state for user {state_doc['user_id']}, platform {platform}")
+            logger.info(f"Validated OAuth state for user {payload['uid']}, platform {platform}")
 
             return {
                 'valid': True,
-                'user_id': state_doc['user_id'],
-                'redirect_uri': state_doc['redirect_uri'],
-                'metadata': state_doc.get('metadata', {})
+                'user_id': payload['uid'],
+                'redirect_uri': payload['ruri'],
+                'metadata': payload.get('meta', {})
             }
 
         except Exception as e:
@@ -350,8 +350,8 @@ class ScrapingService:
             }
 
             await self.zoho_crm.create_record(
-                module="Scraped_Businesses",  # Custom module
-                data=crm_data
+                module_name="Scraped_Businesses",  # Custom module
+                record_data=crm_data
             )
 
         except Exception as e:
@@ -374,8 +374,8 @@ class ScrapingService:
             }
 
             await self.zoho_crm.create_record(
-                module="Scraped_Websites",  # Custom module
-                data=crm_data
+                module_name="Scraped_Websites",  # Custom module
+                record_data=crm_data
             )
 
         except Exception as e:
@@ -1,17 +1,27 @@
-from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks, Query, UploadFile, File, Form
-from fastapi.responses import RedirectResponse, StreamingResponse, HTMLResponse
+from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks, Query, UploadFile, File, Form, Request, Depends
+from fastapi.responses import RedirectResponse, StreamingResponse, HTMLResponse, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.security import OAuth2PasswordBearer
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import json
+import asyncio
+import hashlib
 import logging
+from html import escape
+from string import Template
+from urllib.parse import urlencode
 from pathlib import Path
+from contextlib import AsyncExitStack, asynccontextmanager
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone, timedelta
 import httpx
 from authlib.integrations.starlette_client import OAuth
+from cachetools import TTLCache
+from pymongo import IndexModel
 import io
 
 # Import agent orchestrator, voice service, social media service, vector memory, and collaboration system
@@ -47,27 +57,14 @@ from scraping_service import ScrapingService
 from zoho_marketing_automation_service import ZohoMarketingAutomationService
 from zoho_flow_service import ZohoFlowService
 from zoho_salesiq_service import ZohoSalesIQService
+from mongo_client import get_client, get_db
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-
-# Configure SSL only for Atlas (srv:// protocol)
-if "mongodb+srv://" in mongo_url:
-    import certifi
-    client = AsyncIOMotorClient(
-        mongo_url,
-        tlsCAFile=certifi.where(),
-        serverSelectionTimeoutMS=10000,
-        connectTimeoutMS=20000
-    )
-else:
-    # Local MongoDB, no SSL
-    client = AsyncIOMotorClient(mongo_url)
-
-db = client[os.environ['DB_NAME']]
+# MongoDB connection (one pooled client for the whole process)
+client = get_client()
+db = get_db()
 
 async def initialize_database():
     """Initialize database collections and indexes on startup."""
@@ -111,28 +108,44 @@ async def initialize_database():
             else:
                 logger.info(f"✓ Collection exists: {collection_name}")
         
-        # Create indexes
-        await db.conversations.create_index("conversation_id", unique=True)
-        await db.campaigns.create_index("campaign_id", unique=True)
-        await db.tenants.create_index("user_id", unique=True)
-        await db.user_memory.create_index("user_id")
-        await db.agent_memory.create_index("agent_name")
-        await db.agent_events.create_index([("conversation_id", 1), ("timestamp", -1)])
-
-        # New collection indexes
-        await db.users.create_index("user_id", unique=True)
-        await db.oauth_states.create_index("state", unique=True)
-        await db.oauth_states.create_index("expires_at")
-        await db.social_accounts.create_index("account_id", unique=True)
-        await db.social_accounts.create_index("user_id")
-        await db.social_posts.create_index("post_id", unique=True)
-        await db.social_posts.create_index("user_id")
-        await db.analytics_data.create_index([("platform", 1), ("identifier", 1), ("date", -1)])
-        await db.scheduled_jobs.create_index([("user_id", 1), ("status", 1)])
-        await db.scheduled_jobs.create_index("scheduled_time")
-        await db.email_campaigns.create_index("campaign_id", unique=True)
-        await db.content_library.create_index("user_id")
-        await db.zoho_crm_records.create_index([("user_id", 1), ("module", 1)])
+        # Create indexes one collection at a time, so an index that conflicts with
+        # existing data (e.g. duplicate tenant emails) doesn't skip the others
+        index_steps = [
+            ("conversations", lambda: db.conversations.create_index("conversation_id", unique=True)),
+            ("campaigns", lambda: db.campaigns.create_index("campaign_id", unique=True)),
+            ("tenants.user_id", lambda: db.tenants.create_index("user_id", unique=True)),
+            ("tenants", lambda: db.tenants.create_indexes([
+                IndexModel([("status", 1), ("tenant_id", 1)]),
+                IndexModel("tenant_id", unique=True),
+                IndexModel("email", unique=True)
+            ])),
+            ("user_memory", lambda: db.user_memory.create_index("user_id")),
+            ("agent_memory", lambda: db.agent_memory.create_index("agent_name")),
+            ("agent_events", lambda: db.agent_events.create_index([("conversation_id", 1), ("timestamp", -1)])),
+            # New collection indexes
+            ("users", lambda: db.users.create_index("user_id", unique=True)),
+            ("social_accounts", unified_social_service.ensure_indexes),
+            ("social_credentials", lambda: db.social_credentials.create_index(
+                [("user_id", 1), ("platform", 1)], unique=True, name="uid_platform"
+            )),
+            ("social_posts", lambda: db.social_posts.create_indexes([
+                IndexModel("post_id", unique=True),
+                IndexModel("user_id")
+            ])),
+            ("analytics_data", lambda: db.analytics_data.create_index([("platform", 1), ("identifier", 1), ("date", -1)])),
+            ("scheduled_jobs", lambda: db.scheduled_jobs.create_indexes([
+                IndexModel([("user_id", 1), ("status", 1)]),
+                IndexModel("scheduled_time")
+            ])),
+            ("email_campaigns", lambda: db.email_campaigns.create_index("campaign_id", unique=True)),
+            ("content_library", lambda: db.content_library.create_index("user_id")),
+            ("zoho_crm_records", lambda: db.zoho_crm_records.create_index([("user_id", 1), ("module", 1)])),
+        ]
+        for name, create_indexes in index_steps:
+            try:
+                await create_indexes()
+            except Exception as e:
+                logger.error("❌ Index creation failed for %s: %s", name, e)
         
         logger.info("✅ Database initialization complete!")
         
@@ -165,13 +178,13 @@ social_media_integration = SocialMediaIntegrationService(zoho_crm, db)
 
 # Initialize new integration services
 oauth_manager = OAuthManager(client)
-unified_social_service = UnifiedSocialService(db, zoho_crm_service=zoho_crm)
+unified_social_service = UnifiedSocialService(db, zoho_crm_service=zoho_crm, oauth_manager=oauth_manager)
 analytics_aggregator = AnalyticsAggregator(client, oauth_manager)
 job_scheduler = JobScheduler(client, oauth_manager, unified_social_service, analytics_aggregator)
 
 # Initialize new feature services
 tenant_service = TenantService(zoho_crm, db)
-jwt_secret = os.getenv("JWT_SECRET", "default-secret-change-this-in-production")
+jwt_secret = os.getenv("JWT_SECRET")
 auth_service = AuthService(zoho_crm, tenant_service, db, jwt_secret)
 credits_service = CreditsService(tenant_service, db)
 stripe_key = os.getenv("STRIPE_SECRET_KEY", "")
@@ -182,6 +195,40 @@ zoho_marketing_automation = ZohoMarketingAutomationService(zoho_auth)
 zoho_flow = ZohoFlowService(zoho_auth)
 zoho_salesiq = ZohoSalesIQService(zoho_auth)
 
+# Short-lived cache for endpoints the dashboard polls (credits, token status).
+# Keys are (namespace, tenant_id/user_id, ...) so entries never leak across tenants;
+# write paths drop the affected entries via invalidate_poll_cache().
+POLL_CACHE_TTL = int(os.getenv("POLL_CACHE_TTL", "10"))
+poll_cache = TTLCache(maxsize=4096, ttl=POLL_CACHE_TTL)
+
+def invalidate_poll_cache(namespace: str, owner_id: Optional[str] = None):
+    """Drop cached poll responses for a namespace, optionally for one tenant/user only."""
+    stale_keys = [
+        key for key in list(poll_cache.keys())
+        if key[0] == namespace and (owner_id is None or key[1] == owner_id)
+    ]
+    for key in stale_keys:
+        poll_cache.pop(key, None)
+
+# Every credit debit (agents, scraping) and grant (Stripe webhook) goes through
+# TenantService.update_credits_balance, so invalidate cached balances there
+tenant_service.on_credits_changed = lambda tenant_id: invalidate_poll_cache("credits", tenant_id)
+
+def etag_response(request: Request, payload: Any) -> Response:
+    """
+    Serialize a list-style payload once, tag it with a weak ETag and honour If-None-Match.
+    Unchanged polls get a bodyless 304 instead of the full JSON document.
+    """
+    body = json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=10"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # Update SocialMediaAgent with all services
 from agents.social_media_agent import SocialMediaAgent
 social_media_agent = SocialMediaAgent(
@@ -190,11 +237,45 @@ social_media_agent = SocialMediaAgent(
     job_scheduler=job_scheduler  # Job scheduler
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize database and services on startup; tear them down on shutdown."""
+    # Each cleanup is registered before the startup step it undoes and runs on its own,
+    # so a failed startup or a failing close() still releases everything else
+    async with AsyncExitStack() as shutdown:
+        # Close database connection (runs last)
+        shutdown.callback(client.close)
+
+        # Answer queued embedding requests
+        shutdown.push_async_callback(vector_memory.close)
+
+        # Flush pending Zoho credit syncs
+        shutdown.push_async_callback(tenant_service.close)
+
+        # Close pooled HTTP clients
+        shutdown.push_async_callback(unified_social_service.close)
+        shutdown.push_async_callback(social_media_service.close)
+        shutdown.push_async_callback(social_media_integration.close)
+
+        await initialize_database()
+
+        # Start job scheduler
+        shutdown.push_async_callback(job_scheduler.stop)
+        logger.info("Starting job scheduler...")
+        await job_scheduler.start()
+
+        logger.info("✅ Application startup complete")
+        yield
+        logger.info("Stopping job scheduler...")
+
+    logger.info("Application shutdown complete")
+
 # Create the main app
 app = FastAPI(
     title="AI Marketing Automation Platform",
     description="Multi-agent AI marketing platform with conversational interface",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Create router with /api prefix
@@ -1877,6 +1958,53 @@ async def post_to_facebook(data: Dict[str, Any]):
         logger.error(f"Error posting to Facebook: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Uploaded images are read in chunks of this size, up to SocialMediaService.MAX_IMAGE_BYTES
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+@api_router.post("/social-media/facebook/post-image")
+async def post_image_to_facebook(
+    image: UploadFile = File(...),
+    message: str = Form(""),
+    user_id: str = Form("default_user"),
+    page_id: Optional[str] = Form(None)
+):
+    """
+    Post an uploaded image to a Facebook page.
+
+    The image is sent to Facebook as multipart/form-data, so it doesn't need
+    to be reachable at a public URL.
+    """
+    max_bytes = SocialMediaService.MAX_IMAGE_BYTES
+    too_large = HTTPException(status_code=413, detail=f"Image exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+    try:
+        # Reject oversized uploads up front when the size is known, and never buffer
+        # more than the limit when it isn't
+        if image.size is not None and image.size > max_bytes:
+            raise too_large
+
+        chunks = []
+        size = 0
+        while chunk := await image.read(_UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > max_bytes:
+                raise too_large
+            chunks.append(chunk)
+        image_bytes = b"".join(chunks)
+
+        result = await social_media_integration.post_to_facebook(
+            user_id=user_id,
+            message=message,
+            page_id=page_id,
+            image_bytes=image_bytes,
+            image_content_type=image.content_type or "image/jpeg"
+        )
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error posting image to Facebook: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @api_router.post("/social-media/instagram/post")
 async def post_to_instagram(data: Dict[str, Any]):
     """
@@ -1977,8 +2105,45 @@ async def get_social_oauth_url(
 
         return result
     except Exception as e:
-        logger.error(f"Error getting OAuth URL for {platform}: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("Error getting OAuth URL for %s: %s", platform, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+_OAUTH_RESULT_TEMPLATE = Template("""
+<html>
+    <head><title>${title}</title></head>
+    <body style="font-family: Arial; padding: 50px; text-align: center;">
+        <h2 style="color: ${color};">${heading}</h2>
+        <p>${message}</p>
+        <p>Redirecting...</p>
+        <script>
+            setTimeout(function() {
+                window.location.href = "${url}";
+            }, ${delay});
+        </script>
+    </body>
+</html>
+""")
+
+def _oauth_redirect_html(
+    message: str,
+    query: Dict[str, str],
+    title: str = "Connection Failed",
+    heading: Optional[str] = None,
+    is_error: bool = True
+) -> HTMLResponse:
+    """Render the OAuth callback result page that bounces back to the frontend settings page."""
+    frontend_url = os.getenv('REACT_APP_FRONTEND_URL', 'http://localhost:3000')
+    return HTMLResponse(
+        content=_OAUTH_RESULT_TEMPLATE.substitute(
+            title=escape(title),
+            heading=escape(heading or title),
+            color="#dc3545" if is_error else "#28a745",
+            message=escape(message),
+            url=f"{frontend_url}/settings?{urlencode(query)}",
+            delay=2000 if is_error else 1500
+        ),
+        status_code=200
+    )
 
 @api_router.get("/social/callback/{platform}")
 async def handle_social_oauth_callback(
@@ -1991,70 +2156,17 @@ async def handle_social_oauth_callback(
     Handle OAuth callback from social media platforms
     """
     try:
-        frontend_url = os.getenv('REACT_APP_FRONTEND_URL', 'http://localhost:3000')
-
         if error:
-            return HTMLResponse(
-                content=f"""
-                <html>
-                    <head><title>Connection Failed</title></head>
-                    <body style="font-family: Arial; padding: 50px; text-align: center;">
-                        <h2 style="color: #dc3545;">Connection Failed</h2>
-                        <p>Error: {error}</p>
-                        <p>Redirecting...</p>
-                        <script>
-                            setTimeout(function() {{
-                                window.location.href = "{frontend_url}/settings?error={error}";
-                            }}, 2000);
-                        </script>
-                    </body>
-                </html>
-                """,
-                status_code=200
-            )
+            return _oauth_redirect_html(f"Error: {error}", {"error": error})
 
         if not code or not state:
-            return HTMLResponse(
-                content=f"""
-                <html>
-                    <head><title>Connection Failed</title></head>
-                    <body style="font-family: Arial; padding: 50px; text-align: center;">
-                        <h2 style="color: #dc3545;">Connection Failed</h2>
-                        <p>Missing required parameters</p>
-                        <p>Redirecting...</p>
-                        <script>
-                            setTimeout(function() {{
-                                window.location.href = "{frontend_url}/settings?error=missing_params";
-                            }}, 2000);
-                        </script>
-                    </body>
-                </html>
-                """,
-                status_code=200
-            )
+            return _oauth_redirect_html("Missing required parameters", {"error": "missing_params"})
 
-        # Validate state and exchange code for tokens
+        # Validate the signed state locally and exchange code for tokens
         state_validation = await oauth_manager.validate_state(state, platform)
 
         if not state_validation['valid']:
-            return HTMLResponse(
-                content=f"""
-                <html>
-                    <head><title>Connection Failed</title></head>
-                    <body style="font-family: Arial; padding: 50px; text-align: center;">
-                        <h2 style="color: #dc3545;">Connection Failed</h2>
-                        <p>Invalid or expired state</p>
-                        <p>Redirecting...</p>
-                        <script>
-                            setTimeout(function() {{
-                                window.location.href = "{frontend_url}/settings?error=invalid_state";
-                            }}, 2000);
-                        </script>
-                    </body>
-                </html>
-                """,
-                status_code=200
-            )
+            return _oauth_redirect_html("Invalid or expired state", {"error": "invalid_state"})
 
         user_id = state_validation['user_id']
         redirect_uri = state_validation['redirect_uri']
@@ -2064,72 +2176,36 @@ async def handle_social_oauth_callback(
             platform=platform,
             code=code,
             state=state,
-            user_id=user_id
+            user_id=user_id,
+            redirect_uri=redirect_uri,
+            state_validated=True
         )
 
         if result['success']:
-            return HTMLResponse(
-                content=f"""
-                <html>
-                    <head><title>{platform.title()} Connected</title></head>
-                    <body style="font-family: Arial; padding: 50px; text-align: center;">
-                        <h2 style="color: #28a745;">✅ {platform.title()} Connected Successfully!</h2>
-                        <p>Your {platform} account has been connected.</p>
-                        <p>Redirecting...</p>
-                        <script>
-                            setTimeout(function() {{
-                                window.location.href = "{frontend_url}/settings?connected={platform}";
-                            }}, 1500);
-                        </script>
-                    </body>
-                </html>
-                """,
-                status_code=200
+            return _oauth_redirect_html(
+                f"Your {platform} account has been connected.",
+                {"connected": platform},
+                title=f"{platform.title()} Connected",
+                heading=f"✅ {platform.title()} Connected Successfully!",
+                is_error=False
             )
         else:
-            return HTMLResponse(
-                content=f"""
-                <html>
-                    <head><title>Connection Failed</title></head>
-                    <body style="font-family: Arial; padding: 50px; text-align: center;">
-                        <h2 style="color: #dc3545;">Connection Failed</h2>
-                        <p>{result.get('error', 'Unknown error')}</p>
-                        <p>Redirecting...</p>
-                        <script>
-                            setTimeout(function() {{
-                                window.location.href = "{frontend_url}/settings?error=connection_failed";
-                            }}, 2000);
-                        </script>
-                    </body>
-                </html>
-                """,
-                status_code=200
+            return _oauth_redirect_html(
+                result.get('error', 'Unknown error'),
+                {"error": "connection_failed"}
             )
 
     except Exception as e:
-        logger.error(f"Error in OAuth callback for {platform}: {str(e)}")
-        frontend_url = os.getenv('REACT_APP_FRONTEND_URL', 'http://localhost:3000')
-        return HTMLResponse(
-            content=f"""
-            <html>
-                <head><title>Connection Error</title></head>
-                <body style="font-family: Arial; padding: 50px; text-align: center;">
-                    <h2 style="color: #dc3545;">Connection Error</h2>
-                    <p>An error occurred: {str(e)}</p>
-                    <p>Redirecting...</p>
-                    <script>
-                        setTimeout(function() {{
-                            window.location.href = "{frontend_url}/settings?error=server_error";
-                        }}, 2000);
-                    </script>
-                </body>
-            </html>
-            """,
-            status_code=200
+        logger.error("Error in OAuth callback for %s: %s", platform, e)
+        return _oauth_redirect_html(
+            f"An error occurred: {str(e)}",
+            {"error": "server_error"},
+            title="Connection Error"
         )
 
 @api_router.get("/social/accounts")
 async def get_connected_accounts(
+    request: Request,
     user_id: str = Query("default_user"),
     platform: str = Query(None)
 ):
@@ -2141,9 +2217,9 @@ async def get_connected_accounts(
             user_id=user_id,
             platform=platform
         )
-        return result
+        return etag_response(request, result)
     except Exception as e:
-        logger.error(f"Error getting connected accounts: {str(e)}")
+        logger.error("Error getting connected accounts: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.delete("/social/accounts/{account_id}")
@@ -2161,7 +2237,7 @@ async def disconnect_social_account(
         )
         return result
     except Exception as e:
-        logger.error(f"Error disconnecting account: {str(e)}")
+        logger.error("Error disconnecting account: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== Mock/Test Endpoints (DEVELOPMENT ONLY) ====================
@@ -2251,11 +2327,11 @@ async def mock_connect_social_account(
                     record_data=zoho_credential_record,
                     user_id=user_id
                 )
-                logger.info(f"Saved mock {platform} credentials to Zoho CRM: {account_id}")
+                logger.info("Saved mock %s credentials to Zoho CRM: %s", platform, account_id)
             except Exception as e:
-                logger.warning(f"Failed to save mock account to Zoho CRM: {str(e)}")
+                logger.warning("Failed to save mock account to Zoho CRM: %s", e)
 
-        logger.info(f"✅ Created mock {platform} account for user {user_id}: {account_id}")
+        logger.info("✅ Created mock %s account for user %s: %s", platform, user_id, account_id)
 
         return {
             "status": "success",
@@ -2274,7 +2350,7 @@ async def mock_connect_social_account(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error creating mock social account: {str(e)}")
+        logger.error("Error creating mock social account: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/social/check-config")
@@ -2364,7 +2440,7 @@ async def check_social_media_config():
         }
 
     except Exception as e:
-        logger.error(f"Error checking social media config: {str(e)}")
+        logger.error("Error checking social media config: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== Enhanced Social Media Posting ====================
@@ -2394,7 +2470,7 @@ async def post_to_social_media(data: Dict[str, Any]):
         )
         return result
     except Exception as e:
-        logger.error(f"Error posting to social media: {str(e)}")
+        logger.error("Error posting to social media: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/social/post/multiple")
@@ -2420,7 +2496,7 @@ async def post_to_multiple_accounts(data: Dict[str, Any]):
         )
         return result
     except Exception as e:
-        logger.error(f"Error posting to multiple accounts: {str(e)}")
+        logger.error("Error posting to multiple accounts: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/social/post/schedule")
@@ -2451,7 +2527,7 @@ async def schedule_social_post(data: Dict[str, Any]):
         )
         return result
     except Exception as e:
-        logger.error(f"Error scheduling post: {str(e)}")
+        logger.error("Error scheduling post: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== Social Media Analytics ====================
@@ -2500,7 +2576,7 @@ async def get_social_analytics(
 
         return result
     except Exception as e:
-        logger.error(f"Error fetching analytics: {str(e)}")
+        logger.error("Error fetching analytics: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/social/analytics/aggregate")
@@ -2523,7 +2599,7 @@ async def get_aggregated_analytics(
         )
         return result
     except Exception as e:
-        logger.error(f"Error aggregating analytics: {str(e)}")
+        logger.error("Error aggregating analytics: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/social/analytics/history")
@@ -2543,7 +2619,7 @@ async def get_analytics_history(
         )
         return result
     except Exception as e:
-        logger.error(f"Error getting analytics history: {str(e)}")
+        logger.error("Error getting analytics history: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== Job Scheduler ====================
@@ -2557,11 +2633,12 @@ async def get_job_status(job_id: str):
         result = await job_scheduler.get_job_status(job_id)
         return result
     except Exception as e:
-        logger.error(f"Error getting job status: {str(e)}")
+        logger.error("Error getting job status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/jobs/user")
 async def get_user_jobs(
+    request: Request,
     user_id: str = Query("default_user"),
     status: str = Query(None),
     job_type: str = Query(None)
@@ -2575,9 +2652,9 @@ async def get_user_jobs(
             status=status,
             job_type=job_type
         )
-        return result
+        return etag_response(request, result)
     except Exception as e:
-        logger.error(f"Error getting user jobs: {str(e)}")
+        logger.error("Error getting user jobs: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.delete("/jobs/{job_id}")
@@ -2589,19 +2666,19 @@ async def cancel_job(job_id: str):
         result = await job_scheduler.cancel_job(job_id)
         return result
     except Exception as e:
-        logger.error(f"Error cancelling job: {str(e)}")
+        logger.error("Error cancelling job: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/jobs/scheduler/status")
-async def get_scheduler_status():
+async def get_scheduler_status(request: Request):
     """
     Get job scheduler status
     """
     try:
         result = await job_scheduler.get_scheduler_status()
-        return result
+        return etag_response(request, result)
     except Exception as e:
-        logger.error(f"Error getting scheduler status: {str(e)}")
+        logger.error("Error getting scheduler status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/jobs/scheduler/start")
@@ -2613,7 +2690,7 @@ async def start_scheduler():
         result = await job_scheduler.start()
         return result
     except Exception as e:
-        logger.error(f"Error starting scheduler: {str(e)}")
+        logger.error("Error starting scheduler: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/jobs/scheduler/stop")
@@ -2625,7 +2702,7 @@ async def stop_scheduler():
         result = await job_scheduler.stop()
         return result
     except Exception as e:
-        logger.error(f"Error stopping scheduler: {str(e)}")
+        logger.error("Error stopping scheduler: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== Dashboard & Token Management ====================
@@ -2661,7 +2738,7 @@ async def get_dashboard_overview(user_id: str = Query("default_user")):
             'analytics': analytics_result.get('data', {}) if analytics_result.get('success') else {}
         }
     except Exception as e:
-        logger.error(f"Error getting dashboard overview: {str(e)}")
+        logger.error("Error getting dashboard overview: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/tokens/refresh")
@@ -2685,9 +2762,10 @@ async def refresh_tokens(
             # Refresh all expiring tokens
             result = await oauth_manager.refresh_expiring_tokens(hours_threshold=24)
 
+        invalidate_poll_cache("tokens", user_id if platform else None)
         return result
     except Exception as e:
-        logger.error(f"Error refreshing tokens: {str(e)}")
+        logger.error("Error refreshing tokens: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/tokens/status")
@@ -2696,14 +2774,37 @@ async def get_token_status(user_id: str = Query("default_user")):
     Get status of all tokens for a user
     """
     try:
+        cache_key = ("tokens", user_id)
+        cached = poll_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         result = await oauth_manager.get_token_status(user_id)
+        poll_cache[cache_key] = result
         return result
     except Exception as e:
-        logger.error(f"Error getting token status: {str(e)}")
+        logger.error("Error getting token status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== Health Check ====================
 
+# The agent registry and credit packages are fixed once the services are built,
+# so these payloads are serialized a single time and replayed as raw bytes.
+def _json_bytes(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+_HEALTHY_BYTES = _json_bytes({
+    "status": "healthy",
+    "database": "connected",
+    "agents": list(orchestrator.agents.keys())
+})
+_ROOT_BYTES = _json_bytes({
+    "message": "AI Marketing Automation Platform API",
+    "version": "1.0.0",
+    "agents": list(orchestrator.agents.keys())
+})
+_PACKAGES_BYTES = _json_bytes(payment_service.get_available_packages())
+
 @api_router.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -2711,11 +2812,7 @@ async def health_check():
         # Check MongoDB connection
         await db.command('ping')
         
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "agents": list(orchestrator.agents.keys())
-        }
+        return Response(content=_HEALTHY_BYTES, media_type="application/json")
     except Exception as e:
         return {
             "status": "unhealthy",
@@ -2724,11 +2821,7 @@ async def health_check():
 
 @api_router.get("/")
 async def root():
-    return {
-        "message": "AI Marketing Automation Platform API",
-        "version": "1.0.0",
-        "agents": list(orchestrator.agents.keys())
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 # Include router
 app.include_router(api_router)
@@ -2742,28 +2835,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup_db_client():
-    """Initialize database and services on startup."""
-    await initialize_database()
-
-    # Start job scheduler
-    logger.info("Starting job scheduler...")
-    await job_scheduler.start()
-
-    logger.info("✅ Application startup complete")
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    """Shutdown services and database."""
-    # Stop job scheduler
-    logger.info("Stopping job scheduler...")
-    await job_scheduler.stop()
-
-    # Close database connection
-    client.close()
-    logger.info("Application shutdown complete")
-
 # ==================== Authentication Endpoints ====================
 
 class SignupRequest(BaseModel):
@@ -2776,46 +2847,64 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+# Session tokens are read from the Authorization: Bearer header, never the query string
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+
 @api_router.post("/auth/signup")
 async def signup(request: SignupRequest):
-    result = await auth_service.signup(
-        email=request.email,
-        password=request.password,
-        full_name=request.full_name,
-        company_name=request.company_name
-    )
+    # Model fields mirror AuthService.signup's keyword arguments
+    result = await auth_service.signup(**request.model_dump())
     return result
 
 @api_router.post("/auth/login")
 async def login(request: LoginRequest):
-    result = await auth_service.login(request.email, request.password)
+    result = await auth_service.login(**request.model_dump())
     return result
 
 @api_router.post("/auth/logout")
-async def logout(token: str):
+async def logout(token: str = Depends(oauth2_scheme)):
     result = await auth_service.logout(token)
     return result
 
 @api_router.get("/credits/balance")
 async def get_credits_balance(tenant_id: str):
+    cache_key = ("credits", tenant_id, "balance")
+    cached = poll_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     tenant = await tenant_service.get_tenant(tenant_id)
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
-    return {"status": "success", "credits_balance": tenant["credits_balance"], "plan_type": tenant["plan_type"]}
+    result = {"status": "success", "credits_balance": tenant["credits_balance"], "plan_type": tenant["plan_type"]}
+    poll_cache[cache_key] = result
+    return result
 
 @api_router.get("/credits/usage")
 async def get_usage_summary(tenant_id: str, days: int = 30):
+    cache_key = ("credits", tenant_id, "usage", days)
+    cached = poll_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     result = await credits_service.get_usage_summary(tenant_id, days)
+    if result.get("status") == "success":
+        poll_cache[cache_key] = result
     return result
 
 @api_router.get("/credits/history")
-async def get_transaction_history(tenant_id: str):
-    transactions = await credits_service.get_transaction_history(tenant_id)
-    return {"status": "success", "transactions": transactions}
+async def get_transaction_history(request: Request, tenant_id: str):
+    cache_key = ("credits", tenant_id, "history")
+    result = poll_cache.get(cache_key)
+    if result is None:
+        transactions = await credits_service.get_transaction_history(tenant_id)
+        result = {"status": "success", "transactions": transactions}
+        poll_cache[cache_key] = result
+    return etag_response(request, result)
 
 @api_router.get("/payment/packages")
 async def get_packages():
-    return payment_service.get_available_packages()
+    return Response(content=_PACKAGES_BYTES, media_type="application/json")
 
 class CheckoutRequest(BaseModel):
     tenant_id: str
@@ -2836,11 +2925,16 @@ class GoogleMapsScrapingRequest(BaseModel):
     location: str
     max_results: int = 20
 
+# Process-wide cap on concurrent outbound crawls so bursts can't exhaust the
+# connection pool or get the egress IP banned
+_SCRAPE_SEM = asyncio.Semaphore(int(os.getenv('SCRAPE_CONCURRENCY', '4')))
+
 @api_router.post("/scraping/google-maps")
 async def scrape_google_maps(request: GoogleMapsScrapingRequest):
-    result = await scraping_service.scrape_google_maps(
-        request.tenant_id, request.query, request.location, request.max_results
-    )
+    async with _SCRAPE_SEM:
+        result = await scraping_service.scrape_google_maps(
+            request.tenant_id, request.query, request.location, request.max_results
+        )
     return result
 
 class WebsiteScrapingRequest(BaseModel):
@@ -2852,10 +2946,11 @@ class WebsiteScrapingRequest(BaseModel):
 
 @api_router.post("/scraping/website")
 async def scrape_website(request: WebsiteScrapingRequest):
-    result = await scraping_service.scrape_website(
-        request.tenant_id, request.url, request.extract_emails, 
-        request.extract_phones, request.extract_links
-    )
+    async with _SCRAPE_SEM:
+        result = await scraping_service.scrape_website(
+            request.tenant_id, request.url, request.extract_emails,
+            request.extract_phones, request.extract_links
+        )
     return result
 
 logger.info("✅ All API endpoints loaded")
@@ -8,15 +8,38 @@ Handles direct posting to social media platforms:
 - Actual posting capabilities
 """
 
+import os
+import asyncio
 import logging
+import hashlib
 import httpx
 import base64
+from cachetools import TTLCache
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from pymongo import WriteConcern
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
-import json
+from urllib.parse import urlencode, quote
+
+import orjson
+
+from utils.http import response_json
+
+# pybase64 is API-compatible with base64 but uses SIMD kernels
+try:
+    import pybase64 as b64
+except ImportError:
+    import base64 as b64
 
 logger = logging.getLogger(__name__)
 
+# Graph API paths, relative to the shared client's base_url
+_FEED = "/feed"
+_PHOTOS = "/photos"
+_MEDIA = "/media"
+_MEDIA_PUBLISH = "/media_publish"
+_ME_ACCOUNTS = "/me/accounts"
+
 
 class SocialMediaIntegrationService:
     """
@@ -32,6 +55,13 @@ class SocialMediaIntegrationService:
     # Instagram Graph API
     INSTAGRAM_GRAPH_API = "https://graph.facebook.com/v18.0"
 
+    # Facebook OAuth parameters that never change between requests
+    FACEBOOK_SCOPES = "pages_manage_posts,pages_read_engagement,pages_manage_metadata,public_profile,email"
+    FACEBOOK_OAUTH_BASE_PARAMS = (("scope", FACEBOOK_SCOPES), ("response_type", "code"))
+
+    # Marks credential blobs sealed with AES-GCM (older blobs are plain base64)
+    ENCRYPTION_PREFIX = "gcm1:"
+
     def __init__(self, zoho_crm_service, db):
         """
         Initialize Social Media Integration Service.
@@ -39,11 +69,46 @@ class SocialMediaIntegrationService:
         Args:
             zoho_crm_service: ZohoCRMService instance for credential storage
             db: MongoDB database connection for local cache
+
+        Raises:
+            ValueError: If CRED_ENC_KEY is not set
         """
         self.zoho_crm_service = zoho_crm_service
         self.db = db
+        # MongoDB only caches credentials already persisted in Zoho CRM, so writes
+        # don't need to wait for the journal or for secondaries
+        self._cred_coll = db.social_credentials.with_options(
+            write_concern=WriteConcern(w=1, j=False)
+        )
+
+        # AES-256-GCM key for credentials at rest (urlsafe base64 of 32 bytes)
+        # Refuse to start without it rather than store credentials as readable base64
+        encryption_key = os.environ.get("CRED_ENC_KEY")
+        if not encryption_key:
+            raise ValueError("CRED_ENC_KEY is required to encrypt stored social credentials")
+        self._cipher = AESGCM(base64.urlsafe_b64decode(encryption_key))
+
+        # Decrypted credentials per (user_id, platform); dropped on save/delete
+        self._cred_cache = TTLCache(maxsize=10000, ttl=300)
+        # Page access tokens per (user token digest, page_id); dropped when a post is rejected
+        self._page_token_cache = TTLCache(maxsize=5000, ttl=1800)
+
+        # One pooled client for all Graph API calls so keep-alive connections
+        # (and their TLS sessions) are reused across requests
+        self._http = httpx.AsyncClient(
+            base_url=self.FACEBOOK_GRAPH_API,
+            # HTTP/2 lets sequential Graph calls (e.g. Instagram container + publish)
+            # and concurrent fan-out share one multiplexed connection
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0),
+            timeout=httpx.Timeout(10.0, connect=5.0)
+        )
         logger.info("Social Media Integration Service initialized")
 
+    async def close(self):
+        """Close the pooled HTTP client."""
+        await self._http.aclose()
+
     async def save_credentials(
         self,
         user_id: str,
@@ -65,7 +130,9 @@ class SocialMediaIntegrationService:
         """
         try:
             # Encrypt sensitive data before storage
-            encrypted_creds = await self._encrypt_credentials(credentials)
+            encrypted_creds = self._encrypt_credentials(credentials)
+
+            now_iso = datetime.now(timezone.utc).isoformat()
 
             # Store in Zoho CRM custom module
             credential_record = {
@@ -74,47 +141,35 @@ class SocialMediaIntegrationService:
                 "Platform": platform.capitalize(),
                 "Auth_Type": auth_type,
                 "Credentials_Encrypted": encrypted_creds,
-                "Created_At": datetime.now(timezone.utc).isoformat(),
-                "Last_Updated": datetime.now(timezone.utc).isoformat(),
+                "Created_At": now_iso,
+                "Last_Updated": now_iso,
                 "Status": "active"
             }
 
-            # Check if credentials already exist
-            existing = await self.zoho_crm_service.search_records(
-                module_name="Social_Media_Credentials",
-                search_criteria=f"User_ID = '{user_id}' AND Platform = '{platform.capitalize()}'",
-                user_id=user_id
+            # Write to Zoho CRM and cache in MongoDB concurrently; the writes are independent
+            zoho_result, _ = await asyncio.gather(
+                self._save_zoho_credentials(user_id, platform, credential_record),
+                self._cred_coll.update_one(
+                    {"user_id": user_id, "platform": platform},
+                    {"$set": {
+                        "credentials": encrypted_creds,
+                        "auth_type": auth_type,
+                        "updated_at": now_iso
+                    }},
+                    upsert=True
+                )
             )
 
-            if existing.get("status") == "success" and existing.get("records"):
-                # Update existing
-                record_id = existing["records"][0]["id"]
-                result = await self.zoho_crm_service.update_record(
-                    module_name="Social_Media_Credentials",
-                    record_id=record_id,
-                    updates=credential_record,
-                    user_id=user_id
-                )
-            else:
-                # Create new
-                result = await self.zoho_crm_service.create_record(
-                    module_name="Social_Media_Credentials",
-                    record_data=credential_record,
-                    user_id=user_id
+            # Remember the Zoho record so updates/deletes can skip the COQL search
+            if zoho_result.get("status") == "success" and zoho_result.get("record_id"):
+                await self._cred_coll.update_one(
+                    {"user_id": user_id, "platform": platform},
+                    {"$set": {"zoho_record_id": zoho_result["record_id"]}}
                 )
 
-            # Also cache in MongoDB for faster access
-            await self.db.social_credentials.update_one(
-                {"user_id": user_id, "platform": platform},
-                {"$set": {
-                    "credentials": encrypted_creds,
-                    "auth_type": auth_type,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }},
-                upsert=True
-            )
+            self._cred_cache.pop((user_id, platform), None)
 
-            logger.info(f"Saved {platform} credentials for user: {user_id}")
+            logger.info("Saved %s credentials for user: %s", platform, user_id)
 
             return {
                 "status": "success",
@@ -123,9 +178,24 @@ class SocialMediaIntegrationService:
             }
 
         except Exception as e:
-            logger.error(f"Error saving credentials: {str(e)}")
+            logger.error("Error saving credentials: %s", e)
             return {"status": "error", "message": str(e)}
 
+    async def _save_zoho_credentials(
+        self,
+        user_id: str,
+        platform: str,
+        credential_record: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Create or update the credential record in Zoho CRM."""
+        # Record names are unique per user/platform, so Zoho can match on Name
+        return await self.zoho_crm_service.upsert_record(
+            module_name="Social_Media_Credentials",
+            record_data=credential_record,
+            duplicate_check_fields=["Name"],
+            user_id=user_id
+        )
+
     async def get_credentials(
         self,
         user_id: str,
@@ -142,47 +212,79 @@ class SocialMediaIntegrationService:
             Decrypted credentials or None
         """
         try:
+            cache_key = (user_id, platform)
+            credentials = self._cred_cache.get(cache_key)
+            if credentials is not None:
+                return credentials
+
             # Try MongoDB cache first
-            cached = await self.db.social_credentials.find_one({
-                "user_id": user_id,
-                "platform": platform
-            })
+            cached = await self._cred_coll.find_one(
+                {"user_id": user_id, "platform": platform},
+                {"credentials": 1, "_id": 0}
+            )
 
             if cached:
-                return await self._decrypt_credentials(cached["credentials"])
+                credentials = self._decrypt_credentials(cached["credentials"])
+                self._cred_cache[cache_key] = credentials
+                return credentials
 
-            # Fallback to Zoho CRM
+            # Repair from Zoho CRM (MongoDB is authoritative for reads once warm); skip the
+            # search cache, which could still hold a result from before a recent save
             result = await self.zoho_crm_service.search_records(
                 module_name="Social_Media_Credentials",
                 search_criteria=f"User_ID = '{user_id}' AND Platform = '{platform.capitalize()}'",
-                user_id=user_id
+                user_id=user_id,
+                no_cache=True
             )
 
             if result.get("status") == "success" and result.get("records"):
-                encrypted = result["records"][0]["Credentials_Encrypted"]
-                return await self._decrypt_credentials(encrypted)
+                record = result["records"][0]
+                encrypted = record["Credentials_Encrypted"]
+                credentials = self._decrypt_credentials(encrypted)
+
+                # Write back so the next read is a MongoDB point lookup
+                await self._cred_coll.update_one(
+                    {"user_id": user_id, "platform": platform},
+                    {"$set": {
+                        "credentials": encrypted,
+                        "auth_type": record.get("Auth_Type"),
+                        "zoho_record_id": record.get("id"),
+                        "updated_at": datetime.now(timezone.utc).isoformat()
+                    }},
+                    upsert=True
+                )
+
+                self._cred_cache[cache_key] = credentials
+                return credentials
 
             return None
 
         except Exception as e:
-            logger.error(f"Error getting credentials: {str(e)}")
+            logger.error("Error getting credentials: %s", e)
             return None
 
-    async def _encrypt_credentials(self, credentials: Dict[str, Any]) -> str:
+    def _encrypt_credentials(self, credentials: Dict[str, Any]) -> str:
         """
         Encrypt credentials before storage.
-        Uses base64 encoding (replace with proper encryption in production).
+        Uses AES-GCM with a random 96-bit nonce and the CRED_ENC_KEY key.
         """
-        creds_json = json.dumps(credentials)
-        encrypted = base64.b64encode(creds_json.encode()).decode()
-        return encrypted
+        creds_json = orjson.dumps(credentials)
+        nonce = os.urandom(12)
+        sealed = self._cipher.encrypt(nonce, creds_json, None)
+        return self.ENCRYPTION_PREFIX + b64.b64encode(nonce + sealed).decode()
 
-    async def _decrypt_credentials(self, encrypted: str) -> Dict[str, Any]:
+    def _decrypt_credentials(self, encrypted: str) -> Dict[str, Any]:
         """
         Decrypt credentials from storage.
+        Accepts both AES-GCM blobs and legacy base64-only blobs (read-only;
+        they are re-sealed with AES-GCM the next time they are saved).
         """
-        decrypted = base64.b64decode(encrypted.encode()).decode()
-        return json.loads(decrypted)
+        if not encrypted.startswith(self.ENCRYPTION_PREFIX):
+            return orjson.loads(b64.b64decode(encrypted.encode()))
+
+        raw = b64.b64decode(encrypted[len(self.ENCRYPTION_PREFIX):].encode())
+        decrypted = self._cipher.decrypt(raw[:12], raw[12:], None)
+        return orjson.loads(decrypted)
 
     # ==================== Facebook Integration ====================
 
@@ -203,24 +305,14 @@ class SocialMediaIntegrationService:
         Returns:
             Authorization URL
         """
-        scopes = [
-            "pages_manage_posts",
-            "pages_read_engagement",
-            "pages_manage_metadata",
-            "public_profile",
-            "email"
+        params = [
+            ("client_id", client_id),
+            ("redirect_uri", redirect_uri),
+            ("state", state),
+            *self.FACEBOOK_OAUTH_BASE_PARAMS
         ]
 
-        params = {
-            "client_id": client_id,
-            "redirect_uri": redirect_uri,
-            "state": state,
-            "scope": ",".join(scopes),
-            "response_type": "code"
-        }
-
-        from urllib.parse import urlencode
-        return f"{self.FACEBOOK_OAUTH_URL}?{urlencode(params)}"
+        return f"{self.FACEBOOK_OAUTH_URL}?{urlencode(params, quote_via=quote)}"
 
     async def exchange_facebook_code(
         self,
@@ -242,31 +334,30 @@ class SocialMediaIntegrationService:
             Dict with access token
         """
         try:
-            async with httpx.AsyncClient() as client:
-                params = {
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "redirect_uri": redirect_uri,
-                    "code": code
-                }
+            params = {
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "redirect_uri": redirect_uri,
+                "code": code
+            }
 
-                response = await client.get(self.FACEBOOK_TOKEN_URL, params=params)
+            response = await self._http.get(self.FACEBOOK_TOKEN_URL, params=params)
 
-                if response.status_code == 200:
-                    token_data = response.json()
-                    return {
-                        "status": "success",
-                        "access_token": token_data.get("access_token"),
-                        "token_type": token_data.get("token_type")
-                    }
-                else:
-                    return {
-                        "status": "error",
-                        "message": "Failed to exchange code"
-                    }
+            if response.status_code == 200:
+                token_data = response_json(response)
+                return {
+                    "status": "success",
+                    "access_token": token_data.get("access_token"),
+                    "token_type": token_data.get("token_type")
+                }
+            else:
+                return {
+                    "status": "error",
+                    "message": "Failed to exchange code"
+                }
 
         except Exception as e:
-            logger.error(f"Error exchanging Facebook code: {str(e)}")
+            logger.error("Error exchanging Facebook code: %s", e)
             return {"status": "error", "message": str(e)}
 
     async def post_to_facebook(
@@ -275,7 +366,9 @@ class SocialMediaIntegrationService:
         message: str,
         page_id: str = None,
         image_url: str = None,
-        link: str = None
+        link: str = None,
+        image_bytes: Optional[bytes] = None,
+        image_content_type: str = "image/jpeg"
     ) -> Dict[str, Any]:
         """
         Post to Facebook page.
@@ -284,8 +377,11 @@ class SocialMediaIntegrationService:
             user_id: User identifier
             message: Post text
             page_id: Facebook page ID (uses default if None)
-            image_url: Optional image URL
+            image_url: Optional image URL (Facebook fetches it)
             link: Optional link to share
+            image_bytes: Optional raw image, uploaded directly as multipart/form-data
+                         instead of making Facebook fetch a URL
+            image_content_type: MIME type of image_bytes
 
         Returns:
             Dict with post details
@@ -306,48 +402,57 @@ class SocialMediaIntegrationService:
                 }
 
             # Get page access token if page_id provided
+            page_token_key = None
             if page_id:
+                page_token_key = self._page_token_key(access_token, page_id)
                 page_token = await self._get_page_access_token(access_token, page_id)
                 if not page_token:
                     return {"status": "error", "message": "Failed to get page access token"}
                 access_token = page_token
 
-            # Prepare post data
-            post_data = {"message": message, "access_token": access_token}
+            # Prepare post data (one complete literal per branch)
+            files = None
 
-            if image_url:
-                post_data["url"] = image_url
-                endpoint = f"{self.FACEBOOK_GRAPH_API}/{page_id or 'me'}/photos"
+            if image_bytes:
+                post_data = {"message": message, "access_token": access_token}
+                files = {"source": ("image", image_bytes, image_content_type)}
+                endpoint = "/" + str(page_id or "me") + _PHOTOS
+            elif image_url:
+                post_data = {"message": message, "access_token": access_token, "url": image_url}
+                endpoint = "/" + str(page_id or "me") + _PHOTOS
             elif link:
-                post_data["link"] = link
-                endpoint = f"{self.FACEBOOK_GRAPH_API}/{page_id or 'me'}/feed"
+                post_data = {"message": message, "access_token": access_token, "link": link}
+                endpoint = "/" + str(page_id or "me") + _FEED
             else:
-                endpoint = f"{self.FACEBOOK_GRAPH_API}/{page_id or 'me'}/feed"
+                post_data = {"message": message, "access_token": access_token}
+                endpoint = "/" + str(page_id or "me") + _FEED
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(endpoint, data=post_data)
+            response = await self._http.post(endpoint, data=post_data, files=files)
+            body = response_json(response)
 
-                if response.status_code == 200:
-                    result = response.json()
-                    post_id = result.get("id") or result.get("post_id")
-
-                    logger.info(f"Posted to Facebook: {post_id}")
-
-                    return {
-                        "status": "success",
-                        "post_id": post_id,
-                        "message": "Posted to Facebook successfully",
-                        "platform": "facebook"
-                    }
-                else:
-                    error_data = response.json()
-                    return {
-                        "status": "error",
-                        "message": error_data.get("error", {}).get("message", "Post failed")
-                    }
+            if response.status_code == 200:
+                post_id = body.get("id") or body.get("post_id")
+
+                logger.info("Posted to Facebook: %s", post_id)
+
+                return {
+                    "status": "success",
+                    "post_id": post_id,
+                    "message": "Posted to Facebook successfully",
+                    "platform": "facebook"
+                }
+            else:
+                if page_token_key and response.status_code in (400, 401, 403):
+                    # Page token may have been revoked; fetch a fresh one next time
+                    self._page_token_cache.pop(page_token_key, None)
+
+                return {
+                    "status": "error",
+                    "message": body.get("error", {}).get("message", "Post failed")
+                }
 
         except Exception as e:
-            logger.error(f"Error posting to Facebook: {str(e)}")
+            logger.error("Error posting to Facebook: %s", e)
             return {"status": "error", "message": str(e)}
 
     async def _get_page_access_token(
@@ -357,25 +462,37 @@ class SocialMediaIntegrationService:
     ) -> Optional[str]:
         """Get page-specific access token."""
         try:
-            url = f"{self.FACEBOOK_GRAPH_API}/{page_id}"
+            cache_key = self._page_token_key(user_access_token, page_id)
+            page_token = self._page_token_cache.get(cache_key)
+            if page_token:
+                return page_token
+
+            url = "/" + str(page_id)
             params = {
                 "fields": "access_token",
                 "access_token": user_access_token
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
+            response = await self._http.get(url, params=params)
 
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("access_token")
+            if response.status_code == 200:
+                data = response_json(response)
+                page_token = data.get("access_token")
+                if page_token:
+                    self._page_token_cache[cache_key] = page_token
+                return page_token
 
             return None
 
         except Exception as e:
-            logger.error(f"Error getting page token: {str(e)}")
+            logger.error("Error getting page token: %s", e)
             return None
 
+    @staticmethod
+    def _page_token_key(user_access_token: str, page_id: str) -> tuple:
+        """Cache key for a page token; the raw user token is never used as a key."""
+        return (hashlib.blake2b(user_access_token.encode(), digest_size=16).hexdigest(), page_id)
+
     # ==================== Instagram Integration ====================
 
     async def post_to_instagram(
@@ -413,55 +530,53 @@ class SocialMediaIntegrationService:
                 }
 
             # Step 1: Create media container
-            container_url = f"{self.INSTAGRAM_GRAPH_API}/{instagram_account_id}/media"
+            container_url = "/" + str(instagram_account_id) + _MEDIA
             container_data = {
                 "image_url": image_url,
                 "caption": caption,
                 "access_token": access_token
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(container_url, data=container_data)
+            response = await self._http.post(container_url, data=container_data)
+            body = response_json(response)
 
-                if response.status_code != 200:
-                    error_data = response.json()
-                    return {
-                        "status": "error",
-                        "message": error_data.get("error", {}).get("message", "Container creation failed")
-                    }
+            if response.status_code != 200:
+                return {
+                    "status": "error",
+                    "message": body.get("error", {}).get("message", "Container creation failed")
+                }
 
-                container_id = response.json().get("id")
+            container_id = body.get("id")
 
-                # Step 2: Publish media
-                publish_url = f"{self.INSTAGRAM_GRAPH_API}/{instagram_account_id}/media_publish"
-                publish_data = {
-                    "creation_id": container_id,
-                    "access_token": access_token
-                }
+            # Step 2: Publish media
+            publish_url = "/" + str(instagram_account_id) + _MEDIA_PUBLISH
+            publish_data = {
+                "creation_id": container_id,
+                "access_token": access_token
+            }
 
-                response = await client.post(publish_url, data=publish_data)
+            response = await self._http.post(publish_url, data=publish_data)
+            body = response_json(response)
 
-                if response.status_code == 200:
-                    result = response.json()
-                    media_id = result.get("id")
-
-                    logger.info(f"Posted to Instagram: {media_id}")
-
-                    return {
-                        "status": "success",
-                        "media_id": media_id,
-                        "message": "Posted to Instagram successfully",
-                        "platform": "instagram"
-                    }
-                else:
-                    error_data = response.json()
-                    return {
-                        "status": "error",
-                        "message": error_data.get("error", {}).get("message", "Publish failed")
-                    }
+            if response.status_code == 200:
+                media_id = body.get("id")
+
+                logger.info("Posted to Instagram: %s", media_id)
+
+                return {
+                    "status": "success",
+                    "media_id": media_id,
+                    "message": "Posted to Instagram successfully",
+                    "platform": "instagram"
+                }
+            else:
+                return {
+                    "status": "error",
+                    "message": body.get("error", {}).get("message", "Publish failed")
+                }
 
         except Exception as e:
-            logger.error(f"Error posting to Instagram: {str(e)}")
+            logger.error("Error posting to Instagram: %s", e)
             return {"status": "error", "message": str(e)}
 
     async def get_user_pages(self, user_id: str) -> Dict[str, Any]:
@@ -480,23 +595,22 @@ class SocialMediaIntegrationService:
                 return {"status": "error", "message": "No credentials found"}
 
             access_token = credentials.get("access_token")
-            url = f"{self.FACEBOOK_GRAPH_API}/me/accounts"
+            url = _ME_ACCOUNTS
             params = {"access_token": access_token}
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
+            response = await self._http.get(url, params=params)
 
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
-                        "status": "success",
-                        "pages": data.get("data", [])
-                    }
-                else:
-                    return {"status": "error", "message": "Failed to get pages"}
+            if response.status_code == 200:
+                data = response_json(response)
+                return {
+                    "status": "success",
+                    "pages": data.get("data", [])
+                }
+            else:
+                return {"status": "error", "message": "Failed to get pages"}
 
         except Exception as e:
-            logger.error(f"Error getting pages: {str(e)}")
+            logger.error("Error getting pages: %s", e)
             return {"status": "error", "message": str(e)}
 
     async def get_instagram_accounts(self, user_id: str) -> Dict[str, Any]:
@@ -522,26 +636,31 @@ class SocialMediaIntegrationService:
                 return pages_result
 
             instagram_accounts = []
+            pages = pages_result.get("pages", [])
+            params = {
+                "fields": "instagram_business_account",
+                "access_token": access_token
+            }
+
+            # Get Instagram account for each page (all pages queried concurrently)
+            responses = await asyncio.gather(
+                *(self._http.get("/" + page.get("id"), params=params) for page in pages),
+                return_exceptions=True
+            )
+
+            for page, response in zip(pages, responses):
+                if isinstance(response, Exception):
+                    logger.warning("Failed to get Instagram account for page %s: %s", page.get('id'), response)
+                    continue
 
-            # Get Instagram account for each page
-            async with httpx.AsyncClient() as client:
-                for page in pages_result.get("pages", []):
-                    page_id = page.get("id")
-                    url = f"{self.FACEBOOK_GRAPH_API}/{page_id}"
-                    params = {
-                        "fields": "instagram_business_account",
-                        "access_token": access_token
-                    }
-
-                    response = await client.get(url, params=params)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "instagram_business_account" in data:
-                            instagram_accounts.append({
-                                "page_name": page.get("name"),
-                                "page_id": page_id,
-                                "instagram_account_id": data["instagram_business_account"]["id"]
-                            })
+                if response.status_code == 200:
+                    data = response_json(response)
+                    if "instagram_business_account" in data:
+                        instagram_accounts.append({
+                            "page_name": page.get("name"),
+                            "page_id": page.get("id"),
+                            "instagram_account_id": data["instagram_business_account"]["id"]
+                        })
 
             return {
                 "status": "success",
@@ -549,7 +668,7 @@ class SocialMediaIntegrationService:
             }
 
         except Exception as e:
-            logger.error(f"Error getting Instagram accounts: {str(e)}")
+            logger.error("Error getting Instagram accounts: %s", e)
             return {"status": "error", "message": str(e)}
 
     async def delete_credentials(
@@ -568,26 +687,22 @@ class SocialMediaIntegrationService:
             Dict with deletion status
         """
         try:
-            # Delete from MongoDB
-            await self.db.social_credentials.delete_one({
-                "user_id": user_id,
-                "platform": platform
-            })
+            self._cred_cache.pop((user_id, platform), None)
 
-            # Delete from Zoho CRM
-            existing = await self.zoho_crm_service.search_records(
-                module_name="Social_Media_Credentials",
-                search_criteria=f"User_ID = '{user_id}' AND Platform = '{platform.capitalize()}'",
-                user_id=user_id
+            cached = await self._cred_coll.find_one(
+                {"user_id": user_id, "platform": platform},
+                {"zoho_record_id": 1, "_id": 0}
+            )
+            zoho_record_id = cached.get("zoho_record_id") if cached else None
+
+            # Delete from MongoDB and Zoho CRM concurrently
+            await asyncio.gather(
+                self._cred_coll.delete_one({
+                    "user_id": user_id,
+                    "platform": platform
+                }),
+                self._delete_zoho_credentials(user_id, platform, zoho_record_id)
             )
-
-            if existing.get("status") == "success" and existing.get("records"):
-                record_id = existing["records"][0]["id"]
-                await self.zoho_crm_service.delete_record(
-                    module_name="Social_Media_Credentials",
-                    record_id=record_id,
-                    user_id=user_id
-                )
 
             return {
                 "status": "success",
@@ -595,5 +710,32 @@ class SocialMediaIntegrationService:
             }
 
         except Exception as e:
-            logger.error(f"Error deleting credentials: {str(e)}")
+            logger.error("Error deleting credentials: %s", e)
             return {"status": "error", "message": str(e)}
+
+    async def _delete_zoho_credentials(
+        self,
+        user_id: str,
+        platform: str,
+        record_id: Optional[str] = None
+    ):
+        """Delete the credential record from Zoho CRM if one exists."""
+        if not record_id:
+            # Record ID not cached locally; fall back to an uncached search so a
+            # record created moments ago is still found and deleted
+            existing = await self.zoho_crm_service.search_records(
+                module_name="Social_Media_Credentials",
+                search_criteria=f"User_ID = '{user_id}' AND Platform = '{platform.capitalize()}'",
+                user_id=user_id,
+                no_cache=True
+            )
+
+            if existing.get("status") == "success" and existing.get("records"):
+                record_id = existing["records"][0]["id"]
+
+        if record_id:
+            await self.zoho_crm_service.delete_record(
+                module_name="Social_Media_Credentials",
+                record_id=record_id,
+                user_id=user_id
+            )
@@ -4,12 +4,28 @@ Handles auto-publishing of marketing content to social platforms.
 """
 import httpx
 import asyncio
+import ipaddress
 import logging
+import random
+import socket
+import weakref
+from cachetools import TTLCache
 from typing import Dict, Any, Optional
-from datetime import datetime, timezone
+import orjson
+
+from utils.clock import utcnow_iso
+from utils.http import response_json
 
 logger = logging.getLogger(__name__)
 
+
+def _parse(response: httpx.Response) -> Dict[str, Any]:
+    """Parse a Graph API response body once, tolerating non-JSON error pages."""
+    try:
+        return response_json(response)
+    except orjson.JSONDecodeError:
+        return {"error": {"message": response.text[:500]}}
+
 class SocialMediaPublishingError(Exception):
     """Base exception for social media publishing errors."""
     pass
@@ -30,11 +46,54 @@ class SocialMediaService:
     
     GRAPH_API_BASE = "https://graph.facebook.com/v18.0"
     MAX_INSTAGRAM_CAPTION_LENGTH = 2200
-    MAX_STATUS_CHECKS = 30  # Max polling attempts for Instagram container
-    STATUS_CHECK_INTERVAL = 2  # Seconds between status checks
+    MAX_WAIT_SECONDS = 60  # Max time to wait for an Instagram container
+    FIRST_STATUS_DELAY = 0.2  # Optimistic wait before the first status check
+    INITIAL_STATUS_DELAY = 0.5  # First backoff delay between status checks
+    MAX_STATUS_DELAY = 8.0  # Backoff delay cap
+    STATUS_CACHE_TTL = 0.5  # Seconds a container status is shared between waiters
+    STATUS_QUERY = (("fields", "status_code"),)  # Minimal container status field set
+    MAX_IMAGE_BYTES = 10 * 1024 * 1024  # Facebook photo upload limit
+    MAX_IMAGE_REDIRECTS = 5  # Redirect hops followed when downloading an image
     
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
+
+        # One pooled client for every Graph API call, created on first use
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_lock = asyncio.Lock()
+
+        # Recent container statuses and per-container locks so concurrent waiters share one GET
+        self._status_cache = TTLCache(maxsize=1024, ttl=self.STATUS_CACHE_TTL)
+        self._status_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared Graph API client, creating it on first use."""
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    # httpx is kept (rather than aiohttp) for HTTP/2 multiplexing and parity
+                    # with the rest of the backend
+                    self._client = httpx.AsyncClient(
+                        http2=True,
+                        timeout=httpx.Timeout(30.0, connect=5.0),
+                        limits=httpx.Limits(
+                            max_keepalive_connections=32,
+                            max_connections=64,
+                            keepalive_expiry=30.0
+                        )
+                    )
+        return self._client
+
+    @staticmethod
+    def _auth_headers(access_token: str) -> Dict[str, str]:
+        """Build the Graph API Authorization header for a token."""
+        return {"Authorization": f"Bearer {access_token}"}
+
+    async def close(self):
+        """Close the shared HTTP client (called on application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def publish_to_facebook(
         self,
@@ -43,7 +102,9 @@ class SocialMediaService:
         message: str,
         image_url: Optional[str] = None,
         link: Optional[str] = None,
-        scheduled_time: Optional[int] = None
+        scheduled_time: Optional[int] = None,
+        image_bytes: Optional[bytes] = None,
+        image_content_type: str = "image/jpeg"
     ) -> Dict[str, Any]:
         """
         Post content to Facebook Page.
@@ -55,6 +116,8 @@ class SocialMediaService:
             image_url: Optional image URL (publicly accessible)
             link: Optional link to include in post
             scheduled_time: Optional Unix timestamp for scheduled publishing
+            image_bytes: Optional raw image, uploaded directly instead of Meta fetching image_url
+            image_content_type: MIME type of image_bytes
             
         Returns:
             Dictionary containing post_id and status
@@ -63,24 +126,26 @@ class SocialMediaService:
             FacebookPublishingError: If posting fails
         """
         try:
-            self.logger.info(f"Publishing to Facebook Page {page_id}")
+            self.logger.info("Publishing to Facebook Page %s", page_id)
             
             # Determine endpoint based on content type
-            if image_url:
+            if image_bytes or image_url:
                 endpoint = f"{self.GRAPH_API_BASE}/{page_id}/photos"
             else:
                 endpoint = f"{self.GRAPH_API_BASE}/{page_id}/feed"
             
             # Prepare parameters
             params = {
-                "access_token": access_token,
                 "message": message
             }
             
-            if image_url:
+            files = None
+            if image_bytes:
+                files = {"source": ("image", image_bytes, image_content_type)}
+            elif image_url:
                 params["url"] = image_url
             
-            if link and not image_url:
+            if link and not (image_bytes or image_url):
                 params["link"] = link
             
             if scheduled_time:
@@ -88,36 +153,115 @@ class SocialMediaService:
                 params["published"] = "false"
             
             # Make API request
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(endpoint, data=params)
-                
-                if response.status_code != 200:
-                    error_data = response.json()
-                    error_msg = error_data.get("error", {}).get("message", "Unknown error")
-                    self.logger.error(f"Facebook API error: {error_msg}")
-                    raise FacebookPublishingError(f"Failed to post to Facebook: {error_msg}")
-                
-                result = response.json()
-                post_id = result.get("post_id") or result.get("id")
-                
-                self.logger.info(f"Successfully posted to Facebook. Post ID: {post_id}")
-                
-                return {
-                    "platform": "facebook",
-                    "post_id": post_id,
-                    "status": "scheduled" if scheduled_time else "published",
-                    "timestamp": datetime.now(timezone.utc).isoformat()
-                }
-                
+            client = await self._get_client()
+            response = await client.post(
+                endpoint, data=params, files=files, headers=self._auth_headers(access_token)
+            )
+            
+            result = _parse(response)
+            
+            if response.status_code != 200:
+                error_msg = result.get("error", {}).get("message", "Unknown error")
+                self.logger.error("Facebook API error: %s", error_msg)
+                raise FacebookPublishingError(f"Failed to post to Facebook: {error_msg}")
+            
+            post_id = result.get("post_id") or result.get("id")
+            
+            self.logger.info("Successfully posted to Facebook. Post ID: %s", post_id)
+            
+            return {
+                "platform": "facebook",
+                "post_id": post_id,
+                "status": "scheduled" if scheduled_time else "published",
+                "timestamp": utcnow_iso()
+            }
+            
         except httpx.RequestError as e:
-            self.logger.error(f"Network error posting to Facebook: {str(e)}")
+            self.logger.error("Network error posting to Facebook: %s", e)
             raise FacebookPublishingError(f"Network error: {str(e)}")
         except Exception as e:
             if isinstance(e, FacebookPublishingError):
                 raise
-            self.logger.error(f"Unexpected error posting to Facebook: {str(e)}")
+            self.logger.error("Unexpected error posting to Facebook: %s", e)
             raise FacebookPublishingError(f"Unexpected error: {str(e)}")
     
+    @staticmethod
+    async def _check_public_url(url: httpx.URL) -> None:
+        """
+        Reject URLs the server must not fetch on a user's behalf.
+        
+        Args:
+            url: URL about to be requested
+            
+        Raises:
+            SocialMediaPublishingError: If the scheme is not http(s) or the host
+                resolves to a private, loopback, link-local or otherwise non-public address
+        """
+        if url.scheme not in ("http", "https") or not url.host:
+            raise SocialMediaPublishingError("Image URL must be an http(s) URL")
+        
+        try:
+            addresses = await asyncio.get_running_loop().getaddrinfo(
+                url.host, url.port or (443 if url.scheme == "https" else 80), type=socket.SOCK_STREAM
+            )
+        except socket.gaierror:
+            raise SocialMediaPublishingError(f"Could not resolve image host {url.host}")
+        
+        for *_, sockaddr in addresses:
+            ip = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+            if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+                ip = ip.ipv4_mapped
+            if not ip.is_global or ip.is_multicast:
+                raise SocialMediaPublishingError(f"Image host {url.host} is not a public address")
+    
+    async def download_image(self, image_url: str) -> tuple:
+        """
+        Stream an image into memory over the shared client.
+        
+        The URL comes from the user, so every hop (including redirects) must be a
+        public http(s) address; redirects are followed manually to check each one.
+        
+        Args:
+            image_url: Image URL to fetch
+            
+        Returns:
+            Tuple of (image bytes, content type)
+            
+        Raises:
+            SocialMediaPublishingError: If the URL is not allowed, the download fails
+                or the image exceeds MAX_IMAGE_BYTES
+        """
+        client = await self._get_client()
+        url = httpx.URL(image_url)
+        
+        for _ in range(self.MAX_IMAGE_REDIRECTS + 1):
+            await self._check_public_url(url)
+            
+            async with client.stream("GET", url, follow_redirects=False) as response:
+                if response.is_redirect:
+                    url = url.join(response.headers["Location"])
+                    continue
+                
+                if response.status_code != 200:
+                    raise SocialMediaPublishingError(f"Failed to download image: HTTP {response.status_code}")
+                
+                declared_size = response.headers.get("Content-Length")
+                if declared_size and declared_size.isdigit() and int(declared_size) > self.MAX_IMAGE_BYTES:
+                    raise SocialMediaPublishingError("Image exceeds upload size limit")
+                
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > self.MAX_IMAGE_BYTES:
+                        raise SocialMediaPublishingError("Image exceeds upload size limit")
+                    chunks.append(chunk)
+                
+                content_type = response.headers.get("Content-Type", "image/jpeg")
+                return b"".join(chunks), content_type
+        
+        raise SocialMediaPublishingError("Too many redirects downloading image")
+    
     async def publish_to_instagram(
         self,
         instagram_account_id: str,
@@ -147,12 +291,17 @@ class SocialMediaService:
             InstagramPublishingError: If posting fails
         """
         try:
-            self.logger.info(f"Publishing to Instagram account {instagram_account_id}")
+            self.logger.info("Publishing to Instagram account %s", instagram_account_id)
             
-            # Validate caption length
-            if len(caption) > self.MAX_INSTAGRAM_CAPTION_LENGTH:
-                caption = caption[:self.MAX_INSTAGRAM_CAPTION_LENGTH]
-                self.logger.warning("Caption truncated to 2200 characters")
+            # Validate caption length (only slice when over the limit)
+            caption_length = len(caption)
+            if caption_length > self.MAX_INSTAGRAM_CAPTION_LENGTH:
+                # Don't leave a dangling joiner/variation selector from a split emoji sequence
+                caption = caption[:self.MAX_INSTAGRAM_CAPTION_LENGTH].rstrip("\u200d\ufe0f")
+                self.logger.warning(
+                    "Caption truncated from %d to %d characters",
+                    caption_length, self.MAX_INSTAGRAM_CAPTION_LENGTH
+                )
             
             # Step 1: Create media container
             container_id = await self._create_instagram_container(
@@ -173,20 +322,20 @@ class SocialMediaService:
                 container_id
             )
             
-            self.logger.info(f"Successfully posted to Instagram. Media ID: {media_id}")
+            self.logger.info("Successfully posted to Instagram. Media ID: %s", media_id)
             
             return {
                 "platform": "instagram",
                 "media_id": media_id,
                 "container_id": container_id,
                 "status": "published",
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": utcnow_iso()
             }
             
         except Exception as e:
             if isinstance(e, InstagramPublishingError):
                 raise
-            self.logger.error(f"Unexpected error posting to Instagram: {str(e)}")
+            self.logger.error("Unexpected error posting to Instagram: %s", e)
             raise InstagramPublishingError(f"Unexpected error: {str(e)}")
     
     async def _create_instagram_container(
@@ -207,27 +356,26 @@ class SocialMediaService:
         
         params = {
             "image_url": image_url,
-            "caption": caption,
-            "access_token": access_token
+            "caption": caption
         }
         
         if location_id:
             params["location_id"] = location_id
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(endpoint, data=params)
-            
-            if response.status_code != 200:
-                error_data = response.json()
-                error_msg = error_data.get("error", {}).get("message", "Unknown error")
-                self.logger.error(f"Instagram container creation error: {error_msg}")
-                raise InstagramPublishingError(f"Failed to create container: {error_msg}")
-            
-            result = response.json()
-            container_id = result.get("id")
-            
-            self.logger.info(f"Created Instagram container: {container_id}")
-            return container_id
+        client = await self._get_client()
+        response = await client.post(endpoint, data=params, headers=self._auth_headers(access_token))
+        
+        result = _parse(response)
+        
+        if response.status_code != 200:
+            error_msg = result.get("error", {}).get("message", "Unknown error")
+            self.logger.error("Instagram container creation error: %s", error_msg)
+            raise InstagramPublishingError(f"Failed to create container: {error_msg}")
+        
+        container_id = result.get("id")
+        
+        self.logger.info("Created Instagram container: %s", container_id)
+        return container_id
     
     async def _wait_for_container_ready(
         self,
@@ -240,43 +388,94 @@ class SocialMediaService:
         Raises:
             InstagramPublishingError: If container processing fails or times out
         """
-        endpoint = f"{self.GRAPH_API_BASE}/{container_id}"
-        params = {
-            "fields": "status_code",
-            "access_token": access_token
-        }
+        # Build the status request once; every poll re-sends the same prepared URL and headers
+        client = await self._get_client()
+        request = client.build_request(
+            "GET",
+            f"{self.GRAPH_API_BASE}/{container_id}",
+            params=self.STATUS_QUERY,
+            headers=self._auth_headers(access_token),
+            timeout=10.0
+        )
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            for attempt in range(self.MAX_STATUS_CHECKS):
-                response = await client.get(endpoint, params=params)
-                
-                if response.status_code != 200:
-                    error_data = response.json()
-                    error_msg = error_data.get("error", {}).get("message", "Unknown error")
-                    raise InstagramPublishingError(f"Failed to check container status: {error_msg}")
-                
-                result = response.json()
-                status_code = result.get("status_code")
-                
-                self.logger.debug(f"Container {container_id} status: {status_code}")
-                
-                if status_code == "FINISHED":
-                    self.logger.info(f"Container {container_id} ready for publishing")
-                    return
-                elif status_code == "ERROR":
-                    raise InstagramPublishingError(
-                        "Container processing failed. Check image format and requirements."
-                    )
-                elif status_code == "IN_PROGRESS":
-                    await asyncio.sleep(self.STATUS_CHECK_INTERVAL)
-                    continue
-                else:
-                    raise InstagramPublishingError(f"Unknown container status: {status_code}")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.MAX_WAIT_SECONDS
+        delay = self.INITIAL_STATUS_DELAY
+        
+        # Most small images finish within a few hundred ms, so check early
+        await asyncio.sleep(self.FIRST_STATUS_DELAY)
+        
+        while loop.time() < deadline:
+            status_code, retry_after = await self._get_container_status(container_id, request)
             
-            # If we get here, we've exceeded max attempts
-            raise InstagramPublishingError(
-                "Container processing timeout. Please try again later."
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Container %s status: %s", container_id, status_code)
+            
+            if status_code == "FINISHED":
+                self.logger.info("Container %s ready for publishing", container_id)
+                return
+            elif status_code == "ERROR":
+                raise InstagramPublishingError(
+                    "Container processing failed. Check image format and requirements."
+                )
+            elif status_code == "IN_PROGRESS":
+                # Exponential backoff with jitter; honor Retry-After if Graph sends one
+                wait = delay + random.uniform(0, delay * 0.1)
+                if retry_after and retry_after.isdigit():
+                    wait = max(wait, float(retry_after))
+                await asyncio.sleep(min(wait, max(deadline - loop.time(), 0)))
+                delay = min(delay * 2, self.MAX_STATUS_DELAY)
+                continue
+            else:
+                raise InstagramPublishingError(f"Unknown container status: {status_code}")
+        
+        # If we get here, we've exceeded the wait deadline
+        raise InstagramPublishingError(
+            "Container processing timeout. Please try again later."
+        )
+    
+    async def _get_container_status(
+        self,
+        container_id: str,
+        request: httpx.Request
+    ) -> tuple:
+        """
+        Fetch a container's status, sharing recent results between concurrent waiters.
+        
+        Args:
+            container_id: Instagram container ID (cache key)
+            request: Prepared status GET request for the container
+            
+        Returns:
+            Tuple of (status_code, Retry-After header or None)
+        """
+        cached = self._status_cache.get(container_id)
+        if cached is not None:
+            return cached
+        
+        lock = self._status_locks.get(container_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._status_locks[container_id] = lock
+        
+        async with lock:
+            # Another waiter may have refreshed the status while we queued
+            cached = self._status_cache.get(container_id)
+            if cached is not None:
+                return cached
+            
+            client = await self._get_client()
+            response = await client.send(request)
+            
+            result = _parse(response)
+            
+            if response.status_code != 200:
+                error_msg = result.get("error", {}).get("message", "Unknown error")
+                raise InstagramPublishingError(f"Failed to check container status: {error_msg}")
+            
+            status = (result.get("status_code"), response.headers.get("Retry-After"))
+            self._status_cache[container_id] = status
+            return status
     
     async def _publish_instagram_container(
         self,
@@ -293,24 +492,23 @@ class SocialMediaService:
         endpoint = f"{self.GRAPH_API_BASE}/{instagram_account_id}/media_publish"
         
         params = {
-            "creation_id": container_id,
-            "access_token": access_token
+            "creation_id": container_id
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(endpoint, data=params)
-            
-            if response.status_code != 200:
-                error_data = response.json()
-                error_msg = error_data.get("error", {}).get("message", "Unknown error")
-                self.logger.error(f"Instagram publishing error: {error_msg}")
-                raise InstagramPublishingError(f"Failed to publish container: {error_msg}")
-            
-            result = response.json()
-            media_id = result.get("id")
-            
-            self.logger.info(f"Published Instagram media: {media_id}")
-            return media_id
+        client = await self._get_client()
+        response = await client.post(endpoint, data=params, headers=self._auth_headers(access_token))
+        
+        result = _parse(response)
+        
+        if response.status_code != 200:
+            error_msg = result.get("error", {}).get("message", "Unknown error")
+            self.logger.error("Instagram publishing error: %s", error_msg)
+            raise InstagramPublishingError(f"Failed to publish container: {error_msg}")
+        
+        media_id = result.get("id")
+        
+        self.logger.info("Published Instagram media: %s", media_id)
+        return media_id
     
     async def publish_to_multiple_platforms(
         self,
@@ -325,51 +523,71 @@ class SocialMediaService:
             platforms: List of platform names (e.g., ["facebook", "instagram"])
             credentials: Dictionary of credentials for each platform
             content: Content dictionary with message, image_url, etc.
+                Set "upload_image" to upload image_url's bytes directly to Facebook
+                (Instagram's content publishing API only accepts image_url).
             
         Returns:
             Dictionary with results for each platform
         """
         results = {}
+        keys = []
+        tasks = []
         
-        for platform in platforms:
+        # Optionally fetch the image once and upload bytes so Meta doesn't re-crawl image_url
+        image_bytes = content.get("image_bytes")
+        image_content_type = content.get("image_content_type", "image/jpeg")
+        if image_bytes is None and content.get("upload_image") and content.get("image_url"):
             try:
-                if platform.lower() == "facebook":
-                    result = await self.publish_to_facebook(
-                        page_id=credentials.get("facebook_page_id"),
-                        access_token=credentials.get("facebook_access_token"),
-                        message=content.get("message", ""),
-                        image_url=content.get("image_url"),
-                        link=content.get("link")
-                    )
-                    results["facebook"] = result
-                    
-                elif platform.lower() == "instagram":
-                    if not content.get("image_url"):
-                        results["instagram"] = {
-                            "status": "skipped",
-                            "reason": "Instagram requires an image"
-                        }
-                        continue
-                    
-                    result = await self.publish_to_instagram(
-                        instagram_account_id=credentials.get("instagram_account_id"),
-                        access_token=credentials.get("instagram_access_token") or credentials.get("facebook_access_token"),
-                        image_url=content.get("image_url"),
-                        caption=content.get("message", "")
-                    )
-                    results["instagram"] = result
-                    
-                else:
-                    results[platform] = {
-                        "status": "error",
-                        "message": f"Unsupported platform: {platform}"
-                    }
-                    
+                image_bytes, image_content_type = await self.download_image(content["image_url"])
             except Exception as e:
-                self.logger.error(f"Error publishing to {platform}: {str(e)}")
+                self.logger.warning("Image download failed, falling back to image_url: %s", e)
+        
+        for platform in platforms:
+            if platform.lower() == "facebook":
+                keys.append("facebook")
+                tasks.append(self.publish_to_facebook(
+                    page_id=credentials.get("facebook_page_id"),
+                    access_token=credentials.get("facebook_access_token"),
+                    message=content.get("message", ""),
+                    image_url=content.get("image_url"),
+                    link=content.get("link"),
+                    image_bytes=image_bytes,
+                    image_content_type=image_content_type
+                ))
+                
+            elif platform.lower() == "instagram":
+                if not content.get("image_url"):
+                    results["instagram"] = {
+                        "status": "skipped",
+                        "reason": "Instagram requires an image"
+                    }
+                    continue
+                
+                keys.append("instagram")
+                tasks.append(self.publish_to_instagram(
+                    instagram_account_id=credentials.get("instagram_account_id"),
+                    access_token=credentials.get("instagram_access_token") or credentials.get("facebook_access_token"),
+                    image_url=content.get("image_url"),
+                    caption=content.get("message", "")
+                ))
+                
+            else:
                 results[platform] = {
                     "status": "error",
-                    "message": str(e)
+                    "message": f"Unsupported platform: {platform}"
                 }
         
+        # Platforms hit independent endpoints, so publish them concurrently
+        done = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        for platform, result in zip(keys, done):
+            if isinstance(result, Exception):
+                self.logger.error("Error publishing to %s: %s", platform, result)
+                results[platform] = {
+                    "status": "error",
+                    "message": str(result)
+                }
+            else:
+                results[platform] = result
+        
         return results
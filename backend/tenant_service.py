@@ -7,9 +7,16 @@ Handles multi-tenant architecture:
 - User workspace management
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import uuid
+from types import MappingProxyType
+from typing import Callable, Dict, Any, List, Optional
 from datetime import datetime, timezone
+from cachetools import TTLCache
+from pymongo import ReturnDocument
+
+from utils.clock import utcnow_date
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +27,29 @@ class TenantService:
     Each tenant has isolated data space.
     """
 
+    # Fields returned by tenant lookups (keeps _id and unused fields off the wire)
+    TENANT_PROJECTION = {
+        "_id": 0,
+        "tenant_id": 1,
+        "email": 1,
+        "name": 1,
+        "company_name": 1,
+        "plan_type": 1,
+        "credits_balance": 1,
+        "status": 1
+    }
+
+    # Starting credits per plan
+    _INITIAL_CREDITS = MappingProxyType({
+        "Free": 100.0,
+        "Starter": 1000.0,
+        "Professional": 5000.0,
+        "Enterprise": 20000.0
+    })
+
+    # Seconds to coalesce credit changes before syncing balances to Zoho CRM
+    ZOHO_FLUSH_INTERVAL = 2.0
+
     def __init__(self, zoho_crm_service, db):
         """
         Initialize Tenant Service.
@@ -31,8 +61,75 @@ class TenantService:
         self.zoho_crm = zoho_crm_service
         self.db = db
         self.tenants_collection = db.tenants
+
+        # Read-through cache of projected tenant docs (tenant_id -> doc, email -> tenant_id)
+        self._tenant_cache = TTLCache(maxsize=4096, ttl=10)
+        self._email_cache = TTLCache(maxsize=4096, ttl=10)
+
+        # Latest balance per tenant awaiting Zoho sync: tenant_id -> (zoho_record_id, balance)
+        self._pending_zoho: Dict[str, tuple] = {}
+        self._zoho_event = asyncio.Event()
+        self._zoho_flusher_task: Optional[asyncio.Task] = None
+        self._zoho_flush_task: Optional[asyncio.Task] = None
+
+        # Called with the tenant_id after every balance change (e.g. to drop cached responses)
+        self.on_credits_changed: Optional[Callable[[str], None]] = None
         logger.info("Tenant Service initialized")
 
+    def _schedule_zoho_sync(self, tenant_id: str, zoho_record_id: str, balance: float):
+        """Queue a tenant's latest balance for the background Zoho flusher."""
+        self._pending_zoho[tenant_id] = (zoho_record_id, balance)
+        self._zoho_event.set()
+
+        # Started lazily because the service is built before the event loop runs
+        if self._zoho_flusher_task is None or self._zoho_flusher_task.done():
+            self._zoho_flusher_task = asyncio.create_task(self._zoho_flusher())
+
+    async def _zoho_flusher(self):
+        """Batch pending balance changes and write each tenant's latest balance once."""
+        while True:
+            await self._zoho_event.wait()
+            await asyncio.sleep(self.ZOHO_FLUSH_INTERVAL)
+            self._zoho_event.clear()
+            # Shielded so close() can cancel the flusher without dropping a batch mid-write
+            self._zoho_flush_task = asyncio.create_task(self._flush_zoho())
+            await asyncio.shield(self._zoho_flush_task)
+
+    async def _flush_zoho(self):
+        """Write all pending balances to Zoho CRM."""
+        pending, self._pending_zoho = self._pending_zoho, {}
+        if not pending:
+            return
+
+        results = await asyncio.gather(*[
+            self.zoho_crm.update_record(
+                module_name="Tenants",
+                record_id=record_id,
+                record_data={"Credits_Balance": balance}
+            )
+            for record_id, balance in pending.values()
+        ], return_exceptions=True)
+
+        for tenant_id, result in zip(pending, results):
+            if isinstance(result, Exception) or result.get("status") != "success":
+                logger.warning("Zoho credits sync failed for tenant %s: %s", tenant_id, result)
+
+    async def close(self):
+        """Stop the Zoho flusher and write any pending balances."""
+        if self._zoho_flusher_task is not None:
+            self._zoho_flusher_task.cancel()
+            try:
+                await self._zoho_flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._zoho_flusher_task = None
+        # The pending batch was already swapped out by a flush in progress; let it
+        # finish before writing whatever was queued after it
+        if self._zoho_flush_task is not None:
+            await asyncio.gather(self._zoho_flush_task, return_exceptions=True)
+            self._zoho_flush_task = None
+        await self._flush_zoho()
+
     async def initialize_tenant_module(self):
         """
         Create custom Zoho module for tenants if doesn't exist.
@@ -127,7 +224,7 @@ class TenantService:
             return {"status": "success", "message": "Tenant module initialized"}
 
         except Exception as e:
-            logger.error(f"Error initializing tenant module: {e}")
+            logger.error("Error initializing tenant module: %s", e)
             return {"status": "error", "message": str(e)}
 
     async def create_tenant(
@@ -150,8 +247,8 @@ class TenantService:
             Dict with tenant details
         """
         try:
-            import uuid
-            tenant_id = str(uuid.uuid4())
+            tenant_id = uuid.uuid4().hex
+            initial_credits = self._get_initial_credits(plan_type)
 
             # Create tenant record in Zoho CRM
             tenant_data = {
@@ -160,97 +257,128 @@ class TenantService:
                 "Owner_Name": name,
                 "Company_Name": company_name or name,
                 "Plan_Type": plan_type,
-                "Credits_Balance": self._get_initial_credits(plan_type),
-                "Total_Credits_Purchased": self._get_initial_credits(plan_type),
+                "Credits_Balance": initial_credits,
+                "Total_Credits_Purchased": initial_credits,
                 "DB_Space_Used_MB": 0,
                 "LLM_Tokens_Used": 0,
                 "Status": "Active",
-                "Created_Date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                "Created_Date": utcnow_date(),
                 "Zoho_Workspace_ID": ""
             }
 
-            # Store in Zoho CRM
-            zoho_result = await self.zoho_crm.create_record(
-                module="Tenants",
-                data=tenant_data
-            )
+            # Write to Zoho CRM and the local MongoDB cache concurrently
+            zoho_task = asyncio.create_task(self.zoho_crm.create_record(
+                module_name="Tenants",
+                record_data=tenant_data
+            ))
 
-            if zoho_result.get("status") == "success":
-                # Cache in local MongoDB for fast access
+            try:
                 await self.tenants_collection.insert_one({
                     "tenant_id": tenant_id,
                     "email": email,
                     "name": name,
                     "company_name": company_name or name,
                     "plan_type": plan_type,
-                    "credits_balance": self._get_initial_credits(plan_type),
+                    "credits_balance": initial_credits,
                     "created_at": datetime.now(timezone.utc),
-                    "status": "active",
-                    "zoho_record_id": zoho_result.get("record_id")
+                    "status": "active"
                 })
+            except Exception:
+                await self._discard_zoho_tenant(zoho_task, tenant_id)
+                raise
 
-                logger.info(f"Created tenant: {tenant_id} for {email}")
+            zoho_result = await zoho_task
+
+            self._tenant_cache.pop(tenant_id, None)
+            self._email_cache.pop(email, None)
+
+            if zoho_result.get("status") == "success":
+                # Patch in the Zoho record ID now that it's known
+                await self.tenants_collection.update_one(
+                    {"tenant_id": tenant_id},
+                    {"$set": {"zoho_record_id": zoho_result.get("record_id")}}
+                )
+
+                logger.info("Created tenant: %s for %s", tenant_id, email)
 
                 return {
                     "status": "success",
                     "tenant_id": tenant_id,
                     "email": email,
                     "plan_type": plan_type,
-                    "credits_balance": self._get_initial_credits(plan_type)
+                    "credits_balance": initial_credits
                 }
             else:
+                # Keep MongoDB consistent with Zoho
+                await self.tenants_collection.delete_one({"tenant_id": tenant_id})
                 return {
                     "status": "error",
                     "message": "Failed to create tenant in Zoho CRM"
                 }
 
         except Exception as e:
-            logger.error(f"Error creating tenant: {e}")
+            logger.error("Error creating tenant: %s", e)
             return {"status": "error", "message": str(e)}
 
+    async def _discard_zoho_tenant(self, zoho_task: asyncio.Task, tenant_id: str):
+        """Delete the Zoho record created alongside a tenant whose MongoDB insert failed."""
+        try:
+            zoho_result = await zoho_task
+            if zoho_result.get("status") != "success":
+                return
+
+            record_id = zoho_result.get("record_id")
+            result = await self.zoho_crm.delete_record(module_name="Tenants", record_id=record_id)
+            if result.get("status") != "success":
+                logger.error("Orphaned Zoho tenant record %s for tenant %s: %s", record_id, tenant_id, result)
+        except Exception as e:
+            logger.error("Could not clean up Zoho record for tenant %s: %s", tenant_id, e)
+
     async def get_tenant(self, tenant_id: str) -> Optional[Dict[str, Any]]:
         """Get tenant details by ID."""
         try:
-            # Check local cache first
-            tenant = await self.tenants_collection.find_one({"tenant_id": tenant_id})
+            # Check in-process cache first
+            tenant = self._tenant_cache.get(tenant_id)
+            if tenant is not None:
+                return dict(tenant)
+
+            tenant = await self.tenants_collection.find_one(
+                {"tenant_id": tenant_id},
+                projection=self.TENANT_PROJECTION
+            )
 
             if tenant:
-                return {
-                    "tenant_id": tenant["tenant_id"],
-                    "email": tenant["email"],
-                    "name": tenant["name"],
-                    "company_name": tenant["company_name"],
-                    "plan_type": tenant["plan_type"],
-                    "credits_balance": tenant["credits_balance"],
-                    "status": tenant["status"]
-                }
+                self._tenant_cache[tenant_id] = tenant
+                return dict(tenant)
 
             return None
 
         except Exception as e:
-            logger.error(f"Error getting tenant: {e}")
+            logger.error("Error getting tenant: %s", e)
             return None
 
     async def get_tenant_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get tenant by email address."""
         try:
-            tenant = await self.tenants_collection.find_one({"email": email})
+            tenant_id = self._email_cache.get(email)
+            tenant = self._tenant_cache.get(tenant_id) if tenant_id else None
+            if tenant is not None:
+                return dict(tenant)
+
+            tenant = await self.tenants_collection.find_one(
+                {"email": email},
+                projection=self.TENANT_PROJECTION
+            )
 
             if tenant:
-                return {
-                    "tenant_id": tenant["tenant_id"],
-                    "email": tenant["email"],
-                    "name": tenant["name"],
-                    "company_name": tenant["company_name"],
-                    "plan_type": tenant["plan_type"],
-                    "credits_balance": tenant["credits_balance"],
-                    "status": tenant["status"]
-                }
+                self._tenant_cache[tenant["tenant_id"]] = tenant
+                self._email_cache[email] = tenant["tenant_id"]
+                return dict(tenant)
 
             return None
 
         except Exception as e:
-            logger.error(f"Error getting tenant by email: {e}")
+            logger.error("Error getting tenant by email: %s", e)
             return None
 
     async def update_credits_balance(
@@ -269,23 +397,28 @@ class TenantService:
             Updated tenant data
         """
         try:
-            # Update local cache
-            result = await self.tenants_collection.update_one(
+            # Increment and read back the new balance in one round trip
+            tenant = await self.tenants_collection.find_one_and_update(
                 {"tenant_id": tenant_id},
-                {"$inc": {"credits_balance": credits_change}}
+                {"$inc": {"credits_balance": credits_change}},
+                projection={"_id": 0, "credits_balance": 1, "zoho_record_id": 1},
+                return_document=ReturnDocument.AFTER
             )
 
-            if result.modified_count > 0:
-                # Sync to Zoho CRM
-                tenant = await self.tenants_collection.find_one({"tenant_id": tenant_id})
+            self._tenant_cache.pop(tenant_id, None)
+            if self.on_credits_changed:
+                self.on_credits_changed(tenant_id)
 
-                await self.zoho_crm.update_record(
-                    module="Tenants",
-                    record_id=tenant["zoho_record_id"],
-                    data={"Credits_Balance": tenant["credits_balance"]}
-                )
+            if tenant:
+                # Coalesced Zoho CRM sync; MongoDB is the source of truth
+                if tenant.get("zoho_record_id"):
+                    self._schedule_zoho_sync(
+                        tenant_id,
+                        tenant["zoho_record_id"],
+                        tenant["credits_balance"]
+                    )
 
-                logger.info(f"Updated credits for tenant {tenant_id}: {credits_change:+.2f}")
+                logger.info("Updated credits for tenant %s: %+.2f", tenant_id, credits_change)
 
                 return {
                     "status": "success",
@@ -295,7 +428,7 @@ class TenantService:
             return {"status": "error", "message": "Tenant not found"}
 
         except Exception as e:
-            logger.error(f"Error updating credits: {e}")
+            logger.error("Error updating credits: %s", e)
             return {"status": "error", "message": str(e)}
 
     async def check_credits(self, tenant_id: str, required_credits: float) -> bool:
@@ -310,21 +443,35 @@ class TenantService:
             True if sufficient credits, False otherwise
         """
         try:
-            tenant = await self.tenants_collection.find_one({"tenant_id": tenant_id})
+            # Read the balance straight from Mongo: the tenant cache is per-worker and
+            # may still hold a pre-debit document, which would let credits be overspent
+            tenant = await self.tenants_collection.find_one(
+                {"tenant_id": tenant_id},
+                {"_id": 0, "credits_balance": 1}
+            )
 
             if not tenant:
                 return False
 
-            return tenant["credits_balance"] >= required_credits
+            return tenant.get("credits_balance", 0) >= required_credits
 
         except Exception as e:
-            logger.error(f"Error checking credits: {e}")
+            logger.error("Error checking credits: %s", e)
             return False
 
     async def get_tenant_usage_stats(self, tenant_id: str) -> Dict[str, Any]:
         """Get usage statistics for a tenant."""
         try:
-            tenant = await self.tenants_collection.find_one({"tenant_id": tenant_id})
+            tenant = await self.tenants_collection.find_one(
+                {"tenant_id": tenant_id},
+                projection={
+                    "_id": 0,
+                    "credits_balance": 1,
+                    "plan_type": 1,
+                    "db_space_used_mb": 1,
+                    "llm_tokens_used": 1
+                }
+            )
 
             if not tenant:
                 return {"status": "error", "message": "Tenant not found"}
@@ -339,35 +486,36 @@ class TenantService:
             }
 
         except Exception as e:
-            logger.error(f"Error getting tenant stats: {e}")
+            logger.error("Error getting tenant stats: %s", e)
             return {"status": "error", "message": str(e)}
 
     def _get_initial_credits(self, plan_type: str) -> float:
         """Get initial credits based on plan type."""
-        credits_map = {
-            "Free": 100.0,
-            "Starter": 1000.0,
-            "Professional": 5000.0,
-            "Enterprise": 20000.0
-        }
-        return credits_map.get(plan_type, 100.0)
+        return self._INITIAL_CREDITS.get(plan_type, 100.0)
 
     async def list_all_tenants(self, status: str = "active") -> List[Dict[str, Any]]:
         """List all tenants with optional status filter."""
         try:
             query = {} if status == "all" else {"status": status}
 
-            tenants = await self.tenants_collection.find(query).to_list(length=1000)
+            # Project server-side and stream in batches instead of reshaping full documents;
+            # sorting by tenant_id keeps the order (and the 1000-row cut) stable and is served
+            # by the (status, tenant_id) index
+            cursor = self.tenants_collection.find(
+                query,
+                projection={
+                    "_id": 0,
+                    "tenant_id": 1,
+                    "email": 1,
+                    "company_name": 1,
+                    "plan_type": 1,
+                    "credits_balance": 1,
+                    "status": 1
+                }
+            ).sort("tenant_id", 1).batch_size(500).limit(1000)
 
-            return [{
-                "tenant_id": t["tenant_id"],
-                "email": t["email"],
-                "company_name": t["company_name"],
-                "plan_type": t["plan_type"],
-                "credits_balance": t["credits_balance"],
-                "status": t["status"]
-            } for t in tenants]
+            return [tenant async for tenant in cursor]
 
         except Exception as e:
-            logger.error(f"Error listing tenants: {e}")
+            logger.error("Error listing tenants: %s", e)
             return []
@@ -5,143 +5,227 @@ This script simulates the OAuth flow and tests credential storage.
 
 import asyncio
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
 from unified_social_service import UnifiedSocialService
 from zoho_auth_service import ZohoAuthService
 from zoho_crm_service import ZohoCRMService
 from dotenv import load_dotenv
 import os
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict
+
+# certifi is only needed for Atlas (mongodb+srv://) connections
+try:
+    import certifi
+    _TLS_CA_FILE = certifi.where()
+except ImportError:
+    _TLS_CA_FILE = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+
+@dataclass(frozen=True)
+class Settings:
+    """Connection settings read once from the environment at import time."""
+    mongo_url: str
+    db_name: str
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            mongo_url=os.environ.get('MONGO_URL', ''),
+            db_name=os.environ.get('DB_NAME', '')
+        )
+
+
+SETTINGS = Settings.from_env()
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def test_credential_flow():
-    """
-    Test the credential saving flow for all social platforms.
-    """
-    logger.info("=" * 80)
-    logger.info("Starting Social Media Credentials Test")
-    logger.info("=" * 80)
-
-    # Connect to MongoDB
-    mongo_url = os.environ['MONGO_URL']
+SEP = "=" * 80
+
+# Fixed report sections, built once and emitted as single log records
+_START_BANNER = "\n".join([SEP, "Starting Social Media Credentials Test", SEP])
+_SUMMARY_BANNER = "\n".join([
+    "\n" + SEP,
+    "Test Summary",
+    SEP,
+    "\n✅ = Working correctly",
+    "⚠️  = Warning (may need configuration)",
+    "❌ = Error (needs attention)",
+    "\nTo connect accounts, use the frontend or call:",
+    "GET /api/social/connect/{platform}?user_id=your_user_id",
+    "\nSupported platforms: facebook, instagram, twitter, linkedin",
+    "\n" + SEP,
+    "Test Complete!",
+    SEP
+])
+
+
+# Credential keys checked per platform: ((id key, secret key), id label)
+CRED_KEYS = {
+    "facebook": (("app_id", "app_secret"), "App ID"),
+    "instagram": (("app_id", "app_secret"), "App ID"),
+    "twitter": (("api_key", "api_secret"), "API Key"),
+    "linkedin": (("client_id", "client_secret"), "Client ID")
+}
+
+# One MongoDB client per event loop; clients are bound to the loop that created them
+_clients: Dict[asyncio.AbstractEventLoop, AsyncMongoClient] = {}
+
+
+async def get_client() -> AsyncMongoClient:
+    """Return the running loop's MongoDB client, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is not None:
+        return client
+
+    # Nothing below awaits, so no other task can create this loop's client in between
+    mongo_url = SETTINGS.mongo_url
+    if not mongo_url:
+        raise KeyError('MONGO_URL')
+    # A single-user check needs only a few sockets and little background monitoring
+    options = {
+        "maxPoolSize": 4,
+        "minPoolSize": 1,
+        "waitQueueTimeoutMS": 5000,
+        "heartbeatFrequencyMS": 30000
+    }
     if "mongodb+srv://" in mongo_url:
-        import certifi
-        client = AsyncIOMotorClient(
+        client = AsyncMongoClient(
             mongo_url,
-            tlsCAFile=certifi.where(),
+            tlsCAFile=_TLS_CA_FILE,
             serverSelectionTimeoutMS=10000,
-            connectTimeoutMS=20000
+            connectTimeoutMS=20000,
+            **options
         )
     else:
-        client = AsyncIOMotorClient(mongo_url)
+        # Skip topology discovery when talking to a single host
+        hosts = mongo_url.split("://", 1)[-1].split("/", 1)[0]
+        if "," not in hosts and "replicaSet=" not in mongo_url:
+            options["directConnection"] = True
+        client = AsyncMongoClient(mongo_url, **options)
+    _clients[loop] = client
 
-    db = client[os.environ['DB_NAME']]
+    return client
 
-    # Initialize Zoho services
-    zoho_auth = ZohoAuthService(db)
-    zoho_crm = ZohoCRMService(zoho_auth)
 
-    # Initialize UnifiedSocialService with Zoho CRM
-    unified_social = UnifiedSocialService(db, zoho_crm_service=zoho_crm)
+async def close_clients():
+    """Close the running loop's MongoDB client (call once on shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
 
-    # Test user
-    test_user_id = "test_user_123"
 
-    logger.info("\n" + "=" * 80)
-    logger.info("Test 1: Check Zoho CRM Integration Status")
-    logger.info("=" * 80)
+def _banner(title):
+    """Log lines for a test section header."""
+    return [(logging.INFO, "\n%s\n%s\n%s", SEP, title, SEP)]
+
+
+def _flush(lines):
+    """Emit a test's buffered (level, format, *args) log lines."""
+    for level, message, *args in lines:
+        logger.log(level, message, *args)
+
+
+def _check_zoho_integration(unified_social):
+    """Test 1: Check Zoho CRM integration status."""
+    lines = _banner("Test 1: Check Zoho CRM Integration Status")
 
     if unified_social.zoho_crm_service:
-        logger.info("✅ Zoho CRM service is properly initialized")
+        lines.append((logging.INFO, "✅ Zoho CRM service is properly initialized"))
     else:
-        logger.warning("❌ Zoho CRM service is NOT initialized")
+        lines.append((logging.WARNING, "❌ Zoho CRM service is NOT initialized"))
+
+    return lines
 
-    logger.info("\n" + "=" * 80)
-    logger.info("Test 2: Verify Social Platform Configurations")
-    logger.info("=" * 80)
 
-    platforms = ["facebook", "instagram", "twitter", "linkedin"]
+def _check_platform_configs(unified_social):
+    """Test 2: Verify social platform configurations."""
+    lines = _banner("Test 2: Verify Social Platform Configurations")
 
-    for platform in platforms:
-        config = unified_social.platforms.get(platform)
+    platforms = unified_social.platforms
+
+    for platform, (keys, id_label) in CRED_KEYS.items():
+        config = platforms.get(platform)
         if config:
-            logger.info(f"\n{platform.upper()}:")
-
-            # Check credentials
-            if platform in ["facebook", "instagram"]:
-                app_id = config.get("app_id")
-                app_secret = config.get("app_secret")
-                if app_id and app_secret:
-                    logger.info(f"  ✅ Credentials configured (App ID: {app_id[:10]}...)")
-                else:
-                    logger.warning(f"  ❌ Credentials NOT configured")
-
-            elif platform == "twitter":
-                api_key = config.get("api_key")
-                api_secret = config.get("api_secret")
-                if api_key and api_secret:
-                    logger.info(f"  ✅ Credentials configured (API Key: {api_key[:10]}...)")
-                else:
-                    logger.warning(f"  ❌ Credentials NOT configured")
-
-            elif platform == "linkedin":
-                client_id = config.get("client_id")
-                client_secret = config.get("client_secret")
-                if client_id and client_secret:
-                    logger.info(f"  ✅ Credentials configured (Client ID: {client_id[:10]}...)")
-                else:
-                    logger.warning(f"  ❌ Credentials NOT configured")
+            lines.append((logging.INFO, "\n%s:", platform.upper()))
+
+            # Check credentials: every key in the table must be set
+            vals = [config.get(key) for key in keys]
+            if all(vals):
+                lines.append((logging.INFO, "  ✅ Credentials configured (%s: %s...)", id_label, vals[0][:10]))
+            else:
+                lines.append((logging.WARNING, "  ❌ Credentials NOT configured"))
         else:
-            logger.warning(f"❌ {platform.upper()} configuration not found")
+            lines.append((logging.WARNING, "❌ %s configuration not found", platform.upper()))
+
+    return lines
 
-    logger.info("\n" + "=" * 80)
-    logger.info("Test 3: Check MongoDB Collections")
-    logger.info("=" * 80)
+
+async def _check_collections(db):
+    """Test 3: Check MongoDB collections."""
+    lines = _banner("Test 3: Check MongoDB Collections")
 
     required_collections = ["oauth_states", "social_accounts", "social_posts"]
-    existing_collections = await db.list_collection_names()
+    existing_collections = set(await db.list_collection_names())
+    missing_collections = set(required_collections) - existing_collections
 
     for collection in required_collections:
-        if collection in existing_collections:
-            logger.info(f"✅ Collection '{collection}' exists")
+        if collection not in missing_collections:
+            lines.append((logging.INFO, "✅ Collection '%s' exists", collection))
         else:
-            logger.warning(f"❌ Collection '{collection}' NOT found")
+            lines.append((logging.WARNING, "❌ Collection '%s' NOT found", collection))
 
-    logger.info("\n" + "=" * 80)
-    logger.info("Test 4: Check Existing Connected Accounts")
-    logger.info("=" * 80)
+    return lines
 
-    result = await unified_social.get_connected_accounts(user_id=test_user_id)
 
-    if result.get("status") == "success":
-        accounts = result.get("accounts", [])
-        logger.info(f"Found {len(accounts)} connected account(s) for user '{test_user_id}'")
+async def _check_connected_accounts(unified_social, test_user_id):
+    """Test 4: Check existing connected accounts."""
+    lines = _banner("Test 4: Check Existing Connected Accounts")
 
-        for account in accounts:
+    # Stream only the fields this report prints instead of materializing the account list
+    account_lines = []
+    account_count = 0
+    try:
+        async for account in unified_social.stream_connected_accounts(
+            test_user_id,
+            projection={"_id": 0, "platform": 1, "account_name": 1, "account_id": 1, "status": 1}
+        ):
             platform = account.get("platform", "unknown")
             account_name = account.get("account_name", "N/A")
             account_id = account.get("account_id", "N/A")
             status = account.get("status", "unknown")
+            account_count += 1
 
-            logger.info(f"\n  Platform: {platform.upper()}")
-            logger.info(f"  Account Name: {account_name}")
-            logger.info(f"  Account ID: {account_id}")
-            logger.info(f"  Status: {status}")
-    else:
-        logger.warning(f"Failed to get accounts: {result.get('error')}")
+            account_lines.append((logging.INFO, "\n  Platform: %s", platform.upper()))
+            account_lines.append((logging.INFO, "  Account Name: %s", account_name))
+            account_lines.append((logging.INFO, "  Account ID: %s", account_id))
+            account_lines.append((logging.INFO, "  Status: %s", status))
+    except Exception as e:
+        lines.append((logging.WARNING, "Failed to get accounts: %s", e))
+        return lines
 
-    logger.info("\n" + "=" * 80)
-    logger.info("Test 5: Verify Zoho CRM Credential Storage")
-    logger.info("=" * 80)
+    lines.append((logging.INFO, "Found %s connected account(s) for user '%s'", account_count, test_user_id))
+    lines.extend(account_lines)
+
+    return lines
+
+
+async def _check_zoho_credentials(zoho_crm, test_user_id):
+    """Test 5: Verify Zoho CRM credential storage."""
+    lines = _banner("Test 5: Verify Zoho CRM Credential Storage")
 
     # Try to search for credentials in Zoho CRM
     try:
+        # Load the access token first; ZohoAuthService single-flights it for any other Zoho callers
+        await zoho_crm.auth_service.get_valid_access_token(test_user_id)
+
         zoho_result = await zoho_crm.search_records(
             module_name="Social_Media_Credentials",
             search_criteria=f"User_ID = '{test_user_id}'",
@@ -150,7 +234,7 @@ async def test_credential_flow():
 
         if zoho_result.get("status") == "success":
             records = zoho_result.get("records", [])
-            logger.info(f"✅ Found {len(records)} credential record(s) in Zoho CRM")
+            lines.append((logging.INFO, "✅ Found %s credential record(s) in Zoho CRM", len(records)))
 
             for record in records:
                 platform = record.get("Platform", "N/A")
@@ -158,56 +242,113 @@ async def test_credential_flow():
                 status = record.get("Status", "N/A")
                 connected_at = record.get("Connected_At", "N/A")
 
-                logger.info(f"\n  Platform: {platform}")
-                logger.info(f"  Account Name: {account_name}")
-                logger.info(f"  Status: {status}")
-                logger.info(f"  Connected At: {connected_at}")
+                lines.append((logging.INFO, "\n  Platform: %s", platform))
+                lines.append((logging.INFO, "  Account Name: %s", account_name))
+                lines.append((logging.INFO, "  Status: %s", status))
+                lines.append((logging.INFO, "  Connected At: %s", connected_at))
         else:
-            logger.warning(f"⚠️  Zoho CRM search returned: {zoho_result.get('message', 'Unknown status')}")
+            lines.append((logging.WARNING, "⚠️  Zoho CRM search returned: %s", zoho_result.get('message', 'Unknown status')))
     except Exception as e:
-        logger.error(f"❌ Error querying Zoho CRM: {str(e)}")
+        lines.append((logging.ERROR, "❌ Error querying Zoho CRM: %s", e))
 
-    logger.info("\n" + "=" * 80)
-    logger.info("Test 6: OAuth URL Generation Test")
-    logger.info("=" * 80)
+    return lines
+
+
+async def _check_oauth_urls(unified_social, test_user_id):
+    """Test 6: OAuth URL generation."""
+    lines = _banner("Test 6: OAuth URL Generation Test")
 
     redirect_uri = "http://localhost:8000/api/social/callback/facebook"
 
-    for platform in ["facebook", "instagram", "twitter", "linkedin"]:
-        try:
-            auth_result = await unified_social.get_auth_url(
+    # Generate OAuth URLs concurrently, bounded so more platforms don't stampede the auth service
+    auth_platforms = ["facebook", "instagram", "twitter", "linkedin"]
+    semaphore = asyncio.Semaphore(int(os.getenv("SOCIAL_AUTH_CONCURRENCY", "8")))
+
+    async def get_auth_url(platform):
+        async with semaphore:
+            return await unified_social.get_auth_url(
                 platform=platform,
                 user_id=test_user_id,
                 redirect_uri=redirect_uri
             )
 
-            if auth_result.get("status") == "success":
-                auth_url = auth_result.get("authorization_url", "")
-                logger.info(f"✅ {platform.upper()}: OAuth URL generated ({len(auth_url)} chars)")
-            else:
-                error = auth_result.get("error", "Unknown error")
-                logger.warning(f"⚠️  {platform.upper()}: {error}")
-        except Exception as e:
-            logger.error(f"❌ {platform.upper()}: {str(e)}")
+    auth_results = await asyncio.gather(
+        *[get_auth_url(platform) for platform in auth_platforms],
+        return_exceptions=True
+    )
+
+    for platform, auth_result in zip(auth_platforms, auth_results):
+        if isinstance(auth_result, Exception):
+            lines.append((logging.ERROR, "❌ %s: %s", platform.upper(), auth_result))
+        elif auth_result.get("status") == "success":
+            auth_url = auth_result.get("authorization_url", "")
+            lines.append((logging.INFO, "✅ %s: OAuth URL generated (%s chars)", platform.upper(), len(auth_url)))
+        else:
+            error = auth_result.get("error", "Unknown error")
+            lines.append((logging.WARNING, "⚠️  %s: %s", platform.upper(), error))
+
+    return lines
+
+
+async def test_credential_flow():
+    """
+    Test the credential saving flow for all social platforms.
+    """
+    logger.info(_START_BANNER)
+
+    # Connect to MongoDB (reuses this loop's client across runs)
+    client = await get_client()
+    db = client[SETTINGS.db_name]
+
+    # Initialize Zoho services
+    zoho_auth = ZohoAuthService(db)
+    zoho_crm = ZohoCRMService(zoho_auth)
+
+    # Initialize UnifiedSocialService with Zoho CRM
+    unified_social = UnifiedSocialService(db, zoho_crm_service=zoho_crm)
+
+    # Test user
+    test_user_id = "test_user_123"
 
-    logger.info("\n" + "=" * 80)
-    logger.info("Test Summary")
-    logger.info("=" * 80)
+    # Tests 1-2 only inspect local configuration
+    _flush(_check_zoho_integration(unified_social))
+    _flush(_check_platform_configs(unified_social))
+
+    # Tests 3-6 hit independent backends (the MongoDB account lookup and the Zoho CRM
+    # search overlap fully), so overlap their I/O and log each block in order
+    results = await asyncio.gather(
+        _check_collections(db),
+        _check_connected_accounts(unified_social, test_user_id),
+        _check_zoho_credentials(zoho_crm, test_user_id),
+        _check_oauth_urls(unified_social, test_user_id),
+        return_exceptions=True
+    )
+
+    for test_number, lines in enumerate(results, start=3):
+        if isinstance(lines, Exception):
+            logger.error("❌ Test %s failed: %s", test_number, lines)
+        else:
+            _flush(lines)
 
-    logger.info("\n✅ = Working correctly")
-    logger.info("⚠️  = Warning (may need configuration)")
-    logger.info("❌ = Error (needs attention)")
+    logger.info(_SUMMARY_BANNER)
 
-    logger.info("\nTo connect accounts, use the frontend or call:")
-    logger.info("GET /api/social/connect/{platform}?user_id=your_user_id")
-    logger.info("\nSupported platforms: facebook, instagram, twitter, linkedin")
+    await unified_social.close()
 
-    logger.info("\n" + "=" * 80)
-    logger.info("Test Complete!")
-    logger.info("=" * 80)
 
-    # Close connection
-    client.close()
+async def _main():
+    """Run the credential test, closing MongoDB clients on the way out."""
+    try:
+        await test_credential_flow()
+    finally:
+        await close_clients()
 
 if __name__ == "__main__":
-    asyncio.run(test_credential_flow())
+    # Opt-in libuv event loop (POSIX only; uvloop is optional)
+    if os.getenv("USE_UVLOOP") == "1":
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            logger.warning("USE_UVLOOP=1 but uvloop is not installed; using the default event loop")
+
+    asyncio.run(_main())
@@ -4,16 +4,37 @@ Handles all social media platform integrations with OAuth and posting
 Supports: Facebook, Instagram, Twitter, LinkedIn
 """
 
+import asyncio
 import logging
 import httpx
 import os
-from typing import Dict, Any, List, Optional
+import secrets
+import weakref
+from typing import Dict, Any, List, Optional, AsyncIterator, Awaitable, Callable
 from datetime import datetime, timezone, timedelta
-import base64
-import json
+from urllib.parse import urlencode, quote
+from cachetools import TTLCache
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
+
+from utils.http import response_json
 
 logger = logging.getLogger(__name__)
 
+# OAuth scopes requested per platform
+_FB_SCOPE = "pages_manage_posts,pages_read_engagement,pages_show_list,instagram_basic,instagram_content_publish,public_profile"
+_IG_SCOPE = "instagram_basic,instagram_content_publish,pages_show_list,pages_read_engagement"
+_TW_SCOPE = "tweet.read tweet.write users.read offline.access"
+_LI_SCOPE = "w_member_social r_liteprofile r_emailaddress"
+
+# Credentials each platform needs before OAuth can start: (display name, config keys, env vars)
+_REQUIRED_CREDENTIALS = {
+    "facebook": ("Facebook", ("app_id", "app_secret"), "FACEBOOK_APP_ID and FACEBOOK_APP_SECRET"),
+    "instagram": ("Instagram", ("app_id", "app_secret"), "FACEBOOK_APP_ID and FACEBOOK_APP_SECRET"),
+    "twitter": ("Twitter", ("api_key", "api_secret"), "TWITTER_API_KEY and TWITTER_API_SECRET"),
+    "linkedin": ("LinkedIn", ("client_id", "client_secret"), "LINKEDIN_CLIENT_ID and LINKEDIN_CLIENT_SECRET")
+}
+
 
 class UnifiedSocialService:
     """
@@ -21,9 +42,29 @@ class UnifiedSocialService:
     Handles OAuth, posting, analytics, and account management.
     """
 
-    def __init__(self, db, zoho_crm_service=None):
+    TOKEN_REFRESH_MARGIN = timedelta(minutes=5)  # Refresh tokens expiring sooner than this
+    MAX_CONCURRENT_POSTS_PER_PLATFORM = 20  # Cap on in-flight posts to any one platform API
+    CONTAINER_POLL_DELAYS = (0.5, 1.0, 2.0, 4.0, 8.0)  # Backoff between Instagram container status checks
+    # Fields the account listings and dashboard render; tokens stay in Mongo
+    ACCOUNT_SUMMARY_FIELDS = {
+        "_id": 0,
+        "account_id": 1,
+        "account_name": 1,
+        "account_username": 1,
+        "platform": 1,
+        "profile_picture": 1,
+        "status": 1,
+        "connected_at": 1,
+        "last_used": 1,
+        "account_info": 1,
+        "credentials.token_expires_at": 1
+    }
+
+    def __init__(self, db, zoho_crm_service=None, oauth_manager=None):
         self.db = db
         self.zoho_crm_service = zoho_crm_service
+        # When set, OAuth states are signed by the OAuthManager instead of stored in Mongo
+        self.oauth_manager = oauth_manager
 
         # Platform configurations
         self.platforms = {
@@ -58,8 +99,153 @@ class UnifiedSocialService:
             }
         }
 
+        # Authorization URL builders with the per-platform query (client id, scope)
+        # encoded once; each request only appends its redirect_uri and state
+        self._auth_url_builders: Dict[str, Callable[[str, str], str]] = {
+            "facebook": self._auth_url_builder(self.platforms["facebook"]["auth_url"], {
+                "client_id": self.platforms["facebook"]["app_id"],
+                "scope": _FB_SCOPE
+            }),
+            # Instagram uses Facebook OAuth
+            "instagram": self._auth_url_builder("https://www.facebook.com/v18.0/dialog/oauth", {
+                "client_id": self.platforms["instagram"]["app_id"],
+                "scope": _IG_SCOPE
+            }),
+            "twitter": self._auth_url_builder(self.platforms["twitter"]["auth_url"], {
+                "client_id": self.platforms["twitter"]["api_key"],
+                "response_type": "code",
+                "scope": _TW_SCOPE
+            }),
+            "linkedin": self._auth_url_builder(self.platforms["linkedin"]["auth_url"], {
+                "client_id": self.platforms["linkedin"]["client_id"],
+                "response_type": "code",
+                "scope": _LI_SCOPE
+            })
+        }
+
+        # Per-platform OAuth code exchange and posting handlers
+        self._exchange_handlers: Dict[str, Callable[[str, str, str], Awaitable[Dict[str, Any]]]] = {
+            "facebook": self._exchange_facebook_code,
+            "instagram": self._exchange_instagram_code,
+            "twitter": self._exchange_twitter_code,
+            "linkedin": self._exchange_linkedin_code
+        }
+        self._post_handlers: Dict[str, Callable[[Dict, Dict], Awaitable[Dict[str, Any]]]] = {
+            "facebook": self._post_to_facebook,
+            "instagram": self._post_to_instagram,
+            "twitter": self._post_to_twitter,
+            "linkedin": self._post_to_linkedin
+        }
+
+        # Bound concurrent posts per platform so fan-outs stay under API rate limits
+        self._post_semaphores = {
+            platform: asyncio.Semaphore(self.MAX_CONCURRENT_POSTS_PER_PLATFORM)
+            for platform in self._post_handlers
+        }
+
+        # Set once ensure_indexes() has run
+        self._indexes_ensured = False
+
+        # Active account documents by (user_id, account_id), so repeat posts skip the lookup
+        self._account_cache = TTLCache(maxsize=10000, ttl=60)
+
+        # Per-account locks so concurrent posts trigger a single token refresh
+        self._refresh_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+        # Fire-and-forget writes (e.g. last_used), referenced until they finish
+        self._background_tasks = set()
+
+        # One pooled client for every OAuth and posting call, so consecutive Graph,
+        # Twitter and LinkedIn requests reuse warm keep-alive connections. Media posts
+        # can be slow to answer, hence the 30s timeout; HTTP/2 multiplexes concurrent
+        # posts to a host over a few connections, so a small pool is enough
+        self._http = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0
+            )
+        )
+
         logger.info("UnifiedSocialService initialized for Facebook, Instagram, Twitter, LinkedIn")
 
+    @staticmethod
+    def _auth_url_builder(auth_url: str, fixed_params: Dict[str, Any]) -> Callable[[str, str], str]:
+        """
+        Pre-encode a platform's fixed OAuth query parameters.
+
+        Args:
+            auth_url: Platform authorization endpoint
+            fixed_params: Parameters that are the same for every request
+
+        Returns:
+            Function mapping (state, redirect_uri) to the full authorization URL
+        """
+        # quote (not quote_plus) so space-separated scopes are sent as %20
+        prefix = f"{auth_url}?{urlencode(fixed_params, quote_via=quote)}&"
+
+        def build(state: str, redirect_uri: str) -> str:
+            return prefix + urlencode({"redirect_uri": redirect_uri, "state": state}, quote_via=quote)
+
+        return build
+
+    async def close(self):
+        """Finish background writes and close the shared HTTP client (called on application shutdown)."""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self._http.aclose()
+
+    def _run_in_background(self, coro):
+        """Schedule a write without awaiting it; failures are logged."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
+
+    def _on_background_done(self, task: asyncio.Task):
+        """Release a finished background task and log its failure."""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Background write failed: {str(task.exception())}")
+
+    def _invalidate_accounts(self, user_id: str, account_ids: List[str]):
+        """Drop cached account documents after they are (re)connected or disconnected."""
+        for account_id in account_ids:
+            self._account_cache.pop((user_id, account_id), None)
+
+    async def ensure_indexes(self):
+        """
+        Create the indexes this service queries by.
+
+        Called once on application startup, never from __init__ or request
+        handlers; later calls return without issuing any index commands.
+        """
+        if self._indexes_ensured:
+            return
+
+        await self.db.oauth_states.create_index([("state", 1)], unique=True)
+
+        # TTL index: MongoDB deletes states once expires_at has passed
+        try:
+            await self.db.oauth_states.create_index("expires_at", expireAfterSeconds=0)
+        except OperationFailure as e:
+            # IndexOptionsConflict: convert an existing plain expires_at index in place
+            if e.code != 85:
+                raise
+            await self.db.command(
+                "collMod",
+                "oauth_states",
+                index={"keyPattern": {"expires_at": 1}, "expireAfterSeconds": 0}
+            )
+
+        # Account lookups by (user, account) and listings by (user, status[, platform])
+        await self.db.social_accounts.create_index("account_id", unique=True)
+        await self.db.social_accounts.create_index([("user_id", 1), ("account_id", 1)], unique=True)
+        await self.db.social_accounts.create_index([("user_id", 1), ("status", 1), ("platform", 1)])
+
+        self._indexes_ensured = True
+
     # ==================== ACCOUNT CONNECTION ====================
 
     async def get_auth_url(self, platform: str, user_id: str, redirect_uri: str) -> Dict[str, Any]:
@@ -75,85 +261,36 @@ class UnifiedSocialService:
             Dict with authorization_url and state
         """
         try:
-            import secrets
-            state = secrets.token_urlsafe(32)
-
             # Check if credentials are configured for this platform
             platform_config = self.platforms.get(platform)
             if not platform_config:
                 raise ValueError(f"Unsupported platform: {platform}")
 
             # Validate credentials
-            if platform == "facebook" or platform == "instagram":
-                if not platform_config.get("app_id") or not platform_config.get("app_secret"):
-                    raise ValueError(
-                        f"{platform.capitalize()} credentials not configured. "
-                        f"Please set FACEBOOK_APP_ID and FACEBOOK_APP_SECRET in .env file"
-                    )
-            elif platform == "twitter":
-                if not platform_config.get("api_key") or not platform_config.get("api_secret"):
-                    raise ValueError(
-                        "Twitter credentials not configured. "
-                        "Please set TWITTER_API_KEY and TWITTER_API_SECRET in .env file"
-                    )
-            elif platform == "linkedin":
-                if not platform_config.get("client_id") or not platform_config.get("client_secret"):
-                    raise ValueError(
-                        "LinkedIn credentials not configured. "
-                        "Please set LINKEDIN_CLIENT_ID and LINKEDIN_CLIENT_SECRET in .env file"
-                    )
-
-            # Store state for verification
-            await self.db.oauth_states.insert_one({
-                "state": state,
-                "user_id": user_id,
-                "platform": platform,
-                "redirect_uri": redirect_uri,
-                "created_at": datetime.now(timezone.utc),
-                "expires_at": datetime.now(timezone.utc) + timedelta(minutes=10)
-            })
-
-            if platform == "facebook":
-                params = {
-                    "client_id": self.platforms["facebook"]["app_id"],
-                    "redirect_uri": redirect_uri,
-                    "state": state,
-                    "scope": "pages_manage_posts,pages_read_engagement,pages_show_list,instagram_basic,instagram_content_publish,public_profile"
-                }
-                auth_url = f"{self.platforms['facebook']['auth_url']}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
-
-            elif platform == "instagram":
-                # Instagram uses Facebook OAuth
-                params = {
-                    "client_id": self.platforms["instagram"]["app_id"],
-                    "redirect_uri": redirect_uri,
-                    "state": state,
-                    "scope": "instagram_basic,instagram_content_publish,pages_show_list,pages_read_engagement"
-                }
-                auth_url = f"https://www.facebook.com/v18.0/dialog/oauth?{'&'.join(f'{k}={v}' for k, v in params.items())}"
+            display_name, keys, env_vars = _REQUIRED_CREDENTIALS[platform]
+            if not all(platform_config.get(key) for key in keys):
+                raise ValueError(
+                    f"{display_name} credentials not configured. "
+                    f"Please set {env_vars} in .env file"
+                )
 
-            elif platform == "twitter":
-                params = {
-                    "client_id": self.platforms["twitter"]["api_key"],
-                    "redirect_uri": redirect_uri,
+            if self.oauth_manager:
+                # Signed state, verified in-process by the callback
+                state = await self.oauth_manager.generate_state(user_id, platform, redirect_uri)
+            else:
+                # Store state for verification
+                state = secrets.token_urlsafe(32)
+                now = datetime.now(timezone.utc)
+                await self.db.oauth_states.insert_one({
                     "state": state,
-                    "response_type": "code",
-                    "scope": "tweet.read tweet.write users.read offline.access"
-                }
-                auth_url = f"{self.platforms['twitter']['auth_url']}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
-
-            elif platform == "linkedin":
-                params = {
-                    "client_id": self.platforms["linkedin"]["client_id"],
+                    "user_id": user_id,
+                    "platform": platform,
                     "redirect_uri": redirect_uri,
-                    "state": state,
-                    "response_type": "code",
-                    "scope": "w_member_social r_liteprofile r_emailaddress"
-                }
-                auth_url = f"{self.platforms['linkedin']['auth_url']}?{'&'.join(f'{k}={v}' for k, v in params.items())}"
+                    "created_at": now,
+                    "expires_at": now + timedelta(minutes=10)
+                })
 
-            else:
-                raise ValueError(f"Unsupported platform: {platform}")
+            auth_url = self._auth_url_builders[platform](state, redirect_uri)
 
             logger.info(f"Generated OAuth URL for {platform} successfully")
             return {
@@ -176,7 +313,9 @@ class UnifiedSocialService:
         platform: str,
         code: str,
         state: str,
-        user_id: str
+        user_id: str,
+        redirect_uri: Optional[str] = None,
+        state_validated: bool = False
     ) -> Dict[str, Any]:
         """
         Handle OAuth callback and exchange code for access token.
@@ -186,41 +325,50 @@ class UnifiedSocialService:
             code: Authorization code
             state: State parameter for verification
             user_id: User identifier
+            redirect_uri: Redirect URI taken from the validated state (only used
+                          when state_validated is True)
+            state_validated: Whether the caller already validated and consumed the
+                             state with the OAuthManager
 
         Returns:
             Dict with status and account info
         """
         try:
-            # Verify state
-            state_doc = await self.db.oauth_states.find_one({
-                "state": state,
-                "user_id": user_id,
-                "platform": platform
-            })
+            exchange = self._exchange_handlers.get(platform)
+            if not exchange:
+                return {"status": "error", "error": f"Unsupported platform: {platform}"}
 
-            if not state_doc:
-                return {"status": "error", "error": "Invalid state parameter"}
+            stored_state = False
+            if state_validated:
+                if not redirect_uri:
+                    return {"status": "error", "error": "Missing redirect URI for validated state"}
+            elif self.oauth_manager:
+                # Signed states are verified (and consumed) by the OAuthManager
+                validation = await self.oauth_manager.validate_state(state, platform, user_id)
+                if not validation["valid"]:
+                    return {"status": "error", "error": "Invalid or expired state parameter"}
+                redirect_uri = validation["redirect_uri"]
+            else:
+                # Verify state (expired states fail here even before the TTL monitor removes them)
+                state_doc = await self.db.oauth_states.find_one({
+                    "state": state,
+                    "user_id": user_id,
+                    "platform": platform,
+                    "expires_at": {"$gt": datetime.now(timezone.utc)}
+                })
 
-            # Check if expired
-            if datetime.now(timezone.utc) > datetime.fromisoformat(state_doc["expires_at"]):
-                return {"status": "error", "error": "State expired"}
+                if not state_doc:
+                    return {"status": "error", "error": "Invalid or expired state parameter"}
 
-            redirect_uri = state_doc["redirect_uri"]
+                redirect_uri = state_doc["redirect_uri"]
+                stored_state = True
 
             # Exchange code for token
-            if platform == "facebook":
-                result = await self._exchange_facebook_code(code, redirect_uri, user_id)
-            elif platform == "instagram":
-                result = await self._exchange_instagram_code(code, redirect_uri, user_id)
-            elif platform == "twitter":
-                result = await self._exchange_twitter_code(code, redirect_uri, user_id)
-            elif platform == "linkedin":
-                result = await self._exchange_linkedin_code(code, redirect_uri, user_id)
-            else:
-                return {"status": "error", "error": f"Unsupported platform: {platform}"}
+            result = await exchange(code, redirect_uri, user_id)
 
-            # Clean up state
-            await self.db.oauth_states.delete_one({"state": state})
+            # Clean up state (signed states are never stored)
+            if stored_state:
+                await self.db.oauth_states.delete_one({"state": state})
 
             return result
 
@@ -231,365 +379,93 @@ class UnifiedSocialService:
     async def _exchange_facebook_code(self, code: str, redirect_uri: str, user_id: str) -> Dict[str, Any]:
         """Exchange Facebook authorization code for access token."""
         try:
-            async with httpx.AsyncClient() as client:
-                # Get access token
-                token_params = {
-                    "client_id": self.platforms["facebook"]["app_id"],
-                    "client_secret": self.platforms["facebook"]["app_secret"],
-                    "redirect_uri": redirect_uri,
-                    "code": code
-                }
-
-                response = await client.get(
-                    self.platforms["facebook"]["token_url"],
-                    params=token_params
-                )
-
-                if response.status_code != 200:
-                    logger.error(f"Facebook token exchange failed: {response.text}")
-                    return {"status": "error", "error": "Token exchange failed"}
-
-                token_data = response.json()
-                access_token = token_data["access_token"]
-
-                # Get user pages (for posting)
-                pages_response = await client.get(
-                    f"{self.platforms['facebook']['api_base']}/me/accounts",
-                    params={"access_token": access_token}
-                )
-
-                pages_data = pages_response.json()
-
-                # Store each page as separate account
-                accounts_created = []
-                for page in pages_data.get("data", []):
-                    account_id = f"fb_{page['id']}"
-
-                    account_doc = {
-                        "user_id": user_id,
-                        "platform": "facebook",
-                        "account_id": account_id,
-                        "account_name": page.get("name"),
-                        "account_username": page.get("name"),
-                        "profile_picture": None,
-                        "auth_type": "oauth",
-                        "credentials": {
-                            "access_token": page["access_token"],  # Page access token
-                            "page_id": page["id"],
-                            "token_expires_at": None  # Page tokens don't expire
-                        },
-                        "account_info": {
-                            "page_id": page["id"],
-                            "category": page.get("category"),
-                            "tasks": page.get("tasks", [])
-                        },
-                        "status": "active",
-                        "connected_at": datetime.now(timezone.utc),
-                        "updated_at": datetime.now(timezone.utc)
-                    }
-
-                    await self.db.social_accounts.update_one(
-                        {"user_id": user_id, "account_id": account_id},
-                        {"$set": account_doc},
-                        upsert=True
-                    )
-
-                    # Also save to Zoho CRM for centralized credential management
-                    if self.zoho_crm_service:
-                        try:
-                            zoho_credential_record = {
-                                "Name": f"{user_id}_facebook_{page['id']}",
-                                "User_ID": user_id,
-                                "Platform": "Facebook",
-                                "Account_ID": account_id,
-                                "Account_Name": page.get("name"),
-                                "Auth_Type": "oauth",
-                                "Status": "active",
-                                "Connected_At": datetime.now(timezone.utc).isoformat(),
-                                "Last_Updated": datetime.now(timezone.utc).isoformat()
-                            }
-
-                            # Check if already exists
-                            existing = await self.zoho_crm_service.search_records(
-                                module_name="Social_Media_Credentials",
-                                search_criteria=f"Account_ID = '{account_id}'",
-                                user_id=user_id
-                            )
-
-                            if existing.get("status") == "success" and existing.get("records"):
-                                # Update existing
-                                record_id = existing["records"][0]["id"]
-                                await self.zoho_crm_service.update_record(
-                                    module_name="Social_Media_Credentials",
-                                    record_id=record_id,
-                                    updates=zoho_credential_record,
-                                    user_id=user_id
-                                )
-                            else:
-                                # Create new
-                                await self.zoho_crm_service.create_record(
-                                    module_name="Social_Media_Credentials",
-                                    record_data=zoho_credential_record,
-                                    user_id=user_id
-                                )
-                            logger.info(f"Saved Facebook credentials to Zoho CRM: {account_id}")
-                        except Exception as e:
-                            logger.warning(f"Failed to save to Zoho CRM (continuing anyway): {str(e)}")
-
-                    accounts_created.append({
-                        "account_id": account_id,
-                        "name": page.get("name"),
-                        "platform": "facebook"
-                    })
-
-                return {
-                    "status": "success",
-                    "platform": "facebook",
-                    "accounts": accounts_created,
-                    "message": f"Connected {len(accounts_created)} Facebook page(s)"
-                }
-
-        except Exception as e:
-            logger.error(f"Facebook code exchange error: {str(e)}")
-            return {"status": "error", "error": str(e)}
-
-    async def _exchange_instagram_code(self, code: str, redirect_uri: str, user_id: str) -> Dict[str, Any]:
-        """Exchange Instagram authorization code for access token."""
-        try:
-            # Instagram uses Facebook Graph API
-            async with httpx.AsyncClient() as client:
-                # Get access token
-                token_params = {
-                    "client_id": self.platforms["instagram"]["app_id"],
-                    "client_secret": self.platforms["instagram"]["app_secret"],
-                    "redirect_uri": redirect_uri,
-                    "code": code
-                }
-
-                response = await client.get(
-                    f"https://graph.facebook.com/v18.0/oauth/access_token",
-                    params=token_params
-                )
-
-                if response.status_code != 200:
-                    return {"status": "error", "error": "Token exchange failed"}
-
-                token_data = response.json()
-                access_token = token_data["access_token"]
-
-                # Get Facebook pages
-                pages_response = await client.get(
-                    f"{self.platforms['instagram']['api_base']}/me/accounts",
-                    params={"access_token": access_token}
-                )
-
-                pages_data = pages_response.json()
-                accounts_created = []
-
-                # For each page, get connected Instagram Business account
-                for page in pages_data.get("data", []):
-                    ig_response = await client.get(
-                        f"{self.platforms['instagram']['api_base']}/{page['id']}",
-                        params={
-                            "fields": "instagram_business_account",
-                            "access_token": page["access_token"]
-                        }
-                    )
-
-                    ig_data = ig_response.json()
-
-                    if "instagram_business_account" in ig_data:
-                        ig_account_id = ig_data["instagram_business_account"]["id"]
-
-                        # Get Instagram account info
-                        ig_info_response = await client.get(
-                            f"{self.platforms['instagram']['api_base']}/{ig_account_id}",
-                            params={
-                                "fields": "username,profile_picture_url,followers_count,follows_count,media_count",
-                                "access_token": page["access_token"]
-                            }
-                        )
-
-                        ig_info = ig_info_response.json()
-
-                        account_id = f"ig_{ig_account_id}"
-
-                        account_doc = {
-                            "user_id": user_id,
-                            "platform": "instagram",
-                            "account_id": account_id,
-                            "account_name": ig_info.get("username"),
-                            "account_username": ig_info.get("username"),
-                            "profile_picture": ig_info.get("profile_picture_url"),
-                            "auth_type": "oauth",
-                            "credentials": {
-                                "access_token": page["access_token"],
-                                "instagram_business_id": ig_account_id,
-                                "page_id": page["id"]
-                            },
-                            "account_info": {
-                                "followers": ig_info.get("followers_count", 0),
-                                "following": ig_info.get("follows_count", 0),
-                                "posts_count": ig_info.get("media_count", 0),
-                                "business_account": True
-                            },
-                            "status": "active",
-                            "connected_at": datetime.now(timezone.utc),
-                            "updated_at": datetime.now(timezone.utc)
-                        }
-
-                        await self.db.social_accounts.update_one(
-                            {"user_id": user_id, "account_id": account_id},
-                            {"$set": account_doc},
-                            upsert=True
-                        )
-
-                        # Also save to Zoho CRM for centralized credential management
-                        if self.zoho_crm_service:
-                            try:
-                                zoho_credential_record = {
-                                    "Name": f"{user_id}_instagram_{ig_account_id}",
-                                    "User_ID": user_id,
-                                    "Platform": "Instagram",
-                                    "Account_ID": account_id,
-                                    "Account_Name": ig_info.get("username"),
-                                    "Auth_Type": "oauth",
-                                    "Status": "active",
-                                    "Connected_At": datetime.now(timezone.utc).isoformat(),
-                                    "Last_Updated": datetime.now(timezone.utc).isoformat()
-                                }
-
-                                # Check if already exists
-                                existing = await self.zoho_crm_service.search_records(
-                                    module_name="Social_Media_Credentials",
-                                    search_criteria=f"Account_ID = '{account_id}'",
-                                    user_id=user_id
-                                )
-
-                                if existing.get("status") == "success" and existing.get("records"):
-                                    # Update existing
-                                    record_id = existing["records"][0]["id"]
-                                    await self.zoho_crm_service.update_record(
-                                        module_name="Social_Media_Credentials",
-                                        record_id=record_id,
-                                        updates=zoho_credential_record,
-                                        user_id=user_id
-                                    )
-                                else:
-                                    # Create new
-                                    await self.zoho_crm_service.create_record(
-                                        module_name="Social_Media_Credentials",
-                                        record_data=zoho_credential_record,
-                                        user_id=user_id
-                                    )
-                                logger.info(f"Saved Instagram credentials to Zoho CRM: {account_id}")
-                            except Exception as e:
-                                logger.warning(f"Failed to save to Zoho CRM (continuing anyway): {str(e)}")
-
-                        accounts_created.append({
-                            "account_id": account_id,
-                            "name": ig_info.get("username"),
-                            "platform": "instagram"
-                        })
-
-                if not accounts_created:
-                    return {
-                        "status": "error",
-                        "error": "No Instagram Business accounts found. Please convert your Instagram account to a Business account and connect it to a Facebook Page."
-                    }
-
-                return {
-                    "status": "success",
-                    "platform": "instagram",
-                    "accounts": accounts_created,
-                    "message": f"Connected {len(accounts_created)} Instagram Business account(s)"
-                }
-
-        except Exception as e:
-            logger.error(f"Instagram code exchange error: {str(e)}")
-            return {"status": "error", "error": str(e)}
-
-    async def _exchange_twitter_code(self, code: str, redirect_uri: str, user_id: str) -> Dict[str, Any]:
-        """Exchange Twitter authorization code for access token."""
-        try:
-            async with httpx.AsyncClient() as client:
-                # Exchange code for token
-                token_data = {
-                    "code": code,
-                    "grant_type": "authorization_code",
-                    "client_id": self.platforms["twitter"]["api_key"],
-                    "redirect_uri": redirect_uri,
-                    "code_verifier": "challenge"  # Should be stored during auth URL generation
-                }
+            now = datetime.now(timezone.utc)
+            now_iso = now.isoformat()
+            client = self._http
+            # Get access token
+            token_params = {
+                "client_id": self.platforms["facebook"]["app_id"],
+                "client_secret": self.platforms["facebook"]["app_secret"],
+                "redirect_uri": redirect_uri,
+                "code": code
+            }
 
-                response = await client.post(
-                    self.platforms["twitter"]["token_url"],
-                    data=token_data,
-                    auth=(
-                        self.platforms["twitter"]["api_key"],
-                        self.platforms["twitter"]["api_secret"]
-                    )
-                )
+            response = await client.get(
+                self.platforms["facebook"]["token_url"],
+                params=token_params
+            )
 
-                if response.status_code != 200:
-                    return {"status": "error", "error": "Token exchange failed"}
+            if response.status_code != 200:
+                logger.error(f"Facebook token exchange failed: {response.text}")
+                return {"status": "error", "error": "Token exchange failed"}
 
-                token_response = response.json()
-                access_token = token_response["access_token"]
-                refresh_token = token_response.get("refresh_token")
+            token_data = response_json(response)
+            access_token = token_data["access_token"]
 
-                # Get user info
-                user_response = await client.get(
-                    f"{self.platforms['twitter']['api_base']}/users/me",
-                    params={"user.fields": "profile_image_url,public_metrics"},
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
+            # Get user pages (for posting)
+            pages_response = await client.get(
+                f"{self.platforms['facebook']['api_base']}/me/accounts",
+                params={"access_token": access_token}
+            )
 
-                user_data = user_response.json().get("data", {})
-                account_id = f"tw_{user_data['id']}"
+            pages_data = response_json(pages_response)
 
-                account_doc = {
+            # Store each page as separate account
+            account_docs = []
+            for page in pages_data.get("data", []):
+                account_docs.append({
                     "user_id": user_id,
-                    "platform": "twitter",
-                    "account_id": account_id,
-                    "account_name": user_data.get("name"),
-                    "account_username": user_data.get("username"),
-                    "profile_picture": user_data.get("profile_image_url"),
+                    "platform": "facebook",
+                    "account_id": "fb_" + page["id"],
+                    "account_name": page.get("name"),
+                    "account_username": page.get("name"),
+                    "profile_picture": None,
                     "auth_type": "oauth",
                     "credentials": {
-                        "access_token": access_token,
-                        "refresh_token": refresh_token,
-                        "token_expires_at": (datetime.now(timezone.utc) + timedelta(hours=2)).isoformat()
+                        "access_token": page["access_token"],  # Page access token
+                        "page_id": page["id"],
+                        "token_expires_at": None  # Page tokens don't expire
                     },
                     "account_info": {
-                        "followers": user_data.get("public_metrics", {}).get("followers_count", 0),
-                        "following": user_data.get("public_metrics", {}).get("following_count", 0),
-                        "verified": user_data.get("verified", False)
+                        "page_id": page["id"],
+                        "category": page.get("category"),
+                        "tasks": page.get("tasks", [])
                     },
                     "status": "active",
-                    "connected_at": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc)
-                }
+                    "connected_at": now,
+                    "updated_at": now
+                })
+
+            # Upsert every page in one round trip
+            if account_docs:
+                await self.db.social_accounts.bulk_write([
+                    UpdateOne(
+                        {"user_id": user_id, "account_id": doc["account_id"]},
+                        {"$set": doc},
+                        upsert=True
+                    )
+                    for doc in account_docs
+                ], ordered=False)
+                self._invalidate_accounts(user_id, [doc["account_id"] for doc in account_docs])
 
-                await self.db.social_accounts.update_one(
-                    {"user_id": user_id, "account_id": account_id},
-                    {"$set": account_doc},
-                    upsert=True
-                )
+            accounts_created = []
+            for account_doc in account_docs:
+                account_id = account_doc["account_id"]
+                page_id = account_doc["credentials"]["page_id"]
 
                 # Also save to Zoho CRM for centralized credential management
                 if self.zoho_crm_service:
                     try:
                         zoho_credential_record = {
-                            "Name": f"{user_id}_twitter_{user_data['id']}",
+                            "Name": f"{user_id}_facebook_{page_id}",
                             "User_ID": user_id,
-                            "Platform": "Twitter",
+                            "Platform": "Facebook",
                             "Account_ID": account_id,
-                            "Account_Name": user_data.get("username"),
+                            "Account_Name": account_doc["account_name"],
                             "Auth_Type": "oauth",
                             "Status": "active",
-                            "Connected_At": datetime.now(timezone.utc).isoformat(),
-                            "Last_Updated": datetime.now(timezone.utc).isoformat()
+                            "Connected_At": now_iso,
+                            "Last_Updated": now_iso
                         }
 
                         # Check if already exists
@@ -605,7 +481,7 @@ class UnifiedSocialService:
                             await self.zoho_crm_service.update_record(
                                 module_name="Social_Media_Credentials",
                                 record_id=record_id,
-                                updates=zoho_credential_record,
+                                record_data=zoho_credential_record,
                                 user_id=user_id
                             )
                         else:
@@ -615,96 +491,163 @@ class UnifiedSocialService:
                                 record_data=zoho_credential_record,
                                 user_id=user_id
                             )
-                        logger.info(f"Saved Twitter credentials to Zoho CRM: {account_id}")
+                        logger.info(f"Saved Facebook credentials to Zoho CRM: {account_id}")
                     except Exception as e:
                         logger.warning(f"Failed to save to Zoho CRM (continuing anyway): {str(e)}")
 
-                return {
-                    "status": "success",
-                    "platform": "twitter",
-                    "accounts": [{
-                        "account_id": account_id,
-                        "name": user_data.get("username"),
-                        "platform": "twitter"
-                    }],
-                    "message": "Connected Twitter account"
-                }
+                accounts_created.append({
+                    "account_id": account_id,
+                    "name": account_doc["account_name"],
+                    "platform": "facebook"
+                })
+
+            return {
+                "status": "success",
+                "platform": "facebook",
+                "accounts": accounts_created,
+                "message": f"Connected {len(accounts_created)} Facebook page(s)"
+            }
 
         except Exception as e:
-            logger.error(f"Twitter code exchange error: {str(e)}")
+            logger.error(f"Facebook code exchange error: {str(e)}")
             return {"status": "error", "error": str(e)}
 
-    async def _exchange_linkedin_code(self, code: str, redirect_uri: str, user_id: str) -> Dict[str, Any]:
-        """Exchange LinkedIn authorization code for access token."""
+    async def _exchange_instagram_code(self, code: str, redirect_uri: str, user_id: str) -> Dict[str, Any]:
+        """Exchange Instagram authorization code for access token."""
         try:
-            async with httpx.AsyncClient() as client:
-                # Exchange code for token
-                token_data = {
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "redirect_uri": redirect_uri,
-                    "client_id": self.platforms["linkedin"]["client_id"],
-                    "client_secret": self.platforms["linkedin"]["client_secret"]
-                }
+            now = datetime.now(timezone.utc)
+            now_iso = now.isoformat()
+            # Instagram uses Facebook Graph API
+            client = self._http
+            api_base = self.platforms["instagram"]["api_base"]
+
+            # Get access token
+            token_params = {
+                "client_id": self.platforms["instagram"]["app_id"],
+                "client_secret": self.platforms["instagram"]["app_secret"],
+                "redirect_uri": redirect_uri,
+                "code": code
+            }
+
+            response = await client.get(
+                f"https://graph.facebook.com/v18.0/oauth/access_token",
+                params=token_params
+            )
 
-                response = await client.post(
-                    self.platforms["linkedin"]["token_url"],
-                    data=token_data,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
+            if response.status_code != 200:
+                return {"status": "error", "error": "Token exchange failed"}
+
+            token_data = response_json(response)
+            access_token = token_data["access_token"]
+
+            # Get Facebook pages
+            pages_response = await client.get(
+                f"{api_base}/me/accounts",
+                params={"access_token": access_token}
+            )
+
+            pages_data = response_json(pages_response)
+
+            async def _fetch_one_page(page):
+                """Look up a page's Instagram Business account; None if it has none."""
+                ig_response = await client.get(
+                    f"{api_base}/{page['id']}",
+                    params={
+                        "fields": "instagram_business_account",
+                        "access_token": page["access_token"]
+                    }
                 )
 
-                if response.status_code != 200:
-                    return {"status": "error", "error": "Token exchange failed"}
+                ig_data = response_json(ig_response)
 
-                token_response = response.json()
-                access_token = token_response["access_token"]
+                if "instagram_business_account" not in ig_data:
+                    return None
 
-                # Get user info
-                user_response = await client.get(
-                    f"{self.platforms['linkedin']['api_base']}/me",
-                    headers={"Authorization": f"Bearer {access_token}"}
+                ig_account_id = ig_data["instagram_business_account"]["id"]
+
+                # Get Instagram account info
+                ig_info_response = await client.get(
+                    f"{api_base}/{ig_account_id}",
+                    params={
+                        "fields": "username,profile_picture_url,followers_count,follows_count,media_count",
+                        "access_token": page["access_token"]
+                    }
                 )
 
-                user_data = user_response.json()
-                account_id = f"li_{user_data['id']}"
+                ig_info = response_json(ig_info_response)
 
-                account_doc = {
+                return {
                     "user_id": user_id,
-                    "platform": "linkedin",
-                    "account_id": account_id,
-                    "account_name": f"{user_data.get('localizedFirstName', '')} {user_data.get('localizedLastName', '')}",
-                    "account_username": user_data.get('id'),
-                    "profile_picture": None,
+                    "platform": "instagram",
+                    "account_id": "ig_" + ig_account_id,
+                    "account_name": ig_info.get("username"),
+                    "account_username": ig_info.get("username"),
+                    "profile_picture": ig_info.get("profile_picture_url"),
                     "auth_type": "oauth",
                     "credentials": {
-                        "access_token": access_token,
-                        "token_expires_at": (datetime.now(timezone.utc) + timedelta(days=60)).isoformat()
+                        "access_token": page["access_token"],
+                        "instagram_business_id": ig_account_id,
+                        "page_id": page["id"]
+                    },
+                    "account_info": {
+                        "followers": ig_info.get("followers_count", 0),
+                        "following": ig_info.get("follows_count", 0),
+                        "posts_count": ig_info.get("media_count", 0),
+                        "business_account": True
                     },
-                    "account_info": {},
                     "status": "active",
-                    "connected_at": datetime.now(timezone.utc),
-                    "updated_at": datetime.now(timezone.utc)
+                    "connected_at": now,
+                    "updated_at": now
                 }
 
-                await self.db.social_accounts.update_one(
-                    {"user_id": user_id, "account_id": account_id},
-                    {"$set": account_doc},
+            # For each page, get connected Instagram Business account (all pages at once)
+            results = await asyncio.gather(
+                *[_fetch_one_page(page) for page in pages_data.get("data", [])],
+                return_exceptions=True
+            )
+
+            account_docs = []
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to load Instagram account for a page: {str(result)}")
+                elif result:
+                    account_docs.append(result)
+
+            if not account_docs:
+                return {
+                    "status": "error",
+                    "error": "No Instagram Business accounts found. Please convert your Instagram account to a Business account and connect it to a Facebook Page."
+                }
+
+            # Store every account in one round trip
+            await self.db.social_accounts.bulk_write([
+                UpdateOne(
+                    {"user_id": user_id, "account_id": doc["account_id"]},
+                    {"$set": doc},
                     upsert=True
                 )
+                for doc in account_docs
+            ], ordered=False)
+            self._invalidate_accounts(user_id, [doc["account_id"] for doc in account_docs])
+
+            accounts_created = []
+            for account_doc in account_docs:
+                account_id = account_doc["account_id"]
+                ig_account_id = account_doc["credentials"]["instagram_business_id"]
 
                 # Also save to Zoho CRM for centralized credential management
                 if self.zoho_crm_service:
                     try:
                         zoho_credential_record = {
-                            "Name": f"{user_id}_linkedin_{user_data['id']}",
+                            "Name": f"{user_id}_instagram_{ig_account_id}",
                             "User_ID": user_id,
-                            "Platform": "LinkedIn",
+                            "Platform": "Instagram",
                             "Account_ID": account_id,
                             "Account_Name": account_doc["account_name"],
                             "Auth_Type": "oauth",
                             "Status": "active",
-                            "Connected_At": datetime.now(timezone.utc).isoformat(),
-                            "Last_Updated": datetime.now(timezone.utc).isoformat()
+                            "Connected_At": now_iso,
+                            "Last_Updated": now_iso
                         }
 
                         # Check if already exists
@@ -720,7 +663,7 @@ class UnifiedSocialService:
                             await self.zoho_crm_service.update_record(
                                 module_name="Social_Media_Credentials",
                                 record_id=record_id,
-                                updates=zoho_credential_record,
+                                record_data=zoho_credential_record,
                                 user_id=user_id
                             )
                         else:
@@ -730,20 +673,268 @@ class UnifiedSocialService:
                                 record_data=zoho_credential_record,
                                 user_id=user_id
                             )
-                        logger.info(f"Saved LinkedIn credentials to Zoho CRM: {account_id}")
+                        logger.info(f"Saved Instagram credentials to Zoho CRM: {account_id}")
                     except Exception as e:
                         logger.warning(f"Failed to save to Zoho CRM (continuing anyway): {str(e)}")
 
-                return {
-                    "status": "success",
-                    "platform": "linkedin",
-                    "accounts": [{
-                        "account_id": account_id,
-                        "name": account_doc["account_name"],
-                        "platform": "linkedin"
-                    }],
-                    "message": "Connected LinkedIn account"
-                }
+                accounts_created.append({
+                    "account_id": account_id,
+                    "name": account_doc["account_name"],
+                    "platform": "instagram"
+                })
+
+            return {
+                "status": "success",
+                "platform": "instagram",
+                "accounts": accounts_created,
+                "message": f"Connected {len(accounts_created)} Instagram Business account(s)"
+            }
+
+        except Exception as e:
+            logger.error(f"Instagram code exchange error: {str(e)}")
+            return {"status": "error", "error": str(e)}
+
+    async def _exchange_twitter_code(self, code: str, redirect_uri: str, user_id: str) -> Dict[str, Any]:
+        """Exchange Twitter authorization code for access token."""
+        try:
+            now = datetime.now(timezone.utc)
+            now_iso = now.isoformat()
+            client = self._http
+            # Exchange code for token
+            token_data = {
+                "code": code,
+                "grant_type": "authorization_code",
+                "client_id": self.platforms["twitter"]["api_key"],
+                "redirect_uri": redirect_uri,
+                "code_verifier": "challenge"  # Should be stored during auth URL generation
+            }
+
+            response = await client.post(
+                self.platforms["twitter"]["token_url"],
+                data=token_data,
+                auth=(
+                    self.platforms["twitter"]["api_key"],
+                    self.platforms["twitter"]["api_secret"]
+                )
+            )
+
+            if response.status_code != 200:
+                return {"status": "error", "error": "Token exchange failed"}
+
+            token_response = response_json(response)
+            access_token = token_response["access_token"]
+            refresh_token = token_response.get("refresh_token")
+
+            # Get user info
+            user_response = await client.get(
+                f"{self.platforms['twitter']['api_base']}/users/me",
+                params={"user.fields": "profile_image_url,public_metrics"},
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
+
+            user_data = response_json(user_response).get("data", {})
+            account_id = "tw_" + user_data["id"]
+
+            account_doc = {
+                "user_id": user_id,
+                "platform": "twitter",
+                "account_id": account_id,
+                "account_name": user_data.get("name"),
+                "account_username": user_data.get("username"),
+                "profile_picture": user_data.get("profile_image_url"),
+                "auth_type": "oauth",
+                "credentials": {
+                    "access_token": access_token,
+                    "refresh_token": refresh_token,
+                    "token_expires_at": (now + timedelta(hours=2)).isoformat()
+                },
+                "account_info": {
+                    "followers": user_data.get("public_metrics", {}).get("followers_count", 0),
+                    "following": user_data.get("public_metrics", {}).get("following_count", 0),
+                    "verified": user_data.get("verified", False)
+                },
+                "status": "active",
+                "connected_at": now,
+                "updated_at": now
+            }
+
+            await self.db.social_accounts.update_one(
+                {"user_id": user_id, "account_id": account_id},
+                {"$set": account_doc},
+                upsert=True
+            )
+            self._invalidate_accounts(user_id, [account_id])
+
+            # Also save to Zoho CRM for centralized credential management
+            if self.zoho_crm_service:
+                try:
+                    zoho_credential_record = {
+                        "Name": f"{user_id}_twitter_{user_data['id']}",
+                        "User_ID": user_id,
+                        "Platform": "Twitter",
+                        "Account_ID": account_id,
+                        "Account_Name": user_data.get("username"),
+                        "Auth_Type": "oauth",
+                        "Status": "active",
+                        "Connected_At": now_iso,
+                        "Last_Updated": now_iso
+                    }
+
+                    # Check if already exists
+                    existing = await self.zoho_crm_service.search_records(
+                        module_name="Social_Media_Credentials",
+                        search_criteria=f"Account_ID = '{account_id}'",
+                        user_id=user_id
+                    )
+
+                    if existing.get("status") == "success" and existing.get("records"):
+                        # Update existing
+                        record_id = existing["records"][0]["id"]
+                        await self.zoho_crm_service.update_record(
+                            module_name="Social_Media_Credentials",
+                            record_id=record_id,
+                            record_data=zoho_credential_record,
+                            user_id=user_id
+                        )
+                    else:
+                        # Create new
+                        await self.zoho_crm_service.create_record(
+                            module_name="Social_Media_Credentials",
+                            record_data=zoho_credential_record,
+                            user_id=user_id
+                        )
+                    logger.info(f"Saved Twitter credentials to Zoho CRM: {account_id}")
+                except Exception as e:
+                    logger.warning(f"Failed to save to Zoho CRM (continuing anyway): {str(e)}")
+
+            return {
+                "status": "success",
+                "platform": "twitter",
+                "accounts": [{
+                    "account_id": account_id,
+                    "name": user_data.get("username"),
+                    "platform": "twitter"
+                }],
+                "message": "Connected Twitter account"
+            }
+
+        except Exception as e:
+            logger.error(f"Twitter code exchange error: {str(e)}")
+            return {"status": "error", "error": str(e)}
+
+    async def _exchange_linkedin_code(self, code: str, redirect_uri: str, user_id: str) -> Dict[str, Any]:
+        """Exchange LinkedIn authorization code for access token."""
+        try:
+            now = datetime.now(timezone.utc)
+            now_iso = now.isoformat()
+            client = self._http
+            # Exchange code for token
+            token_data = {
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": redirect_uri,
+                "client_id": self.platforms["linkedin"]["client_id"],
+                "client_secret": self.platforms["linkedin"]["client_secret"]
+            }
+
+            response = await client.post(
+                self.platforms["linkedin"]["token_url"],
+                data=token_data,
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
+            )
+
+            if response.status_code != 200:
+                return {"status": "error", "error": "Token exchange failed"}
+
+            token_response = response_json(response)
+            access_token = token_response["access_token"]
+
+            # Get user info
+            user_response = await client.get(
+                f"{self.platforms['linkedin']['api_base']}/me",
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
+
+            user_data = response_json(user_response)
+            account_id = "li_" + user_data["id"]
+
+            account_doc = {
+                "user_id": user_id,
+                "platform": "linkedin",
+                "account_id": account_id,
+                "account_name": f"{user_data.get('localizedFirstName', '')} {user_data.get('localizedLastName', '')}",
+                "account_username": user_data.get('id'),
+                "profile_picture": None,
+                "auth_type": "oauth",
+                "credentials": {
+                    "access_token": access_token,
+                    "token_expires_at": (now + timedelta(days=60)).isoformat()
+                },
+                "account_info": {},
+                "status": "active",
+                "connected_at": now,
+                "updated_at": now
+            }
+
+            await self.db.social_accounts.update_one(
+                {"user_id": user_id, "account_id": account_id},
+                {"$set": account_doc},
+                upsert=True
+            )
+            self._invalidate_accounts(user_id, [account_id])
+
+            # Also save to Zoho CRM for centralized credential management
+            if self.zoho_crm_service:
+                try:
+                    zoho_credential_record = {
+                        "Name": f"{user_id}_linkedin_{user_data['id']}",
+                        "User_ID": user_id,
+                        "Platform": "LinkedIn",
+                        "Account_ID": account_id,
+                        "Account_Name": account_doc["account_name"],
+                        "Auth_Type": "oauth",
+                        "Status": "active",
+                        "Connected_At": now_iso,
+                        "Last_Updated": now_iso
+                    }
+
+                    # Check if already exists
+                    existing = await self.zoho_crm_service.search_records(
+                        module_name="Social_Media_Credentials",
+                        search_criteria=f"Account_ID = '{account_id}'",
+                        user_id=user_id
+                    )
+
+                    if existing.get("status") == "success" and existing.get("records"):
+                        # Update existing
+                        record_id = existing["records"][0]["id"]
+                        await self.zoho_crm_service.update_record(
+                            module_name="Social_Media_Credentials",
+                            record_id=record_id,
+                            record_data=zoho_credential_record,
+                            user_id=user_id
+                        )
+                    else:
+                        # Create new
+                        await self.zoho_crm_service.create_record(
+                            module_name="Social_Media_Credentials",
+                            record_data=zoho_credential_record,
+                            user_id=user_id
+                        )
+                    logger.info(f"Saved LinkedIn credentials to Zoho CRM: {account_id}")
+                except Exception as e:
+                    logger.warning(f"Failed to save to Zoho CRM (continuing anyway): {str(e)}")
+
+            return {
+                "status": "success",
+                "platform": "linkedin",
+                "accounts": [{
+                    "account_id": account_id,
+                    "name": account_doc["account_name"],
+                    "platform": "linkedin"
+                }],
+                "message": "Connected LinkedIn account"
+            }
 
         except Exception as e:
             logger.error(f"LinkedIn code exchange error: {str(e)}")
@@ -751,8 +942,23 @@ class UnifiedSocialService:
 
     # ==================== ACCOUNT MANAGEMENT ====================
 
-    async def get_connected_accounts(self, user_id: str, platform: str = None) -> Dict[str, Any]:
-        """Get all connected social media accounts for a user."""
+    async def get_connected_accounts(
+        self,
+        user_id: str,
+        platform: str = None,
+        fields: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get all connected social media accounts for a user.
+
+        Args:
+            user_id: User identifier
+            platform: Optional platform filter
+            fields: Projection to return instead of ACCOUNT_SUMMARY_FIELDS
+
+        Returns:
+            Dict with accounts and count
+        """
         try:
             query = {"user_id": user_id, "status": "active"}
             if platform:
@@ -760,9 +966,15 @@ class UnifiedSocialService:
 
             accounts = await self.db.social_accounts.find(
                 query,
-                {"_id": 0, "credentials.access_token": 0, "credentials.refresh_token": 0}
+                fields or self.ACCOUNT_SUMMARY_FIELDS
             ).to_list(100)
 
+            # The frontend reads the expiry at the top level
+            for account in accounts:
+                credentials = account.get("credentials")
+                if credentials and "token_expires_at" in credentials:
+                    account["token_expires_at"] = credentials["token_expires_at"]
+
             return {
                 "status": "success",
                 "accounts": accounts,
@@ -773,6 +985,37 @@ class UnifiedSocialService:
             logger.error(f"Error getting connected accounts: {str(e)}")
             return {"status": "error", "error": str(e)}
 
+    async def stream_connected_accounts(
+        self,
+        user_id: str,
+        platform: str = None,
+        projection: Dict[str, int] = None,
+        batch_size: int = 100
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a user's active connected accounts one at a time from a batched cursor.
+
+        Args:
+            user_id: User identifier
+            platform: Optional platform filter
+            projection: Fields to return (defaults to everything except tokens)
+            batch_size: Documents fetched per round trip
+
+        Yields:
+            Connected account documents
+        """
+        query = {"user_id": user_id, "status": "active"}
+        if platform:
+            query["platform"] = platform
+
+        cursor = self.db.social_accounts.find(
+            query,
+            projection or {"_id": 0, "credentials.access_token": 0, "credentials.refresh_token": 0}
+        ).batch_size(batch_size)
+
+        async for account in cursor:
+            yield account
+
     async def disconnect_account(self, account_id: str, user_id: str) -> Dict[str, Any]:
         """Disconnect a social media account."""
         try:
@@ -780,6 +1023,7 @@ class UnifiedSocialService:
                 {"account_id": account_id, "user_id": user_id},
                 {"$set": {"status": "disconnected", "updated_at": datetime.now(timezone.utc)}}
             )
+            self._invalidate_accounts(user_id, [account_id])
 
             if result.modified_count > 0:
                 return {"status": "success", "message": "Account disconnected"}
@@ -810,37 +1054,41 @@ class UnifiedSocialService:
             Dict with status and platform_post_id
         """
         try:
-            # Get account
-            account = await self.db.social_accounts.find_one({
-                "account_id": account_id,
-                "user_id": user_id,
-                "status": "active"
-            })
+            # Get account (cached briefly; it only changes on connect/disconnect)
+            cache_key = (user_id, account_id)
+            account = self._account_cache.get(cache_key)
+            if account is None:
+                # Look the account up and stamp last_used in a single round trip
+                account = await self.db.social_accounts.find_one_and_update(
+                    {
+                        "account_id": account_id,
+                        "user_id": user_id,
+                        "status": "active"
+                    },
+                    {"$currentDate": {"last_used": True}},
+                    return_document=ReturnDocument.BEFORE
+                )
+
+                if not account:
+                    return {"status": "error", "error": "Account not found or not active"}
 
-            if not account:
-                return {"status": "error", "error": "Account not found or not active"}
+                self._account_cache[cache_key] = account
+            else:
+                # Update last_used without holding up the post; the server stamps the time
+                self._run_in_background(self.db.social_accounts.update_one(
+                    {"user_id": user_id, "account_id": account_id},
+                    {"$currentDate": {"last_used": True}}
+                ))
 
             platform = account["platform"]
 
             # Post to platform
-            if platform == "facebook":
-                result = await self._post_to_facebook(account, content)
-            elif platform == "instagram":
-                result = await self._post_to_instagram(account, content)
-            elif platform == "twitter":
-                result = await self._post_to_twitter(account, content)
-            elif platform == "linkedin":
-                result = await self._post_to_linkedin(account, content)
-            else:
+            post = self._post_handlers.get(platform)
+            if not post:
                 return {"status": "error", "error": f"Unsupported platform: {platform}"}
 
-            # Update last_used
-            await self.db.social_accounts.update_one(
-                {"account_id": account_id},
-                {"$set": {"last_used": datetime.now(timezone.utc)}}
-            )
-
-            return result
+            async with self._post_semaphores[platform]:
+                return await post(account, content)
 
         except Exception as e:
             logger.error(f"Error posting to platform: {str(e)}")
@@ -849,41 +1097,41 @@ class UnifiedSocialService:
     async def _post_to_facebook(self, account: Dict, content: Dict) -> Dict[str, Any]:
         """Post to Facebook page."""
         try:
-            async with httpx.AsyncClient() as client:
-                page_id = account["credentials"]["page_id"]
-                access_token = account["credentials"]["access_token"]
+            client = self._http
+            page_id = account["credentials"]["page_id"]
+            access_token = account["credentials"]["access_token"]
 
-                post_data = {
-                    "message": content.get("message", ""),
-                    "access_token": access_token
-                }
+            post_data = {
+                "message": content.get("message", ""),
+                "access_token": access_token
+            }
 
-                if content.get("link"):
-                    post_data["link"] = content["link"]
-
-                # If images, use photo endpoint
-                if content.get("images") and len(content["images"]) > 0:
-                    # For now, post first image (can be enhanced for multiple)
-                    post_data["url"] = content["images"][0]
-                    endpoint = f"https://graph.facebook.com/v18.0/{page_id}/photos"
-                else:
-                    endpoint = f"https://graph.facebook.com/v18.0/{page_id}/feed"
-
-                response = await client.post(endpoint, data=post_data)
-
-                if response.status_code == 200:
-                    response_data = response.json()
-                    return {
-                        "status": "published",
-                        "platform_post_id": response_data.get("id"),
-                        "platform": "facebook"
-                    }
-                else:
-                    logger.error(f"Facebook post failed: {response.text}")
-                    return {
-                        "status": "failed",
-                        "error": response.text
-                    }
+            if content.get("link"):
+                post_data["link"] = content["link"]
+
+            # If images, use photo endpoint
+            if content.get("images") and len(content["images"]) > 0:
+                # For now, post first image (can be enhanced for multiple)
+                post_data["url"] = content["images"][0]
+                endpoint = f"https://graph.facebook.com/v18.0/{page_id}/photos"
+            else:
+                endpoint = f"https://graph.facebook.com/v18.0/{page_id}/feed"
+
+            response = await client.post(endpoint, data=post_data)
+
+            if response.status_code == 200:
+                response_data = response_json(response)
+                return {
+                    "status": "published",
+                    "platform_post_id": response_data.get("id"),
+                    "platform": "facebook"
+                }
+            else:
+                logger.error(f"Facebook post failed: {response.text}")
+                return {
+                    "status": "failed",
+                    "error": response.text
+                }
 
         except Exception as e:
             logger.error(f"Facebook posting error: {str(e)}")
@@ -892,77 +1140,190 @@ class UnifiedSocialService:
     async def _post_to_instagram(self, account: Dict, content: Dict) -> Dict[str, Any]:
         """Post to Instagram Business account."""
         try:
-            async with httpx.AsyncClient() as client:
-                ig_account_id = account["credentials"]["instagram_business_id"]
-                access_token = account["credentials"]["access_token"]
-
-                # Instagram requires image URL
-                if not content.get("images"):
-                    return {"status": "failed", "error": "Instagram requires at least one image"}
-
-                image_url = content["images"][0]
-                caption = content.get("message", "")
-
-                # Step 1: Create media container
-                container_data = {
-                    "image_url": image_url,
-                    "caption": caption,
-                    "access_token": access_token
-                }
+            client = self._http
+            ig_account_id = account["credentials"]["instagram_business_id"]
+            access_token = account["credentials"]["access_token"]
+
+            # Instagram requires image URL
+            if not content.get("images"):
+                return {"status": "failed", "error": "Instagram requires at least one image"}
+
+            image_url = content["images"][0]
+            caption = content.get("message", "")
+
+            # Step 1: Create media container
+            container_data = {
+                "image_url": image_url,
+                "caption": caption,
+                "access_token": access_token
+            }
 
-                container_response = await client.post(
-                    f"https://graph.facebook.com/v18.0/{ig_account_id}/media",
-                    data=container_data
-                )
+            container_response = await client.post(
+                f"https://graph.facebook.com/v18.0/{ig_account_id}/media",
+                data=container_data
+            )
 
-                if container_response.status_code != 200:
-                    return {"status": "failed", "error": container_response.text}
+            if container_response.status_code != 200:
+                return {"status": "failed", "error": container_response.text}
 
-                container_id = container_response.json()["id"]
+            container_id = response_json(container_response)["id"]
 
-                # Step 2: Publish media
-                publish_response = await client.post(
-                    f"https://graph.facebook.com/v18.0/{ig_account_id}/media_publish",
-                    data={"creation_id": container_id, "access_token": access_token}
-                )
+            # Wait for Instagram to finish processing the image
+            container_error = await self._wait_for_container(container_id, access_token)
+            if container_error:
+                return {"status": "failed", "error": container_error}
 
-                if publish_response.status_code == 200:
-                    return {
-                        "status": "published",
-                        "platform_post_id": publish_response.json().get("id"),
-                        "platform": "instagram"
-                    }
-                else:
-                    return {"status": "failed", "error": publish_response.text}
+            # Step 2: Publish media
+            publish_response = await client.post(
+                f"https://graph.facebook.com/v18.0/{ig_account_id}/media_publish",
+                data={"creation_id": container_id, "access_token": access_token}
+            )
+
+            if publish_response.status_code == 200:
+                return {
+                    "status": "published",
+                    "platform_post_id": response_json(publish_response).get("id"),
+                    "platform": "instagram"
+                }
+            else:
+                return {"status": "failed", "error": publish_response.text}
 
         except Exception as e:
             logger.error(f"Instagram posting error: {str(e)}")
             return {"status": "failed", "error": str(e)}
 
+    async def _wait_for_container(self, container_id: str, access_token: str) -> Optional[str]:
+        """
+        Poll an Instagram media container until it can be published.
+
+        Args:
+            container_id: Media container to check
+            access_token: Page access token
+
+        Returns:
+            None once the container is FINISHED, otherwise an error message
+        """
+        status_code = None
+        for delay in self.CONTAINER_POLL_DELAYS:
+            # Sleep rather than block so the worker serves other requests between checks
+            await asyncio.sleep(delay)
+
+            response = await self._http.get(
+                f"https://graph.facebook.com/v18.0/{container_id}",
+                params={"fields": "status_code", "access_token": access_token}
+            )
+            status_code = response_json(response).get("status_code")
+
+            if status_code == "FINISHED":
+                return None
+            if status_code in ("ERROR", "EXPIRED"):
+                return f"Instagram media container {status_code.lower()}"
+
+        return f"Instagram media container not ready (last status: {status_code})"
+
+    def _token_is_fresh(self, credentials: Dict) -> bool:
+        """Whether stored credentials are valid beyond the refresh margin (or cannot be refreshed)."""
+        expires_at = credentials.get("token_expires_at")
+        if not expires_at or not credentials.get("refresh_token"):
+            return True
+        return datetime.fromisoformat(expires_at) - datetime.now(timezone.utc) > self.TOKEN_REFRESH_MARGIN
+
+    async def _ensure_valid_token(self, account: Dict) -> str:
+        """
+        Return a Twitter account's access token, refreshing it first if it is about to expire.
+
+        Args:
+            account: Account document (its credentials are updated in place on refresh)
+
+        Returns:
+            Access token to post with
+        """
+        credentials = account["credentials"]
+        if self._token_is_fresh(credentials):
+            return credentials["access_token"]
+
+        account_id = account["account_id"]
+        lock = self._refresh_locks.get(account_id)
+        if lock is None:
+            lock = self._refresh_locks[account_id] = asyncio.Lock()
+
+        async with lock:
+            # Another post may have refreshed this account while we waited; its caller
+            # only updated its own copy, so re-read the stored credentials. Twitter
+            # rotates refresh tokens, so a stale copy must not be used to refresh again
+            stored = await self.db.social_accounts.find_one(
+                {"user_id": account["user_id"], "account_id": account_id},
+                {"_id": 0, "credentials": 1}
+            )
+            if stored and stored.get("credentials"):
+                credentials.update(stored["credentials"])
+            if self._token_is_fresh(credentials):
+                return credentials["access_token"]
+
+            response = await self._http.post(
+                self.platforms["twitter"]["token_url"],
+                data={
+                    "grant_type": "refresh_token",
+                    "refresh_token": credentials["refresh_token"],
+                    "client_id": self.platforms["twitter"]["api_key"]
+                },
+                auth=(
+                    self.platforms["twitter"]["api_key"],
+                    self.platforms["twitter"]["api_secret"]
+                )
+            )
+
+            if response.status_code != 200:
+                # Post with the current token; the platform reports the failure
+                logger.warning(f"Twitter token refresh failed for {account_id}: {response.text}")
+                return credentials["access_token"]
+
+            token_response = response_json(response)
+            now = datetime.now(timezone.utc)
+            refreshed = {
+                "access_token": token_response["access_token"],
+                # Twitter rotates refresh tokens; the old one is no longer valid
+                "refresh_token": token_response.get("refresh_token", credentials["refresh_token"]),
+                "token_expires_at": (now + timedelta(seconds=token_response.get("expires_in", 7200))).isoformat()
+            }
+
+            await self.db.social_accounts.update_one(
+                {"user_id": account["user_id"], "account_id": account_id},
+                {"$set": {
+                    **{f"credentials.{key}": value for key, value in refreshed.items()},
+                    "updated_at": now
+                }}
+            )
+            credentials.update(refreshed)
+            self._invalidate_accounts(account["user_id"], [account_id])
+
+            logger.info(f"Refreshed Twitter access token for {account_id}")
+            return credentials["access_token"]
+
     async def _post_to_twitter(self, account: Dict, content: Dict) -> Dict[str, Any]:
         """Post to Twitter."""
         try:
-            async with httpx.AsyncClient() as client:
-                access_token = account["credentials"]["access_token"]
+            client = self._http
+            access_token = await self._ensure_valid_token(account)
 
-                tweet_data = {
-                    "text": content.get("message", "")
-                }
+            tweet_data = {
+                "text": content.get("message", "")
+            }
 
-                response = await client.post(
-                    f"https://api.twitter.com/2/tweets",
-                    json=tweet_data,
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
+            response = await client.post(
+                f"https://api.twitter.com/2/tweets",
+                json=tweet_data,
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
 
-                if response.status_code == 201:
-                    return {
-                        "status": "published",
-                        "platform_post_id": response.json().get("data", {}).get("id"),
-                        "platform": "twitter"
-                    }
-                else:
-                    return {"status": "failed", "error": response.text}
+            if response.status_code == 201:
+                return {
+                    "status": "published",
+                    "platform_post_id": response_json(response).get("data", {}).get("id"),
+                    "platform": "twitter"
+                }
+            else:
+                return {"status": "failed", "error": response.text}
 
         except Exception as e:
             logger.error(f"Twitter posting error: {str(e)}")
@@ -971,47 +1332,47 @@ class UnifiedSocialService:
     async def _post_to_linkedin(self, account: Dict, content: Dict) -> Dict[str, Any]:
         """Post to LinkedIn."""
         try:
-            async with httpx.AsyncClient() as client:
-                access_token = account["credentials"]["access_token"]
-                author_id = account["account_username"]  # LinkedIn user ID
-
-                share_data = {
-                    "author": f"urn:li:person:{author_id}",
-                    "lifecycleState": "PUBLISHED",
-                    "specificContent": {
-                        "com.linkedin.ugc.ShareContent": {
-                            "shareCommentary": {
-                                "text": content.get("message", "")
-                            },
-                            "shareMediaCategory": "NONE"
-                        }
-                    },
-                    "visibility": {
-                        "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
+            client = self._http
+            access_token = account["credentials"]["access_token"]
+            author_id = account["account_username"]  # LinkedIn user ID
+
+            share_data = {
+                "author": f"urn:li:person:{author_id}",
+                "lifecycleState": "PUBLISHED",
+                "specificContent": {
+                    "com.linkedin.ugc.ShareContent": {
+                        "shareCommentary": {
+                            "text": content.get("message", "")
+                        },
+                        "shareMediaCategory": "NONE"
                     }
+                },
+                "visibility": {
+                    "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
                 }
+            }
 
-                if content.get("link"):
-                    share_data["specificContent"]["com.linkedin.ugc.ShareContent"]["shareMediaCategory"] = "ARTICLE"
-                    share_data["specificContent"]["com.linkedin.ugc.ShareContent"]["media"] = [{
-                        "status": "READY",
-                        "originalUrl": content["link"]
-                    }]
-
-                response = await client.post(
-                    f"https://api.linkedin.com/v2/ugcPosts",
-                    json=share_data,
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
+            if content.get("link"):
+                share_data["specificContent"]["com.linkedin.ugc.ShareContent"]["shareMediaCategory"] = "ARTICLE"
+                share_data["specificContent"]["com.linkedin.ugc.ShareContent"]["media"] = [{
+                    "status": "READY",
+                    "originalUrl": content["link"]
+                }]
+
+            response = await client.post(
+                f"https://api.linkedin.com/v2/ugcPosts",
+                json=share_data,
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
 
-                if response.status_code in [200, 201]:
-                    return {
-                        "status": "published",
-                        "platform_post_id": response.json().get("id"),
-                        "platform": "linkedin"
-                    }
-                else:
-                    return {"status": "failed", "error": response.text}
+            if response.status_code in [200, 201]:
+                return {
+                    "status": "published",
+                    "platform_post_id": response_json(response).get("id"),
+                    "platform": "linkedin"
+                }
+            else:
+                return {"status": "failed", "error": response.text}
 
         except Exception as e:
             logger.error(f"LinkedIn posting error: {str(e)}")
@@ -1023,11 +1384,16 @@ class UnifiedSocialService:
         content: Dict[str, Any],
         user_id: str
     ) -> Dict[str, Any]:
-        """Post same content to multiple accounts."""
-        results = []
+        """Post same content to multiple accounts concurrently."""
+        raw_results = await asyncio.gather(
+            *[self.post_to_platform(account_id, content, user_id) for account_id in account_ids],
+            return_exceptions=True
+        )
 
-        for account_id in account_ids:
-            result = await self.post_to_platform(account_id, content, user_id)
+        results = []
+        for account_id, result in zip(account_ids, raw_results):
+            if isinstance(result, Exception):
+                result = {"status": "failed", "error": str(result)}
             results.append({
                 "account_id": account_id,
                 **result
@@ -0,0 +1,41 @@
+"""
+Cached UTC clock helpers for hot paths.
+Formatting a timestamp costs far more than reading the clock, so the
+formatted strings are reused for up to a second (or a day for dates).
+Not thread-safe; intended for use from a single asyncio event loop.
+"""
+
+import time
+from datetime import datetime, timezone
+
+_last_iso = [0.0, ""]
+_last_date = [0.0, ""]
+
+
+def utcnow_iso() -> str:
+    """
+    Return the current UTC time as an ISO-8601 string, refreshed once per second.
+
+    Returns:
+        ISO-8601 timestamp string
+    """
+    t = time.time()
+    if t - _last_iso[0] >= 1.0:
+        _last_iso[0] = t
+        _last_iso[1] = datetime.fromtimestamp(t, timezone.utc).isoformat()
+    return _last_iso[1]
+
+
+def utcnow_date() -> str:
+    """
+    Return today's UTC date as YYYY-MM-DD, refreshed at each UTC day boundary.
+
+    Returns:
+        Date string
+    """
+    t = time.time()
+    if t >= _last_date[0]:
+        day_start = t - (t % 86400)
+        _last_date[0] = day_start + 86400
+        _last_date[1] = datetime.fromtimestamp(day_start, timezone.utc).strftime("%Y-%m-%d")
+    return _last_date[1]
@@ -0,0 +1,26 @@
+"""
+Shared helpers for the backend's outbound HTTP clients.
+orjson parses the platforms' JSON bodies several times faster than json,
+straight from the raw response bytes.
+"""
+
+from typing import Any
+
+import httpx
+import orjson
+
+
+def response_json(response: httpx.Response) -> Any:
+    """
+    Parse a JSON response body.
+
+    Args:
+        response: HTTP response with a JSON body
+
+    Returns:
+        Decoded JSON value
+
+    Raises:
+        orjson.JSONDecodeError: If the body is not valid JSON
+    """
+    return orjson.loads(response.content)
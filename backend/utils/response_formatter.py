@@ -7,6 +7,27 @@ import json
 import re
 from typing import Any, Dict
 
+# Every markdown marker in one alternation so the text is scanned once.
+# Each branch captures the text to keep; headers capture nothing.
+_MARKDOWN = re.compile(
+    r'```[a-z]*\n(?s:(.*?))\n```'  # code blocks
+    r'|\*\*(.*?)\*\*'  # ** bold markers
+    r'|\*(.*?)\*'  # * italic markers
+    r'|__(.*?)__'  # __ underline markers
+    r'|`(.*?)`'  # inline code
+    r'|^#+\s*',  # markdown headers
+    re.MULTILINE
+)
+_EXTRA_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def _strip_markdown(match: re.Match) -> str:
+    """Return the text inside a markdown match, itself stripped of nested markers."""
+    for group in match.groups():
+        if group is not None:
+            return _MARKDOWN.sub(_strip_markdown, group)
+    return ''
+
 def clean_agent_response(response: Any) -> str:
     """
     Clean agent response to show only natural text.
@@ -18,26 +39,35 @@ def clean_agent_response(response: Any) -> str:
     Returns:
         Cleaned natural language string
     """
-    # If already a clean string, return it
+    # Exact-type lookup covers the common str/dict responses in one step
+    return _RESPONSE_CLEANERS.get(type(response), _clean_other_response)(response)
+
+
+def _clean_str_response(response: str) -> str:
+    """Clean a string response, extracting natural text if it holds JSON."""
+    # Only look past leading whitespace when there is some
+    head = response[:1]
+    if head.isspace():
+        head = response.lstrip()[:1]
+
+    if head in ('{', '['):
+        try:
+            parsed = json.loads(response)
+            return extract_natural_text_from_dict(parsed)
+        except Exception:
+            # Not valid JSON, clean the string
+            pass
+
+    return clean_text_formatting(response)
+
+
+def _clean_other_response(response: Any) -> str:
+    """Clean str/dict subclasses like their base type; convert anything else to a string."""
     if isinstance(response, str):
-        # Check if it's JSON
-        if response.strip().startswith('{') or response.strip().startswith('['):
-            try:
-                parsed = json.loads(response)
-                return extract_natural_text_from_dict(parsed)
-            except:
-                # Not valid JSON, clean the string
-                return clean_text_formatting(response)
-        else:
-            return clean_text_formatting(response)
-    
-    # If it's a dict, extract natural text
-    elif isinstance(response, dict):
+        return _clean_str_response(response)
+    if isinstance(response, dict):
         return extract_natural_text_from_dict(response)
-    
-    # For other types, convert to string and clean
-    else:
-        return clean_text_formatting(str(response))
+    return clean_text_formatting(str(response))
 
 
 def extract_natural_text_from_dict(data: Dict) -> str:
@@ -95,6 +125,13 @@ def extract_natural_text_from_dict(data: Dict) -> str:
     return format_dict_as_text(data)
 
 
+# clean_agent_response handlers by exact response type
+_RESPONSE_CLEANERS = {
+    str: _clean_str_response,
+    dict: extract_natural_text_from_dict
+}
+
+
 def clean_text_formatting(text: str) -> str:
     """
     Remove markdown symbols, excessive formatting, and clean up text.
@@ -102,27 +139,11 @@ def clean_text_formatting(text: str) -> str:
     if not text:
         return ""
     
-    # Remove ** bold markers
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-    
-    # Remove * italic markers
-    text = re.sub(r'\*(.*?)\*', r'\1', text)
-    
-    # Remove __ underline markers
-    text = re.sub(r'__(.*?)__', r'\1', text)
-    
-    # Remove markdown headers
-    text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE)
-    
-    # Remove code blocks
-    text = re.sub(r'```[a-z]*\n(.*?)\n```', r'\1', text, flags=re.DOTALL)
-    text = re.sub(r'`(.*?)`', r'\1', text)
+    text = _MARKDOWN.sub(_strip_markdown, text)
     
     # Clean up extra whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = text.strip()
-    
-    return text
+    text = _EXTRA_BLANK_LINES.sub('\n\n', text)
+    return text.strip()
 
 
 def format_dict_as_text(data: Dict, indent: int = 0) -> str:
@@ -2,11 +2,16 @@
 Vector Memory Service for persistent, semantic memory across all agents.
 Uses MongoDB Atlas Vector Search + OpenAI Embeddings.
 """
+import asyncio
+import hashlib
 import logging
+import os
 import uuid
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
 import numpy as np
+from bson.binary import Binary, BinaryVectorDtype
+from cachetools import LRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +20,11 @@ class VectorMemoryService:
     Manages long-term memory using vector embeddings and semantic search.
     Enables agents to remember context across sessions and users.
     """
+
+    EMBEDDING_BATCH_SIZE = 2048  # Max inputs per embeddings request
+    EMBEDDING_BATCH_WINDOW = 0.01  # Seconds to gather concurrent embedding requests into one call
+    MAX_EMBEDDING_CHARS = 8000  # Text is truncated to this length before embedding
+    EMBEDDING_CACHE_SIZE = 10000  # Embeddings kept in memory, least recently used evicted first
     
     def __init__(self, db, embedding_model="text-embedding-ada-002"):
         self.db = db
@@ -26,8 +36,37 @@ class VectorMemoryService:
         self.user_memory = db.user_memory  # User-specific memories
         self.agent_memory = db.agent_memory  # Agent-specific memories
         self.tenants = db.tenants  # User tenant management
+
+        # Shared OpenAI client, created on first use
+        self._openai_client = None
+
+        # Recent embeddings by content hash, and requests already queued for a hash
+        self._embedding_cache = LRUCache(maxsize=self.EMBEDDING_CACHE_SIZE)
+        self._embedding_inflight: Dict[bytes, asyncio.Future] = {}
+
+        # Texts awaiting the next batched embeddings call: (cache key, text, future)
+        self._pending_embeddings: List[tuple] = []
+        self._embedding_event = asyncio.Event()
+        self._embedding_batcher_task: Optional[asyncio.Task] = None
+        self._embedding_flush_task: Optional[asyncio.Task] = None
         
         logger.info("Vector Memory Service initialized")
+
+    async def close(self):
+        """Stop the embedding batcher and answer any requests still queued."""
+        if self._embedding_batcher_task is not None:
+            self._embedding_batcher_task.cancel()
+            try:
+                await self._embedding_batcher_task
+            except asyncio.CancelledError:
+                pass
+            self._embedding_batcher_task = None
+        # Cancelling the batcher leaves a flush already in progress running; let it
+        # answer its batch before embedding whatever was queued after it
+        if self._embedding_flush_task is not None:
+            await asyncio.gather(self._embedding_flush_task, return_exceptions=True)
+            self._embedding_flush_task = None
+        await self._flush_embeddings()
     
     async def create_tenant(self, user_id: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """
@@ -85,41 +124,121 @@ class VectorMemoryService:
         else:
             return await self.create_tenant(user_id)
     
-    async def generate_embedding(self, text: str) -> List[float]:
-        """
-        Generate OpenAI embedding for text using OpenAI SDK directly.
-        """
-        try:
+    def _get_openai_client(self):
+        """Return the shared OpenAI client, or None if OPENAI_API_KEY is not set."""
+        if self._openai_client is None:
             from openai import AsyncOpenAI
-            import os
-            
+
             # Use OpenAI API key for embeddings
             api_key = os.environ.get('OPENAI_API_KEY')
-            
+
             if not api_key:
                 logger.error("OPENAI_API_KEY not found in environment")
                 return None
-            
+
             # Use standard OpenAI endpoint
-            client = AsyncOpenAI(api_key=api_key)
-            
-            # Generate embedding (use ada-002 which all keys have access to)
-            response = await client.embeddings.create(
-                input=text[:8000],  # Limit text length
-                model="text-embedding-ada-002"
-            )
-            
-            if response.data and len(response.data) > 0:
-                embedding = response.data[0].embedding
-                logger.info(f"✅ Generated embedding: {len(embedding)} dimensions")
-                return embedding
-            else:
-                logger.error("No embedding returned")
-                return None
-                
+            self._openai_client = AsyncOpenAI(api_key=api_key)
+        return self._openai_client
+
+    async def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Generate OpenAI embeddings for many texts in as few API calls as possible.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embeddings aligned with texts (None where a text is empty or generation failed)
+        """
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+
+        # The API rejects empty inputs, which would fail the whole batch
+        indexed = [(i, text[:self.MAX_EMBEDDING_CHARS]) for i, text in enumerate(texts) if text]
+        if not indexed:
+            return embeddings
+
+        try:
+            client = self._get_openai_client()
+            if client is None:
+                return embeddings
+
+            for start in range(0, len(indexed), self.EMBEDDING_BATCH_SIZE):
+                batch = indexed[start:start + self.EMBEDDING_BATCH_SIZE]
+
+                # One request per batch; results carry the index of their input
+                response = await client.embeddings.create(
+                    input=[text for _, text in batch],
+                    model=self.embedding_model
+                )
+
+                for item in response.data:
+                    embeddings[batch[item.index][0]] = item.embedding
+
+            logger.info(f"✅ Generated {len(indexed)} embedding(s)")
+
         except Exception as e:
-            logger.error(f"❌ Error generating embedding: {str(e)}")
-            return None
+            logger.error(f"❌ Error generating embeddings: {str(e)}")
+
+        return embeddings
+
+    def _embedding_key(self, text: str) -> bytes:
+        """Cache key for the part of a text that is actually embedded."""
+        return hashlib.blake2b(text[:self.MAX_EMBEDDING_CHARS].encode(), digest_size=16).digest()
+
+    async def generate_embedding(self, text: str) -> List[float]:
+        """
+        Generate OpenAI embedding for text.
+        Repeated texts are served from an in-memory cache, and concurrent calls are
+        coalesced into a single batched embeddings request.
+        """
+        key = self._embedding_key(text)
+        embedding = self._embedding_cache.get(key)
+        if embedding is not None:
+            return embedding
+
+        # Share a request already queued for the same text
+        future = self._embedding_inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._embedding_inflight[key] = future
+            self._pending_embeddings.append((key, text, future))
+            self._embedding_event.set()
+
+            # Started lazily because the service is built before the event loop runs
+            if self._embedding_batcher_task is None or self._embedding_batcher_task.done():
+                self._embedding_batcher_task = asyncio.create_task(self._embedding_batcher())
+
+        # Shielded so one cancelled caller doesn't cancel the result for the others
+        return await asyncio.shield(future)
+
+    async def _embedding_batcher(self):
+        """Collect embedding requests for a short window and send them as one batch."""
+        while True:
+            await self._embedding_event.wait()
+            await asyncio.sleep(self.EMBEDDING_BATCH_WINDOW)
+            self._embedding_event.clear()
+            # Shielded so close() can cancel the batcher without abandoning a batch mid-request
+            self._embedding_flush_task = asyncio.create_task(self._flush_embeddings())
+            await asyncio.shield(self._embedding_flush_task)
+
+    async def _flush_embeddings(self):
+        """Embed all queued texts and resolve their callers."""
+        pending, self._pending_embeddings = self._pending_embeddings, []
+        if not pending:
+            return
+
+        embeddings: List[Optional[List[float]]] = [None] * len(pending)
+        try:
+            embeddings = await self.generate_embeddings([text for _, text, _ in pending])
+        finally:
+            # Runs even if the flush is cancelled, so no caller is left waiting;
+            # they get None, as when generation fails
+            for (key, _, future), embedding in zip(pending, embeddings):
+                self._embedding_inflight.pop(key, None)
+                if embedding is not None:
+                    self._embedding_cache[key] = embedding
+                if not future.done():
+                    future.set_result(embedding)
     
     async def store_memory(
         self,
@@ -163,7 +282,8 @@ class VectorMemoryService:
                 "memory_type": memory_type,
                 "agent_name": agent_name,
                 "metadata": metadata or {},
-                "embedding": embedding,
+                # Packed float32 BSON vector: ~6 KB instead of a ~19 KB array of doubles
+                "embedding": Binary.from_vector(embedding, BinaryVectorDtype.FLOAT32),
                 "created_at": datetime.now(timezone.utc).isoformat(),
                 "scope": scope
             }
@@ -294,17 +414,14 @@ class VectorMemoryService:
             user_id = filter_query.get("user_id")
             if user_id:
                 # Get ALL memories for this user, sorted by most recent
-                results = await collection.find(
-                    {"user_id": user_id}
+                # _id and embedding are excluded server-side for a cleaner (and much smaller) response
+                clean_results = await collection.find(
+                    {"user_id": user_id},
+                    {"_id": 0, "embedding": 0}
                 ).sort("created_at", -1).limit(limit * 3).to_list(limit * 3)
                 
-                # Remove _id and embedding for cleaner response
-                clean_results = []
-                for result in results:
-                    result.pop("_id", None)
-                    result.pop("embedding", None)
+                for result in clean_results:
                     result["score"] = 0.7  # Give decent score for recency
-                    clean_results.append(result)
                 
                 logger.info(f"Fallback search found {len(clean_results)} memories for user: {user_id}")
                 return clean_results[:limit]  # Return top limit
@@ -331,59 +448,63 @@ class VectorMemoryService:
         try:
             context_parts = []
 
-            # Search user memories (most important)
-            user_memories = await self.search_memories(
-                user_id=user_id,
-                query=query,
-                limit=max_memories,
-                scope="user"
-            )
+            # Run every search at once so their query embeddings share one batched request
+            searches = [
+                # User memories (most important)
+                self.search_memories(
+                    user_id=user_id,
+                    query=query,
+                    limit=max_memories,
+                    scope="user"
+                ),
+                # This agent's specific memories
+                self.search_memories(
+                    user_id=user_id,
+                    query=query,
+                    limit=max_memories // 2,
+                    scope="agent",
+                    agent_name=agent_name
+                ),
+                # Global memories (best practices, guidelines)
+                self.search_memories(
+                    user_id=user_id,
+                    query=query,
+                    limit=2,
+                    scope="global"
+                )
+            ]
+
+            # Cross-agent knowledge retrieval (NEW!)
+            # Search ALL agent memories without filtering by agent_name
+            if include_other_agents:
+                searches.append(self.search_memories(
+                    user_id=user_id,
+                    query=query,
+                    limit=3,
+                    scope="agent"
+                    # No agent_name filter - searches across ALL agents
+                ))
+
+            user_memories, agent_memories, global_memories, *other = await asyncio.gather(*searches)
+            other_agent_memories = other[0] if other else []
 
             if user_memories:
                 context_parts.append("**User Context:**")
                 for mem in user_memories:
                     context_parts.append(f"- {mem.get('content')}")
 
-            # Search this agent's specific memories
-            agent_memories = await self.search_memories(
-                user_id=user_id,
-                query=query,
-                limit=max_memories // 2,
-                scope="agent",
-                agent_name=agent_name
-            )
-
             if agent_memories:
                 context_parts.append(f"\n**{agent_name} Memories:**")
                 for mem in agent_memories:
                     context_parts.append(f"- {mem.get('content')}")
 
-            # Cross-agent knowledge retrieval (NEW!)
-            # Search ALL agent memories without filtering by agent_name
-            if include_other_agents:
-                other_agent_memories = await self.search_memories(
-                    user_id=user_id,
-                    query=query,
-                    limit=3,
-                    scope="agent"
-                    # No agent_name filter - searches across ALL agents
-                )
-
-                if other_agent_memories:
-                    context_parts.append("\n**Insights from Other Agents:**")
-                    for mem in other_agent_memories:
-                        mem_agent = mem.get('agent_name', 'Unknown')
-                        # Skip if it's from this agent (already added above)
-                        if mem_agent != agent_name:
-                            context_parts.append(f"- [{mem_agent}] {mem.get('content')}")
-
-            # Search global memories (best practices, guidelines)
-            global_memories = await self.search_memories(
-                user_id=user_id,
-                query=query,
-                limit=2,
-                scope="global"
-            )
+            if other_agent_memories:
+                context_parts.append("\n**Insights from Other Agents:**")
+                for mem in other_agent_memories:
+                    mem_agent = mem.get('agent_name', 'Unknown')
+                    # Skip if it's from this agent (already added above)
+                    if mem_agent != agent_name:
+                        context_parts.append(f"- [{mem_agent}] {mem.get('content')}")
 
             if global_memories:
                 context_parts.append("\n**Global Knowledge:**")
@@ -408,7 +529,8 @@ class VectorMemoryService:
             
             # Get recent memories
             recent_memories = await self.user_memory.find(
-                {"user_id": user_id}
+                {"user_id": user_id},
+                {"_id": 0, "content": 1}
             ).sort("created_at", -1).limit(20).to_list(20)
             
             # Extract key information
@@ -8,9 +8,11 @@ Handles complete OAuth flow for Zoho services:
 - Secure token storage
 """
 
+import asyncio
 import logging
 import httpx
 import os
+import weakref
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone, timedelta
 from urllib.parse import urlencode, urlparse
@@ -61,6 +63,11 @@ class ZohoAuthService:
         self.token_url = f"{self.oauth_base_url}/token"
         self.revoke_url = f"{self.oauth_base_url}/token/revoke"
 
+        # In-process access tokens (user_id -> (access_token, expires_at)) and
+        # per-user locks so concurrent callers share a single lookup/refresh
+        self._token_cache: Dict[str, tuple] = {}
+        self._token_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
         if not all([self.client_id, self.client_secret, self.redirect_uri]):
             logger.warning(
                 "Zoho OAuth credentials not fully configured. "
@@ -272,30 +279,51 @@ class ZohoAuthService:
             Valid access token or None if unavailable
         """
         try:
-            token_doc = await self.db.zoho_tokens.find_one({"user_id": user_id})
-            if not token_doc:
-                logger.warning(f"No tokens found for user: {user_id}")
-                return None
+            cached = self._get_cached_token(user_id)
+            if cached:
+                return cached
+
+            lock = self._token_locks.get(user_id)
+            if lock is None:
+                lock = self._token_locks[user_id] = asyncio.Lock()
+            async with lock:
+                # Another caller may have loaded or refreshed the token while we waited
+                cached = self._get_cached_token(user_id)
+                if cached:
+                    return cached
+
+                token_doc = await self.db.zoho_tokens.find_one({"user_id": user_id})
+                if not token_doc:
+                    logger.warning(f"No tokens found for user: {user_id}")
+                    return None
 
-            # Check if token is expired or about to expire (5 min buffer)
-            expires_at = datetime.fromisoformat(token_doc["expires_at"])
-            now = datetime.now(timezone.utc)
+                # Check if token is expired or about to expire (5 min buffer)
+                expires_at = datetime.fromisoformat(token_doc["expires_at"])
+                now = datetime.now(timezone.utc)
 
-            if expires_at - now < timedelta(minutes=5):
-                logger.info(f"Token expired or expiring soon for user: {user_id}, refreshing...")
-                refresh_result = await self.refresh_access_token(user_id)
-                if refresh_result["status"] == "success":
-                    return refresh_result["access_token"]
-                else:
-                    logger.error(f"Failed to refresh token: {refresh_result}")
-                    return None
+                if expires_at - now < timedelta(minutes=5):
+                    logger.info(f"Token expired or expiring soon for user: {user_id}, refreshing...")
+                    refresh_result = await self.refresh_access_token(user_id)
+                    if refresh_result["status"] == "success":
+                        return refresh_result["access_token"]
+                    else:
+                        logger.error(f"Failed to refresh token: {refresh_result}")
+                        return None
 
-            return token_doc["access_token"]
+                self._token_cache[user_id] = (token_doc["access_token"], expires_at)
+                return token_doc["access_token"]
 
         except Exception as e:
             logger.error(f"Error getting valid access token: {str(e)}")
             return None
 
+    def _get_cached_token(self, user_id: str) -> Optional[str]:
+        """Return the in-process access token if it has more than 5 minutes left."""
+        cached = self._token_cache.get(user_id)
+        if cached and cached[1] - datetime.now(timezone.utc) >= timedelta(minutes=5):
+            return cached[0]
+        return None
+
     async def _store_tokens(self, user_id: str, token_data: Dict[str, Any]) -> None:
         """
         Store tokens in database with expiration tracking.
@@ -325,6 +353,8 @@ class ZohoAuthService:
                 upsert=True
             )
 
+            self._token_cache[user_id] = (token_doc["access_token"], expires_at)
+
             logger.info(f"Stored tokens for user: {user_id}, expires at: {expires_at}")
 
         except Exception as e:
@@ -356,6 +386,7 @@ class ZohoAuthService:
                 if response.status_code == 200:
                     # Remove tokens from database
                     await self.db.zoho_tokens.delete_one({"user_id": user_id})
+                    self._token_cache.pop(user_id, None)
                     logger.info(f"Revoked tokens for user: {user_id}")
 
                     return {
@@ -8,8 +8,11 @@ Handles all Zoho CRM operations:
 - Campaign tracking and analytics
 """
 
+import asyncio
 import logging
+import weakref
 import httpx
+from cachetools import TTLCache
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
 
@@ -32,8 +35,18 @@ class ZohoCRMService:
             auth_service: ZohoAuthService instance for authentication
         """
         self.auth_service = auth_service
+
+        # COQL search results keyed by (module, criteria, user_id), with per-key
+        # locks so identical concurrent searches share one request
+        self._search_cache = TTLCache(maxsize=1024, ttl=60)
+        self._search_locks: "weakref.WeakValueDictionary[tuple, asyncio.Lock]" = weakref.WeakValueDictionary()
         logger.info("Zoho CRM Service initialized")
 
+    def _invalidate_search_cache(self, module_name: str) -> None:
+        """Drop cached searches for a module after a write to it."""
+        for key in [k for k in list(self._search_cache.keys()) if k[0] == module_name]:
+            self._search_cache.pop(key, None)
+
     async def _get_headers(self, user_id: str = "default_user") -> Optional[Dict[str, str]]:
         """Get authorization headers with valid access token."""
         access_token = await self.auth_service.get_valid_access_token(user_id)
@@ -345,6 +358,8 @@ class ZohoCRMService:
                     result = response.json()
                     record_id = result["data"][0]["details"]["id"]
 
+                    self._invalidate_search_cache(module_name)
+
                     return {
                         "status": "success",
                         "record_id": record_id,
@@ -362,6 +377,157 @@ class ZohoCRMService:
             logger.error(f"Error creating record: {str(e)}")
             return {"status": "error", "message": str(e)}
 
+    async def upsert_record(
+        self,
+        module_name: str,
+        record_data: Dict[str, Any],
+        duplicate_check_fields: List[str] = None,
+        user_id: str = "default_user"
+    ) -> Dict[str, Any]:
+        """
+        Insert or update a record in one call using Zoho's upsert API.
+
+        Args:
+            module_name: Module API name
+            record_data: Record data
+            duplicate_check_fields: Fields Zoho uses to find an existing record
+            user_id: User identifier
+
+        Returns:
+            Dict with record ID and whether it was inserted or updated
+        """
+        try:
+            headers = await self._get_headers(user_id)
+            if not headers:
+                return {"status": "error", "message": "No valid Zoho connection"}
+
+            zoho_record = {
+                "data": [record_data],
+                "duplicate_check_fields": duplicate_check_fields or ["Name"]
+            }
+            url = f"{self.API_BASE_URL}/{module_name}/upsert"
+
+            async with httpx.AsyncClient() as client:
+                response = await client.post(url, headers=headers, json=zoho_record)
+
+                if response.status_code in [200, 201]:
+                    result = response.json()
+                    record = result["data"][0]
+
+                    self._invalidate_search_cache(module_name)
+
+                    return {
+                        "status": "success",
+                        "record_id": record["details"]["id"],
+                        "action": record.get("action"),
+                        "message": f"Record upserted in {module_name}",
+                        "details": record
+                    }
+                else:
+                    error_data = response.json()
+                    return {
+                        "status": "error",
+                        "message": error_data.get("message", "Failed to upsert record")
+                    }
+
+        except Exception as e:
+            logger.error(f"Error upserting record: {str(e)}")
+            return {"status": "error", "message": str(e)}
+
+    async def update_record(
+        self,
+        module_name: str,
+        record_id: str,
+        record_data: Dict[str, Any],
+        user_id: str = "default_user"
+    ) -> Dict[str, Any]:
+        """
+        Update a record in any Zoho CRM module.
+
+        Args:
+            module_name: Module API name
+            record_id: Zoho record ID
+            record_data: Fields to update
+            user_id: User identifier
+
+        Returns:
+            Dict with update status
+        """
+        try:
+            headers = await self._get_headers(user_id)
+            if not headers:
+                return {"status": "error", "message": "No valid Zoho connection"}
+
+            zoho_record = {"data": [record_data]}
+            url = f"{self.API_BASE_URL}/{module_name}/{record_id}"
+
+            async with httpx.AsyncClient() as client:
+                response = await client.put(url, headers=headers, json=zoho_record)
+
+                if response.status_code == 200:
+                    self._invalidate_search_cache(module_name)
+
+                    return {
+                        "status": "success",
+                        "record_id": record_id,
+                        "message": f"Record updated in {module_name}"
+                    }
+                else:
+                    error_data = response.json()
+                    return {
+                        "status": "error",
+                        "message": error_data.get("message", "Failed to update record")
+                    }
+
+        except Exception as e:
+            logger.error(f"Error updating record: {str(e)}")
+            return {"status": "error", "message": str(e)}
+
+    async def delete_record(
+        self,
+        module_name: str,
+        record_id: str,
+        user_id: str = "default_user"
+    ) -> Dict[str, Any]:
+        """
+        Delete a record from any Zoho CRM module.
+
+        Args:
+            module_name: Module API name
+            record_id: Zoho record ID
+            user_id: User identifier
+
+        Returns:
+            Dict with deletion status
+        """
+        try:
+            headers = await self._get_headers(user_id)
+            if not headers:
+                return {"status": "error", "message": "No valid Zoho connection"}
+
+            url = f"{self.API_BASE_URL}/{module_name}/{record_id}"
+
+            async with httpx.AsyncClient() as client:
+                response = await client.delete(url, headers=headers)
+
+                if response.status_code == 200:
+                    self._invalidate_search_cache(module_name)
+
+                    return {
+                        "status": "success",
+                        "record_id": record_id,
+                        "message": f"Record deleted from {module_name}"
+                    }
+                else:
+                    return {
+                        "status": "error",
+                        "message": "Failed to delete record"
+                    }
+
+        except Exception as e:
+            logger.error(f"Error deleting record: {str(e)}")
+            return {"status": "error", "message": str(e)}
+
     async def get_records(
         self,
         module_name: str,
@@ -418,19 +584,54 @@ class ZohoCRMService:
         self,
         module_name: str,
         search_criteria: str,
-        user_id: str = "default_user"
+        user_id: str = "default_user",
+        no_cache: bool = False
     ) -> Dict[str, Any]:
         """
         Search records using COQL (CRM Object Query Language).
 
+        Successful results are cached for 60 seconds and invalidated by writes
+        to the same module through this service.
+
         Args:
             module_name: Module API name
             search_criteria: Search query
             user_id: User identifier
+            no_cache: Bypass the result cache (for correctness-critical reads)
 
         Returns:
             Dict with search results
         """
+        if no_cache:
+            return await self._search_records(module_name, search_criteria, user_id)
+
+        key = (module_name, search_criteria, user_id)
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        lock = self._search_locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._search_locks[key] = lock
+
+        async with lock:
+            cached = self._search_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+            result = await self._search_records(module_name, search_criteria, user_id)
+            if result.get("status") == "success":
+                self._search_cache[key] = result
+            return dict(result)
+
+    async def _search_records(
+        self,
+        module_name: str,
+        search_criteria: str,
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Run a COQL search against Zoho CRM (uncached)."""
         try:
             headers = await self._get_headers(user_id)
             if not headers:
@@ -439,7 +439,9 @@ export const login = async (email, password) => {
  * @returns {Promise<{status: string}>}
  */
 export const logout = async (token) => {
-  return api.post('/auth/logout', { token });
+  return api.post('/auth/logout', null, {
+    headers: { Authorization: `Bearer ${token}` },
+  });
 };
 
 /**
@@ -0,0 +1,36 @@
+import base64
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from social_media_integration_service import SocialMediaIntegrationService  # noqa: E402
+
+
+def make_db():
+    return SimpleNamespace(social_credentials=SimpleNamespace(with_options=lambda **kwargs: None))
+
+
+def test_missing_encryption_key_fails_at_construction(monkeypatch):
+    monkeypatch.delenv("CRED_ENC_KEY", raising=False)
+
+    with pytest.raises(ValueError):
+        SocialMediaIntegrationService(None, make_db())
+
+
+def test_credentials_are_sealed_and_legacy_rows_still_read(monkeypatch):
+    monkeypatch.setenv("CRED_ENC_KEY", base64.urlsafe_b64encode(os.urandom(32)).decode())
+    service = SocialMediaIntegrationService(None, make_db())
+    credentials = {"access_token": "secret-token"}
+
+    sealed = service._encrypt_credentials(credentials)
+    legacy = base64.b64encode(json.dumps(credentials).encode()).decode()
+
+    assert sealed.startswith(service.ENCRYPTION_PREFIX)
+    assert "secret-token" not in base64.b64decode(sealed[len(service.ENCRYPTION_PREFIX):]).decode("latin-1")
+    assert service._decrypt_credentials(sealed) == credentials
+    assert service._decrypt_credentials(legacy) == credentials
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from social_media_service import SocialMediaPublishingError, SocialMediaService  # noqa: E402
+
+PUBLIC_HOST = "93.184.216.34"
+
+
+def download(image_url, handler):
+    """Run download_image against a mock transport, recording the URLs requested."""
+    requested = []
+
+    def record(request):
+        requested.append(str(request.url))
+        return handler(request)
+
+    async def run():
+        service = SocialMediaService()
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+        try:
+            return await service.download_image(image_url)
+        finally:
+            await service._client.aclose()
+
+    return asyncio.run(run()), requested
+
+
+def image(request):
+    return httpx.Response(200, content=b"jpeg", headers={"Content-Type": "image/jpeg"})
+
+
+def test_downloads_public_image():
+    result, requested = download(f"http://{PUBLIC_HOST}/a.jpg", image)
+
+    assert result == (b"jpeg", "image/jpeg")
+    assert requested == [f"http://{PUBLIC_HOST}/a.jpg"]
+
+
+@pytest.mark.parametrize("image_url", [
+    "file:///etc/passwd",
+    "http://127.0.0.1/a.jpg",
+    "http://10.0.0.5/a.jpg",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/a.jpg",
+    "http://[::ffff:127.0.0.1]/a.jpg",
+])
+def test_rejects_non_public_urls(image_url):
+    requested = []
+
+    with pytest.raises(SocialMediaPublishingError):
+        download(image_url, lambda request: requested.append(request) or image(request))
+
+    assert requested == []
+
+
+def test_rejects_redirect_to_private_address():
+    def redirect(request):
+        return httpx.Response(302, headers={"Location": "http://169.254.169.254/latest/meta-data/"})
+
+    with pytest.raises(SocialMediaPublishingError):
+        download(f"http://{PUBLIC_HOST}/a.jpg", redirect)
+
+
+def test_rejects_oversized_image():
+    def huge(request):
+        return httpx.Response(200, content=b"x" * (SocialMediaService.MAX_IMAGE_BYTES + 1))
+
+    with pytest.raises(SocialMediaPublishingError):
+        download(f"http://{PUBLIC_HOST}/a.jpg", huge)
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from tenant_service import TenantService  # noqa: E402
+
+
+class SlowZoho:
+    """Zoho CRM stub whose updates wait until released."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.written = []
+
+    async def update_record(self, module_name, record_id, record_data, user_id="default_user"):
+        self.started.set()
+        await self.release.wait()
+        self.written.append((record_id, record_data["Credits_Balance"]))
+        return {"status": "success"}
+
+
+def test_close_finishes_flush_in_progress():
+    async def run():
+        zoho = SlowZoho()
+        service = TenantService(zoho, SimpleNamespace(tenants=None))
+        service.ZOHO_FLUSH_INTERVAL = 0
+
+        service._schedule_zoho_sync("t1", "zoho-1", 10.0)
+        await zoho.started.wait()
+
+        # Queued while the first batch is still being written
+        service._schedule_zoho_sync("t2", "zoho-2", 20.0)
+
+        closing = asyncio.create_task(service.close())
+        await asyncio.sleep(0.05)
+        zoho.release.set()
+        await asyncio.wait_for(closing, timeout=1)
+        return zoho.written
+
+    assert asyncio.run(run()) == [("zoho-1", 10.0), ("zoho-2", 20.0)]
+
+
+class RecordingZoho:
+    def __init__(self):
+        self.deleted = []
+
+    async def create_record(self, module_name, record_data, user_id="default_user"):
+        return {"status": "success", "record_id": "zoho-9"}
+
+    async def delete_record(self, module_name, record_id, user_id="default_user"):
+        self.deleted.append((module_name, record_id))
+        return {"status": "success"}
+
+
+class FailingTenants:
+    async def insert_one(self, doc):
+        raise RuntimeError("duplicate key")
+
+
+def test_failed_insert_deletes_zoho_record():
+    zoho = RecordingZoho()
+    service = TenantService(zoho, SimpleNamespace(tenants=FailingTenants()))
+
+    result = asyncio.run(service.create_tenant("a@example.com", "Ada"))
+
+    assert result["status"] == "error"
+    assert zoho.deleted == [("Tenants", "zoho-9")]
@@ -0,0 +1,180 @@
+import asyncio
+import copy
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from unified_social_service import UnifiedSocialService  # noqa: E402
+from zoho_crm_service import ZohoCRMService  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+        self.text = self.content.decode()
+
+
+class FakeTokenEndpoint:
+    """Rotates the refresh token on every call, like Twitter's token endpoint."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def post(self, url, data=None, auth=None, **kwargs):
+        self.calls.append(data["refresh_token"])
+        # Let the other caller reach the lock while this refresh is in flight
+        await asyncio.sleep(0.01)
+        n = len(self.calls)
+        return FakeResponse(200, {
+            "access_token": f"access-{n}",
+            "refresh_token": f"refresh-{n}",
+            "expires_in": 7200
+        })
+
+    async def aclose(self):
+        pass
+
+
+class FakeSocialAccounts:
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def find_one(self, query, projection=None):
+        return copy.deepcopy(self.doc)
+
+    async def update_one(self, query, update, upsert=False):
+        for key, value in update["$set"].items():
+            if key.startswith("credentials."):
+                self.doc["credentials"][key.split(".", 1)[1]] = value
+
+
+class FakeDb:
+    def __init__(self, doc):
+        self.social_accounts = FakeSocialAccounts(doc)
+
+
+def test_concurrent_refresh_posts_once():
+    expiring = (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat()
+    stored = {
+        "user_id": "user-1",
+        "account_id": "tw-1",
+        "credentials": {
+            "access_token": "access-0",
+            "refresh_token": "refresh-0",
+            "token_expires_at": expiring
+        }
+    }
+
+    async def run():
+        service = UnifiedSocialService(FakeDb(stored))
+        await service._http.aclose()
+        endpoint = service._http = FakeTokenEndpoint()
+
+        # Each post loaded its own copy of the account document
+        first, second = copy.deepcopy(stored), copy.deepcopy(stored)
+        tokens = await asyncio.gather(
+            service._ensure_valid_token(first),
+            service._ensure_valid_token(second)
+        )
+        return endpoint, tokens, second
+
+    endpoint, tokens, second = asyncio.run(run())
+
+    assert endpoint.calls == ["refresh-0"]
+    assert tokens == ["access-1", "access-1"]
+    assert second["credentials"]["refresh_token"] == "refresh-1"
+
+
+class FakeLinkedInApi:
+    async def post(self, url, data=None, headers=None, **kwargs):
+        return FakeResponse(200, {"access_token": "li-token"})
+
+    async def get(self, url, headers=None, **kwargs):
+        return FakeResponse(200, {"id": "42", "localizedFirstName": "Ada", "localizedLastName": "L"})
+
+    async def aclose(self):
+        pass
+
+
+class NoTokenZohoAuth:
+    async def get_valid_access_token(self, user_id):
+        return None
+
+
+class ExistingRecordZoho(ZohoCRMService):
+    """Real ZohoCRMService whose credential search finds an existing record."""
+
+    def __init__(self):
+        super().__init__(NoTokenZohoAuth())
+        self.updates = []
+
+    async def search_records(self, module_name, search_criteria, user_id="default_user", no_cache=False):
+        return {"status": "success", "records": [{"id": "zoho-1"}]}
+
+    async def update_record(self, *args, **kwargs):
+        result = await super().update_record(*args, **kwargs)
+        self.updates.append((kwargs, result))
+        return result
+
+
+def test_linkedin_connect_updates_existing_zoho_record():
+    zoho = ExistingRecordZoho()
+    stored = {"credentials": {}}
+
+    async def run():
+        service = UnifiedSocialService(FakeDb(stored), zoho_crm_service=zoho)
+        await service._http.aclose()
+        service._http = FakeLinkedInApi()
+        return await service._exchange_linkedin_code("code", "https://app/callback", "user-1")
+
+    result = asyncio.run(run())
+
+    assert result["status"] == "success"
+    assert len(zoho.updates) == 1
+    kwargs, update_result = zoho.updates[0]
+    assert kwargs["record_id"] == "zoho-1"
+    assert kwargs["record_data"]["Account_ID"] == "li_42"
+    # The call reached the request itself rather than failing on its arguments
+    assert update_result == {"status": "error", "message": "No valid Zoho connection"}
+
+
+class NoStoredStates:
+    async def find_one(self, query):
+        return None
+
+
+class RejectingOAuthManager:
+    def __init__(self):
+        self.validated = []
+
+    async def validate_state(self, state, platform, user_id=None):
+        self.validated.append((state, platform, user_id))
+        return {"valid": False, "error": "Invalid or expired state"}
+
+
+def test_callback_checks_state_even_with_redirect_uri():
+    db = FakeDb({"credentials": {}})
+    db.oauth_states = NoStoredStates()
+    manager = RejectingOAuthManager()
+
+    async def run():
+        stored = UnifiedSocialService(db)
+        signed = UnifiedSocialService(db, oauth_manager=manager)
+        for service in (stored, signed):
+            await service._http.aclose()
+            service._http = FakeLinkedInApi()
+        return [
+            await service.handle_oauth_callback(
+                "linkedin", "code", "forged", "user-1", redirect_uri="https://evil/callback"
+            )
+            for service in (stored, signed)
+        ]
+
+    results = asyncio.run(run())
+
+    assert [result["status"] for result in results] == ["error", "error"]
+    assert manager.validated == [("forged", "linkedin", "user-1")]
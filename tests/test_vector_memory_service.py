@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from vector_memory_service import VectorMemoryService  # noqa: E402
+
+
+class BlockingEmbeddings:
+    """Embeddings endpoint that holds each request until released."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.requests = []
+
+    async def create(self, input, model):
+        self.requests.append(list(input))
+        self.started.set()
+        await self.release.wait()
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)
+        ])
+
+
+def make_service():
+    db = SimpleNamespace(global_memory=None, user_memory=None, agent_memory=None, tenants=None)
+    service = VectorMemoryService(db)
+    embeddings = BlockingEmbeddings()
+    service._openai_client = SimpleNamespace(embeddings=embeddings)
+    return service, embeddings
+
+
+def test_close_answers_batch_in_flight_and_queued():
+    async def run():
+        service, embeddings = make_service()
+
+        first = asyncio.create_task(service.generate_embedding("abc"))
+        await embeddings.started.wait()
+
+        # Queued while the first batch is still waiting on the API
+        second = asyncio.create_task(service.generate_embedding("abcdef"))
+        await asyncio.sleep(0)
+
+        closing = asyncio.create_task(service.close())
+        await asyncio.sleep(0.05)
+        embeddings.release.set()
+
+        await asyncio.wait_for(closing, timeout=1)
+        return await asyncio.wait_for(asyncio.gather(first, second), timeout=1), embeddings
+
+    results, embeddings = asyncio.run(run())
+
+    assert results == [[3.0], [6.0]]
+    assert embeddings.requests == [["abc"], ["abcdef"]]
+
+
+def test_cancelled_flush_still_answers_callers():
+    async def run():
+        service, embeddings = make_service()
+
+        caller = asyncio.create_task(service.generate_embedding("abc"))
+        await embeddings.started.wait()
+
+        service._embedding_flush_task.cancel()
+        return await asyncio.wait_for(caller, timeout=1)
+
+    assert asyncio.run(run()) is None